@@ -1,12 +1,19 @@
 """Classes and data structures to access, evaluate and validate data.
 """
-from .datastructures import Detection, Score, ScoreMetrics, Track
+from .datastructures import Detection, RopeList, Score, ScoreMetrics, Track
+from .time_index import TimeIndex
+from .detection_ids import detection_id_to_int, detection_id_to_str, pack_detection_id, \
+    unpack_detection_id
 
 from .datawrapper import DataWrapper, DataWrapperTruth
 from .datawrapper_binary import DataWrapperBinary, DataWrapperTruthBinary
+from .datawrapper_columnar import DataWrapperColumnar
+from .datawrapper_windowed import DataWrapperWindowed
 from .datawrapper_pandas import DataWrapperPandas, DataWrapperTruthPandas
 from .datawrapper_tracks import DataWrapperTracks, DataWrapperTruthTracks
 
-__all__ = ['DataWrapper', 'DataWrapperTruth', 'DataWrapperBinary', 'DataWrapperPandas',
-           'DataWrapperTracks', 'DataWrapperTruthBinary', 'DataWrapperTruthPandas',
-           'DataWrapperTruthTracks', 'Detection', 'Score', 'ScoreMetrics', 'Track']
+__all__ = ['DataWrapper', 'DataWrapperTruth', 'DataWrapperBinary', 'DataWrapperColumnar',
+           'DataWrapperPandas', 'DataWrapperTracks', 'DataWrapperTruthBinary',
+           'DataWrapperTruthPandas', 'DataWrapperTruthTracks', 'DataWrapperWindowed', 'Detection',
+           'RopeList', 'Score', 'ScoreMetrics', 'TimeIndex', 'Track', 'detection_id_to_int',
+           'detection_id_to_str', 'pack_detection_id', 'unpack_detection_id']
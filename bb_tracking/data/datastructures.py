@@ -6,7 +6,9 @@ not support docstring in Python 2. Setting the docstring is only possible in Pyt
 So depending on the Python version that was used to compile the documentation the documentation for
 the datastructures are missing.
 """
+from bisect import bisect_right
 from collections import namedtuple
+from itertools import chain
 from six import PY3
 
 Detection = namedtuple('Detection', ['id', 'timestamp', 'x', 'y', 'orientation', 'beeId', 'meta'])
@@ -116,3 +118,89 @@ Attributes:
     gap_left (bool): correctly identified gap to the left
     gap_right (bool): correctly identified gap to the right
 """
+
+
+class RopeList(object):
+    """A list that is concatenated from other lists without copying them.
+
+    Extending a :obj:`RopeList` with a :obj:`list` only stores a reference to it, so concatenating
+    the lists of :obj:`Track` objects costs constant time per list. The values are only copied when
+    the :obj:`RopeList` is converted via ``list()``.
+
+    Note:
+        The referenced lists must not be changed afterwards.
+    """
+
+    def __init__(self, parts=()):
+        """Initialization of a RopeList.
+
+        Keyword Arguments:
+            parts (iterable of :obj:`list`): lists to concatenate
+        """
+        self._parts = []
+        self._ends = []
+        self._length = 0
+        for part in parts:
+            self.extend(part)
+
+    def extend(self, values):
+        """Appends the `values` to the end of the list.
+
+        Arguments:
+            values (iterable): a :obj:`list` or :obj:`RopeList` is referenced, other iterables
+                are copied
+        """
+        if isinstance(values, RopeList):
+            for part in values._parts:
+                self.extend(part)
+            return
+        if not isinstance(values, list):
+            values = list(values)
+        if len(values) > 0:
+            self._length += len(values)
+            self._parts.append(values)
+            self._ends.append(self._length)
+
+    def append(self, value):
+        """Appends `value` to the end of the list.
+
+        Arguments:
+            value (object): the value to append
+        """
+        self.extend([value])
+
+    def __len__(self):
+        return self._length
+
+    def __iter__(self):
+        return chain.from_iterable(self._parts)
+
+    def __getitem__(self, key):
+        # fast path for the first and last item of tracks
+        if key == -1 and self._length > 0:
+            return self._parts[-1][-1]
+        elif key == 0 and self._length > 0:
+            return self._parts[0][0]
+        elif isinstance(key, slice):
+            return list(self)[key]
+        if key < 0:
+            key += self._length
+        if not 0 <= key < self._length:
+            raise IndexError("RopeList index out of range")
+        part_idx = bisect_right(self._ends, key)
+        offset = self._ends[part_idx - 1] if part_idx > 0 else 0
+        return self._parts[part_idx][key - offset]
+
+    def __eq__(self, other):
+        if not isinstance(other, (list, RopeList)):
+            return NotImplemented
+        return len(self) == len(other) and list(self) == list(other)
+
+    def __ne__(self, other):
+        equal = self.__eq__(other)
+        return equal if equal is NotImplemented else not equal
+
+    __hash__ = None
+
+    def __repr__(self):
+        return "RopeList({0!r})".format(list(self))
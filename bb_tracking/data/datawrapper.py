@@ -27,10 +27,15 @@ There are currently three implementations:
     tracking and validation on track level (assigning tracks to other tracks instead of detections
     to tracks).
 """
+from itertools import chain
+import numpy as np
+from .time_index import TimeIndex
 
 
 class DataWrapper(object):
     """Abstract class that describes the access to detections."""
+    _time_indices = None
+    """:obj:`dict`: ``{cam_id: TimeIndex}`` mapping, ``None`` as key for all timestamps"""
 
     def get_camids(self, frame_object=None):
         """Returns an iterable with camera ids.
@@ -103,6 +108,50 @@ class DataWrapper(object):
         """
         raise NotImplementedError()
 
+    def get_neighbors_bulk(self, frame_objects, cam_id, radius, timestamp, points=None):
+        """Gets the neighborhoods of all the given frame objects with one spatial query.
+
+        This is the vectorized version of :meth:`get_neighbors` for many frame objects in the same
+        frame. Instead of lists with frame objects two flat arrays with index pairs are returned.
+
+        Arguments:
+            frame_objects (:obj:`list` of :obj:`.Detection` or :obj:`.Track`): frame objects to
+                search neighborhoods for
+            cam_id (int): the cam to consider
+            radius (int or :obj:`np.array`): the radius to search in image coordinates, either one
+                for all or one for each frame object
+            timestamp (timestamp): consider frame objects of frame with this timestamp
+
+        Keyword Arguments:
+            points (Optional :obj:`np.array`): ``(x, y)`` rows to search around instead of the
+                positions of the frame objects, e.g. predicted positions
+
+        Returns:
+            tuple: tuple containing:
+
+                - **query_indices** (:obj:`np.array`): indices in `frame_objects`
+                - **candidate_indices** (:obj:`np.array`): indices of the neighbors in the frame
+                  objects of the frame, that is :meth:`get_frame_objects` or
+                  :meth:`.DataWrapperTracks.get_frame_objects_starting` for tracks
+        """
+        raise NotImplementedError()
+
+    @staticmethod
+    def _flatten_neighbors(neighbors):
+        """Helper to flatten the result of a spatial query with multiple points.
+
+        Arguments:
+            neighbors (iterable of :obj:`list`): neighbor indices for each query point
+
+        Returns:
+            tuple: ``(query_indices, candidate_indices)`` as flat arrays
+        """
+        lengths = [len(indices) for indices in neighbors]
+        query_indices = np.repeat(np.arange(len(lengths)), lengths)
+        candidate_indices = np.fromiter(chain.from_iterable(neighbors), dtype=int,
+                                        count=sum(lengths))
+        return query_indices, candidate_indices
+
     def get_timestamps(self, cam_id=None):
         """Extracts all timestamps as unique ordered Iterable.
 
@@ -114,6 +163,23 @@ class DataWrapper(object):
         """
         raise NotImplementedError()
 
+    def get_time_index(self, cam_id=None):
+        """Returns a :obj:`.TimeIndex` of the timestamps from :meth:`get_timestamps`.
+
+        The :obj:`.TimeIndex` is built on first access and reused afterwards.
+
+        Keyword Arguments:
+            cam_id (Optional int): select only timestamps that are available for this camera id
+
+        Returns:
+            :obj:`.TimeIndex`: index to look up the position of timestamps
+        """
+        if self._time_indices is None:
+            self._time_indices = dict()
+        if cam_id not in self._time_indices:
+            self._time_indices[cam_id] = TimeIndex(self.get_timestamps(cam_id=cam_id))
+        return self._time_indices[cam_id]
+
 
 class DataWrapperTruth(DataWrapper):
     """Special wrapper for truth data.
@@ -9,11 +9,89 @@ If have other data formats either try to `convert
 <http://bb-binary.readthedocs.io/en/latest/api/converting.html>`_ them
 or use :class:`.DataWrapperPandas`.
 """
+from collections import OrderedDict
+from itertools import repeat
+import multiprocessing
 import numpy as np
 from scipy.spatial import cKDTree
+from bb_binary import load_frame_container
 from .constants import CAMKEY, DETKEY, FRAMEIDXKEY, TRUTHKEY
 from .datastructures import Detection, Track
 from .datawrapper import DataWrapper, DataWrapperTruth
+from .detection_ids import format_detection_ids, pack_detection_ids
+
+
+def decode_frame(frame, meta_keys):
+    """Converts the detections of a *bb_binary* frame to arrays.
+
+    Arguments:
+        frame (Frame): bb_binary Frame object
+        meta_keys (:obj:`dict`): ``{detecion_key: meta_key}`` mapping with the detection fields
+            that are added as meta fields
+
+    Returns:
+        :obj:`dict`: the ``id``, ``timestamp`` and ``frame_idx`` of the frame and arrays with the
+        ``idx``, ``x``, ``y``, ``orientation`` and uint8 ``bee_ids`` of the detections. ``meta``
+        is a ``{meta_key: array}`` mapping.
+    """
+    assert frame.detectionsUnion.which() == 'detectionsDP',\
+        "Only implemented for union type 'detectionsDP'!"
+    detections = frame.detectionsUnion.detectionsDP
+    orientation = np.array([detection.zRotation for detection in detections], dtype=float)
+    orientation[np.isinf(orientation)] = 0
+    return dict(id=frame.id, timestamp=frame.timestamp, frame_idx=frame.frameIdx,
+                idx=np.array([detection.idx for detection in detections], dtype=int),
+                x=np.array([detection.xpos for detection in detections]),
+                y=np.array([detection.ypos for detection in detections]),
+                orientation=orientation,
+                bee_ids=np.array([list(detection.decodedId) for detection in detections],
+                                 dtype=np.uint8),
+                meta={mkey: np.array([getattr(detection, dkey) for detection in detections])
+                      for dkey, mkey in meta_keys.items()})
+
+
+def _decode_frame_container(task):
+    """Decodes the frames of a frame container in a process pool worker.
+
+    The frames are filtered by `begin` and `end` like in :func:`Repository.iter_frames()`.
+
+    Arguments:
+        task (tuple): ``(fname, begin, end, meta_keys)`` with the path of the frame container
+
+    Returns:
+        :obj:`list` of tuple: ``(cam_id, frame)`` with the frames decoded by :func:`decode_frame`
+    """
+    fname, begin, end, meta_keys = task
+    frame_container = load_frame_container(fname)
+    return [(frame_container.camId, decode_frame(frame, meta_keys))
+            for frame in frame_container.frames
+            if (begin is None or begin <= frame.timestamp) and
+            (end is None or frame.timestamp < end)]
+
+
+def _decode_repository_parallel(repository, meta_keys, workers, kwargs):
+    """Decodes the frame containers of a repository in a process pool.
+
+    Arguments:
+        repository (:class:`bb_binary.Repository`): *bb_binary* Repository with detections
+        meta_keys (:obj:`dict`): ``{detecion_key: meta_key}`` mapping
+        workers (int): number of processes
+        kwargs (:obj:`dict`): keyword arguments for :func:`Repository.iter_fnames()`
+
+    Yields:
+        tuple: ``(cam_id, frame)`` in the same order as :func:`Repository.iter_frames()`
+    """
+    tasks = [(fname, kwargs.get('begin'), kwargs.get('end'), meta_keys)
+             for fname in repository.iter_fnames(**kwargs)]
+    pool = multiprocessing.Pool(processes=workers)
+    try:
+        # the containers are merged in order while the next ones are decoded
+        for frames in pool.imap(_decode_frame_container, tasks):
+            for cam_id_frame in frames:
+                yield cam_id_frame
+    finally:
+        pool.close()
+        pool.join()
 
 
 class DataWrapperBinary(DataWrapper):
@@ -32,86 +110,169 @@ class DataWrapperBinary(DataWrapper):
     frame_detections = None
     """:obj:`dict`: ``{(cam_id, timestamp): detection}`` mapping for :obj:`.Detection`"""
     frame_trees = None
-    """:obj:`dict`: ``{(cam_id, timestamp): KDTree}`` mapping"""
+    """:obj:`collections.OrderedDict`: ``{(cam_id, timestamp): KDTree}`` mapping with the spatial
+    trees that were built on request, the least recently used first"""
+    int_ids = False
+    """bool: flag indicating that the detection ids are packed integers, see
+    :func:`.pack_detection_id`"""
     timestamps = None
     """:obj:`list` of timestamp: sorted list with all available timestamps"""
-
-    def __init__(self, repository, meta_keys=None, **kwargs):
+    uint8_ids = False
+    """bool: flag indicating that :attr:`.Detection.beeId` is a row of an uint8 array with the
+    decoded id bits (``0`` to ``255``) instead of a list of floats"""
+    tree_cache_size = 1000
+    """int: maximum number of spatial trees in :attr:`frame_trees`, :obj:`None` for no limit"""
+    tree_cache_hits = 0
+    """int: number of spatial trees that were taken from :attr:`frame_trees`"""
+    tree_cache_misses = 0
+    """int: number of spatial trees that were built"""
+
+    def __init__(self, repository, meta_keys=None, workers=None, int_ids=False, uint8_ids=False,
+                 **kwargs):
         """Necessary initialization to organize detection data.
 
+        With `workers` the frame containers are decoded in a process pool. The detections and
+        their ids are the same as without `workers`.
+
         Arguments:
             repository (:class:`bb_binary.Repository`): *bb_binary* Repository with detections
 
         Keyword Arguments:
             meta_keys (Optional :obj:`dict`): ``{detecion_key: meta_key}`` mapping that is added
                 as meta field in detections (detection fields defined in the *bb_binary* schema)
+            workers (Optional int): number of processes to decode the frame containers
+            int_ids (Optional bool): use packed integers instead of strings as detection ids
+            uint8_ids (Optional bool): keep the id bits as uint8 arrays, see :attr:`uint8_ids`
             **kwargs (:obj:`dict`): keyword arguments for :func:`Repository.iter_frames()`
         """
+        self.int_ids = int_ids
+        self.uint8_ids = uint8_ids
         # convert detections to python objects and create dictionaries for fast lookup
         self.detections_dict = dict()
         self.frame_detections = dict()
-        self.frame_trees = dict()
+        self.frame_trees = OrderedDict()
+        self._read_repository(repository, meta_keys, workers=workers, **kwargs)
+        assert len(self.detections_dict) > 0, "Repository is empty."
+
+    def _read_repository(self, repository, meta_keys, load_detections=True, workers=None,
+                         **kwargs):
+        """Helper to iterate through the frames of a repository and collect the timestamps.
+
+        The detections of each frame are decoded via :func:`decode_frame` and handed to
+        :meth:`_add_frame`.
+
+        Arguments:
+            repository (:class:`bb_binary.Repository`): *bb_binary* Repository with detections
+            meta_keys (Optional :obj:`dict`): ``{detecion_key: meta_key}`` mapping that is added
+                as meta field in detections (detection fields defined in the *bb_binary* schema)
+
+        Keyword Arguments:
+            load_detections (Optional bool): only collect the timestamps if False
+            workers (Optional int): number of processes to decode the frame containers
+            **kwargs (:obj:`dict`): keyword arguments for :func:`Repository.iter_frames()`
+        """
         # use local variables because we need to sort the data later
-        cam_ids = set()
-        timestamps = set()
         cam_timestamps = dict()
-        last_fc_id = None
         meta_keys = meta_keys or dict()
-        for frame, frame_container in repository.iter_frames(**kwargs):
-            cam_id = frame_container.camId
-            # a different frame containers might have data from a different camera
-            if frame_container.id != last_fc_id:
-                last_fc_id = frame_container.id
-                if cam_id not in cam_ids:
-                    cam_ids.add(cam_id)
-                    cam_timestamps[cam_id] = set()
-                assert frame.detectionsUnion.which() == 'detectionsDP',\
-                    "Only implemented for union type 'detectionsDP'!"
-
+        if load_detections and workers is not None and workers > 1:
+            frames = _decode_repository_parallel(repository, meta_keys, workers, kwargs)
+        else:
+            frames = ((frame_container.camId,
+                       decode_frame(frame, meta_keys) if load_detections else frame)
+                      for frame, frame_container in repository.iter_frames(**kwargs))
+        for cam_id, frame in frames:
             # each frame has a different timestamp
-            cam_timestamps[cam_id].add(frame.timestamp)
-            timestamps.add(frame.timestamp)
-            # now iterate through detections
-            self._iterate_detections(frame, cam_id, meta_keys)
-
-        self.cam_ids = list(sorted(cam_ids))
-        self.timestamps = list(sorted(timestamps))
+            timestamp = frame['timestamp'] if load_detections else frame.timestamp
+            cam_timestamps.setdefault(cam_id, set()).add(timestamp)
+            # now add the detections
+            if load_detections:
+                self._add_frame(cam_id, frame)
+
+        self.cam_ids = list(sorted(cam_timestamps.keys()))
+        self.timestamps = list(sorted(set(tstamp for tstamps in cam_timestamps.values()
+                                          for tstamp in tstamps)))
         self.cam_timestamps = {cam_id: list(sorted(tstamps))
                                for cam_id, tstamps in cam_timestamps.items()}
-        assert len(self.detections_dict) > 0, "Repository is empty."
 
-    def _iterate_detections(self, frame, cam_id, meta_keys):
-        """Helper to iterate through detections and extract information.
+    def _add_frame(self, cam_id, frame):
+        """Helper to create the :obj:`.Detection` objects of a frame.
 
-        This helper will iterate through all detections of a frame, create the :obj:`.Detection`
-        :obj:`namedtuple` and :obj:`cKDTree` for each frame.
+        The ids of all detections of the frame are generated at once and the
+        :obj:`.Detection` :obj:`namedtuple` objects are built column by column from the arrays of
+        `frame`. The :obj:`cKDTree` of the frame is only built on request, see :meth:`_get_tree`.
 
         Arguments:
-            frame (Frame): bb_binary Frame object
             cam_id (int): the id of the camera this frame belongs to
-            meta_keys (Optional :obj:`dict`): ``{detecion_key: meta_key}``mapping that is added
-                as meta field in detections (detection fields defined in the *bb_binary* schema)
+            frame (:obj:`dict`): the frame as decoded by :func:`decode_frame`
         """
-        xy_cols = list()
-        self.frame_detections[(cam_id, frame.timestamp)] = list()
-        # iterate through detections and make some data cleaning
-        for detection in frame.detectionsUnion.detectionsDP:
-            detection_id = 'f{}d{}c{}'.format(frame.id, detection.idx, cam_id)
-            detection_tuple = Detection(
-                id=detection_id, timestamp=frame.timestamp, x=detection.xpos, y=detection.ypos,
-                orientation=0 if np.isinf(detection.zRotation) else detection.zRotation,
-                beeId=[x / 255. for x in detection.decodedId],
-                meta={mkey: getattr(detection, dkey) for dkey, mkey in meta_keys.items()})
-            detection_tuple.meta[CAMKEY] = cam_id
-            assert detection_id not in self.detections_dict,\
-                "Duplicate key {}".format(detection_id)
-            self.detections_dict[detection_id] = detection_tuple
-            self.frame_detections[(cam_id, frame.timestamp)].append(detection_tuple)
-            xy_cols.append((detection.xpos, detection.ypos))
-
-        # we might have frames without detections
-        if len(xy_cols) > 0:
-            self.frame_trees[(cam_id, frame.timestamp)] = cKDTree(xy_cols)
+        frame_key = (cam_id, frame['timestamp'])
+        make_ids = pack_detection_ids if self.int_ids else format_detection_ids
+        detection_ids = make_ids(frame['id'], frame['idx'], cam_id)
+        metas = [{CAMKEY: cam_id} for _ in detection_ids]
+        for mkey, values in frame['meta'].items():
+            for meta, value in zip(metas, values.tolist()):
+                meta[mkey] = value
+        # the rows of the uint8 array are views, so the id bits of a frame stay contiguous
+        bee_ids = list(frame['bee_ids']) if self.uint8_ids else \
+            (frame['bee_ids'] / 255.).tolist()
+        timestamps = repeat(frame['timestamp'], len(detection_ids))
+        detections = list(map(Detection, detection_ids, timestamps, frame['x'].tolist(),
+                              frame['y'].tolist(), frame['orientation'].tolist(), bee_ids, metas))
+        n_detections = len(self.detections_dict)
+        self.detections_dict.update(zip(detection_ids, detections))
+        assert len(self.detections_dict) == n_detections + len(detections),\
+            "Duplicate key in frame {}".format(frame_key)
+        self.frame_detections[frame_key] = detections
+
+    def _get_tree(self, frame_key):
+        """Gets the spatial tree of a frame from the LRU cache or builds it.
+
+        Arguments:
+            frame_key (tuple): ``(cam_id, timestamp)`` of the frame
+
+        Returns:
+            :obj:`cKDTree`: the spatial tree or :obj:`None` if the frame has no detections
+        """
+        tree = self.frame_trees.pop(frame_key, None)
+        if tree is None:
+            xy_cols = self._get_frame_positions(frame_key)
+            # we might have frames without detections
+            if xy_cols is None:
+                return None
+            tree = cKDTree(xy_cols)
+            self.tree_cache_misses += 1
+        else:
+            self.tree_cache_hits += 1
+        # reinsert as most recently used
+        self.frame_trees[frame_key] = tree
+        while self.tree_cache_size is not None and len(self.frame_trees) > self.tree_cache_size:
+            self.frame_trees.popitem(last=False)
+        return tree
+
+    def _get_frame_positions(self, frame_key):
+        """Helper to get the positions of the detections in a frame to build its spatial tree.
+
+        Arguments:
+            frame_key (tuple): ``(cam_id, timestamp)`` of the frame
+
+        Returns:
+            iterable: the x and y position of each detection or :obj:`None` if there are none
+        """
+        detections = self.frame_detections.get(frame_key)
+        if not detections:
+            return None
+        return [(detection.x, detection.y) for detection in detections]
+
+    def tree_cache_stats(self):
+        """Returns the statistics of the LRU cache of spatial trees.
+
+        Returns:
+            :obj:`dict`: ``hits``, ``misses``, ``size`` and ``hit_rate`` of the cache
+        """
+        lookups = self.tree_cache_hits + self.tree_cache_misses
+        return dict(hits=self.tree_cache_hits, misses=self.tree_cache_misses,
+                    size=len(self.frame_trees),
+                    hit_rate=float(self.tree_cache_hits) / lookups if lookups > 0 else 0.)
 
     def get_camids(self, frame_object=None):
         if frame_object is None:
@@ -140,29 +301,88 @@ class DataWrapperBinary(DataWrapper):
         return self.frame_detections[(cam_id, timestamp)]
 
     def get_neighbors(self, frame_object, cam_id, radius=10, timestamp=None):
-        if isinstance(frame_object, Track):
-            detection = self.detections_dict[frame_object.ids[-1]]
-        elif isinstance(frame_object, Detection):
-            detection = frame_object
-        else:
-            raise TypeError("Type {0} not supported.".format(type(frame_object)))
+        detection = self._get_query_detection(frame_object)
         # determine search parameters
         timestamp = timestamp or detection.timestamp
         frame_key = (cam_id, timestamp)
 
         # use spatial tree for efficient neighborhood search
-        if frame_key not in self.frame_trees:
+        tree = self._get_tree(frame_key)
+        if tree is None:
             return []
-        tree = self.frame_trees[frame_key]
         indices = tree.query_ball_point((detection.x, detection.y), radius)
 
         # translate tree Indices in detection ids and remove search item
-        detections = self.frame_detections[frame_key]
-        found = [detections[did] for did in indices]
+        found = self._get_frame_detections(frame_key, indices)
         if timestamp == detection.timestamp:
             found = [det for det in found if det.id != detection.id]
         return found
 
+    def get_neighbors_bulk(self, frame_objects, cam_id, radius, timestamp, points=None):
+        frame_key = (cam_id, timestamp)
+        tree = self._get_tree(frame_key) if len(frame_objects) > 0 else None
+        if tree is None:
+            return np.empty(0, dtype=int), np.empty(0, dtype=int)
+        detections = [self._get_query_detection(frame_object) for frame_object in frame_objects]
+        if points is None:
+            points = [(detection.x, detection.y) for detection in detections]
+        neighbors = tree.query_ball_point(points, radius)
+        query_indices, candidate_indices = self._flatten_neighbors(neighbors)
+
+        # remove search items, only queries from the same frame can find themselves
+        same_frame = np.array([detection.timestamp == timestamp for detection in detections],
+                              dtype=bool)
+        if np.any(same_frame[query_indices]):
+            # packed ids use all 64 bits, mixing them with int64 would compare them as floats
+            query_ids = np.array([detection.id for detection in detections],
+                                 dtype=np.uint64 if self.int_ids else None)
+            candidate_ids = self._get_frame_ids(frame_key)[candidate_indices]
+            mask = ~same_frame[query_indices] | (candidate_ids != query_ids[query_indices])
+            query_indices, candidate_indices = query_indices[mask], candidate_indices[mask]
+        return query_indices, candidate_indices
+
+    def _get_frame_detections(self, frame_key, indices):
+        """Helper to get the :obj:`.Detection` objects with `indices` in a frame.
+
+        Arguments:
+            frame_key (tuple): ``(cam_id, timestamp)`` of the frame
+            indices (iterable of int): indices in :meth:`get_frame_objects` of the frame
+
+        Returns:
+            :obj:`list` of :obj:`.Detection`: the detections in the order of `indices`
+        """
+        detections = self.frame_detections[frame_key]
+        return [detections[idx] for idx in indices]
+
+    def _get_frame_ids(self, frame_key):
+        """Helper to get the ids of the :obj:`.Detection` objects in a frame.
+
+        Arguments:
+            frame_key (tuple): ``(cam_id, timestamp)`` of the frame
+
+        Returns:
+            :obj:`np.array`: the detection ids in the order of :meth:`get_frame_objects`
+        """
+        return np.array([detection.id for detection in self.frame_detections[frame_key]],
+                        dtype=np.uint64 if self.int_ids else None)
+
+    def _get_query_detection(self, frame_object):
+        """Helper to get the :obj:`.Detection` to search the neighborhood of `frame_object`.
+
+        Arguments:
+            frame_object (:obj:`.Detection` or :obj:`.Track`): frame object to search neighborhood
+
+        Returns:
+            :obj:`.Detection`: the detection itself or the last detection of a track
+        """
+        if isinstance(frame_object, Track):
+            if DETKEY in frame_object.meta.keys():
+                return frame_object.meta[DETKEY][-1]
+            return self.get_detection(frame_object.ids[-1])
+        elif isinstance(frame_object, Detection):
+            return frame_object
+        raise TypeError("Type {0} not supported.".format(type(frame_object)))
+
     def get_timestamps(self, cam_id=None):
         if cam_id is not None:
             return self.cam_timestamps[cam_id]
@@ -192,7 +412,8 @@ class DataWrapperTruthBinary(DataWrapperBinary, DataWrapperTruth):
     tracks = None
     """:obj:`dict`: ``{truth_id: Track}`` mapping for :obj:`.Track`"""
 
-    def __init__(self, repo_detections, repo_truth, radius, meta_keys=None, **kwargs):
+    def __init__(self, repo_detections, repo_truth, radius, meta_keys=None, workers=None,
+                 int_ids=False, uint8_ids=False, **kwargs):
         """Necessary initialization to organize detection data.
 
         Arguments:
@@ -203,10 +424,16 @@ class DataWrapperTruthBinary(DataWrapperBinary, DataWrapperTruth):
         Keyword Arguments:
             meta_keys (Optional :obj:`dict`): ``{detecion_key: meta_key}`` mapping that is added
                 as meta field in :obj:`.Detection` objects
+            workers (Optional int): number of processes to decode the frame containers with
+                detections
+            int_ids (Optional bool): use packed integers instead of strings as detection ids
+            uint8_ids (Optional bool): keep the id bits as uint8 arrays
             **kwargs (:obj:`dict`): keyword arguments for :func:`Repository.iter_frames()`
         """
 
-        super(DataWrapperTruthBinary, self).__init__(repo_detections, meta_keys=meta_keys, **kwargs)
+        super(DataWrapperTruthBinary, self).__init__(repo_detections, meta_keys=meta_keys,
+                                                     workers=workers, int_ids=int_ids,
+                                                     uint8_ids=uint8_ids, **kwargs)
         # generate truth tracks
         self.tracks = dict()
         self.cam_tracks = {cam_id: dict() for cam_id in self.cam_ids}
@@ -244,7 +471,9 @@ class DataWrapperTruthBinary(DataWrapperBinary, DataWrapperTruth):
         """Determine matching pairs of truth data and repository output."""
         # pylint:disable=too-many-arguments
         frame_key = (cam_id, frame.timestamp)
-        tree = self.frame_trees[frame_key]
+        tree = self._get_tree(frame_key)
+        if tree is None:
+            return
         indices = tree.query_ball_tree(cKDTree(xy_cols), radius)
         for frame_detection_idx, xy_col_idxs in enumerate(indices):
             if len(xy_col_idxs) == 0:
@@ -0,0 +1,363 @@
+# -*- coding: utf-8 -*-
+"""
+This implementation of :class:`.DataWrapper` stores the detections of a *bb_binary* repository as
+columns in :obj:`np.array` objects instead of :obj:`.Detection` objects. A :obj:`.Detection` with
+its id, a list with the id bits and a meta dictionary takes several hundred bytes, a row in the
+columns only a few dozen bytes.
+
+The :obj:`.Detection` objects are built when they are requested, e.g. via
+:meth:`DataWrapperColumnar.get_frame_objects`. Use :meth:`DataWrapperColumnar.get_frame_columns`
+to access the features of a frame without building any objects.
+
+The columns can be cached on disk with `cache_dir`. Later constructions with the same repository
+path, ``iter_frames`` keyword arguments and `meta_keys` memory-map the cached columns instead of
+parsing the repository, so the pages are shared between processes.
+"""
+from collections import namedtuple, OrderedDict
+import hashlib
+import os
+import shutil
+import numpy as np
+from six import PY3, string_types
+from six.moves import cPickle as pickle
+from .constants import CAMKEY
+from .datastructures import Detection
+from .datawrapper_binary import DataWrapperBinary
+from .detection_ids import format_detection_id, format_detection_ids, pack_detection_id, \
+    pack_detection_ids, unpack_detection_id
+
+FrameColumns = namedtuple('FrameColumns', ['rows', 'x', 'y', 'orientation', 'beeId'])
+if PY3:
+    FrameColumns.__doc__ = """
+:obj:`FrameColumns` are views on the columns of the detections of one frame.
+
+Attributes:
+    rows (:obj:`np.array`): rows of the detections in the columns of :class:`DataWrapperColumnar`
+    x (:obj:`np.array`): x positions in image coordinates
+    y (:obj:`np.array`): y positions in image coordinates
+    orientation (:obj:`np.array`): orientations of the tags
+    beeId (:obj:`np.array`): uint8 matrix with the decoded id bits (``0`` to ``255``) in each row
+"""
+
+_CACHE_VERSION = 2
+"""int: version of the cache layout, part of the cache key"""
+
+
+def get_cache_key(repository, meta_keys, kwargs):
+    """Generates the key of the cached columns of a repository.
+
+    Note:
+        The key only depends on the path of the repository. Remove the cache directory if the
+        frame containers in the repository change.
+
+    Arguments:
+        repository (:class:`bb_binary.Repository`): *bb_binary* Repository with detections
+        meta_keys (Optional :obj:`dict`): ``{detecion_key: meta_key}`` mapping
+        kwargs (:obj:`dict`): keyword arguments for :func:`Repository.iter_frames()`
+
+    Returns:
+        str: hex digest of the repository path, `meta_keys` and `kwargs`
+    """
+    key = repr((_CACHE_VERSION, os.path.abspath(repository.root_dir),
+                sorted((meta_keys or dict()).items()), sorted(kwargs.items())))
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()
+
+
+class DataWrapperColumnar(DataWrapperBinary):
+    """Class for memory efficient access to detections via *bb_binary* :class:`Repository`.
+
+    The detection ids are the same as in :class:`.DataWrapperBinary`. The frames are numbered in
+    the order they are read from the repository, the detections of a frame are consecutive rows
+    in the columns.
+    """
+    frame_keys = None
+    """:obj:`list`: ``(cam_id, timestamp)`` of each frame number"""
+    frame_numbers = None
+    """:obj:`dict`: ``{(cam_id, timestamp): frame number}`` mapping"""
+    frame_offsets = None
+    """:obj:`np.array`: the rows of the frame with number ``i`` are
+    ``frame_offsets[i]:frame_offsets[i + 1]``"""
+    frame_ids = None
+    """:obj:`np.array`: *bb_binary* id of each frame number"""
+    frame_cam_ids = None
+    """:obj:`np.array`: camera id of each frame number"""
+    frame_indices = None
+    """:obj:`np.array`: index of each frame number in its video (``frameIdx`` in the schema)"""
+    detection_frames = None
+    """:obj:`np.array`: frame number of each detection"""
+    detection_idx = None
+    """:obj:`np.array`: index of each detection in its frame (``idx`` in the schema)"""
+    x = None
+    """:obj:`np.array`: uint16 x position of each detection, like ``xpos`` in the schema"""
+    y = None
+    """:obj:`np.array`: uint16 y position of each detection, like ``ypos`` in the schema"""
+    orientation = None
+    """:obj:`np.array`: orientation of each detection"""
+    bee_ids = None
+    """:obj:`np.array`: uint8 matrix with the decoded id bits of each detection"""
+    meta_columns = None
+    """:obj:`dict`: ``{meta_key: np.array}`` mapping with the requested meta fields"""
+
+    def __init__(self, repository, meta_keys=None, workers=None, int_ids=False, uint8_ids=False,
+                 cache_dir=None, **kwargs):
+        """Necessary initialization to organize detection data.
+
+        Arguments:
+            repository (:class:`bb_binary.Repository`): *bb_binary* Repository with detections
+
+        Keyword Arguments:
+            meta_keys (Optional :obj:`dict`): ``{detecion_key: meta_key}`` mapping that is added
+                as meta field in detections (detection fields defined in the *bb_binary* schema)
+            workers (Optional int): number of processes to decode the frame containers
+            int_ids (Optional bool): use packed integers instead of strings as detection ids
+            uint8_ids (Optional bool): build :obj:`.Detection` objects with rows of
+                :attr:`bee_ids` as :attr:`.Detection.beeId`
+            cache_dir (Optional str): directory to cache the columns in, see
+                :func:`get_cache_key`
+            **kwargs (:obj:`dict`): keyword arguments for :func:`Repository.iter_frames()`
+        """
+        # pylint:disable=super-init-not-called
+        self.int_ids = int_ids
+        self.uint8_ids = uint8_ids
+        self.frame_trees = OrderedDict()
+        cache_path = None
+        if cache_dir is not None:
+            cache_path = os.path.join(cache_dir, get_cache_key(repository, meta_keys, kwargs))
+            if os.path.isdir(cache_path):
+                self._load_cache(cache_path)
+                return
+
+        self.frame_keys = list()
+        self.frame_numbers = dict()
+        self._frame_lookup = dict()
+        self._chunks = dict(frame_ids=[], frame_cam_ids=[], frame_indices=[], n_detections=[],
+                            detection_idx=[], x=[], y=[], orientation=[], bee_ids=[],
+                            meta=dict((mkey, []) for mkey in (meta_keys or dict()).values()))
+        self._read_repository(repository, meta_keys, workers=workers, **kwargs)
+        self._concatenate_chunks()
+        assert len(self.x) > 0, "Repository is empty."
+        if cache_path is not None:
+            self._save_cache(cache_path)
+
+    _cache_columns = ('frame_ids', 'frame_cam_ids', 'frame_indices', 'frame_offsets',
+                      'detection_frames', 'detection_idx', 'x', 'y', 'orientation', 'bee_ids')
+    """tuple: attributes that are saved as ``.npy`` files in a cache directory"""
+    _cache_index = 'index.pkl'
+    """str: file name of the frame keys and timestamps in a cache directory"""
+
+    def _save_cache(self, cache_path):
+        """Saves the columns to `cache_path`.
+
+        The files are written to a temporary directory that is renamed to `cache_path`, so
+        concurrent constructions never read an incomplete cache.
+
+        Arguments:
+            cache_path (str): directory for the cached columns
+        """
+        tmp_path = '{}.tmp{}'.format(cache_path, os.getpid())
+        if os.path.isdir(tmp_path):
+            shutil.rmtree(tmp_path)
+        os.makedirs(tmp_path)
+        for name in self._cache_columns:
+            np.save(os.path.join(tmp_path, name + '.npy'), getattr(self, name))
+        meta_keys = list(self.meta_columns.keys())
+        for i, mkey in enumerate(meta_keys):
+            np.save(os.path.join(tmp_path, 'meta{}.npy'.format(i)), self.meta_columns[mkey])
+        index = dict(frame_keys=self.frame_keys, meta_keys=meta_keys, cam_ids=self.cam_ids,
+                     timestamps=self.timestamps, cam_timestamps=self.cam_timestamps)
+        with open(os.path.join(tmp_path, self._cache_index), 'wb') as index_file:
+            pickle.dump(index, index_file, pickle.HIGHEST_PROTOCOL)
+        try:
+            os.rename(tmp_path, cache_path)
+        except OSError:
+            # another process has written the same cache in the meantime
+            shutil.rmtree(tmp_path)
+
+    def _load_cache(self, cache_path):
+        """Memory-maps the columns saved by :meth:`_save_cache`.
+
+        Arguments:
+            cache_path (str): directory with the cached columns
+        """
+        with open(os.path.join(cache_path, self._cache_index), 'rb') as index_file:
+            index = pickle.load(index_file)
+        for name in self._cache_columns:
+            setattr(self, name, np.load(os.path.join(cache_path, name + '.npy'), mmap_mode='r'))
+        self.meta_columns = {
+            mkey: np.load(os.path.join(cache_path, 'meta{}.npy'.format(i)), mmap_mode='r')
+            for i, mkey in enumerate(index['meta_keys'])}
+        self.cam_ids = index['cam_ids']
+        self.timestamps = index['timestamps']
+        self.cam_timestamps = index['cam_timestamps']
+        self.frame_keys = index['frame_keys']
+        self.frame_numbers = {frame_key: i for i, frame_key in enumerate(self.frame_keys)}
+        self._frame_lookup = {frame_key: i for i, frame_key in enumerate(zip(
+            self.frame_ids.tolist(), self.frame_cam_ids.tolist()))}
+
+    def _add_frame(self, cam_id, frame):
+        """Helper to append the detections of a frame to the chunks of the columns.
+
+        Arguments:
+            cam_id (int): the id of the camera this frame belongs to
+            frame (:obj:`dict`): the frame as decoded by :func:`.decode_frame`
+        """
+        frame_key = (cam_id, frame['timestamp'])
+        assert frame_key not in self.frame_numbers, "Duplicate frame {}".format(frame_key)
+        self.frame_numbers[frame_key] = len(self.frame_keys)
+        self._frame_lookup[(frame['id'], cam_id)] = len(self.frame_keys)
+        self.frame_keys.append(frame_key)
+
+        chunks = self._chunks
+        chunks['frame_ids'].append(frame['id'])
+        chunks['frame_cam_ids'].append(cam_id)
+        chunks['frame_indices'].append(frame['frame_idx'])
+        chunks['n_detections'].append(len(frame['idx']))
+        if len(frame['idx']) == 0:
+            return
+
+        chunks['detection_idx'].append(frame['idx'].astype(np.uint16))
+        # the positions stay integers, so the detections are the same as in DataWrapperBinary
+        chunks['x'].append(frame['x'].astype(np.uint16))
+        chunks['y'].append(frame['y'].astype(np.uint16))
+        chunks['orientation'].append(frame['orientation'].astype(np.float32))
+        chunks['bee_ids'].append(frame['bee_ids'])
+        for mkey, values in frame['meta'].items():
+            chunks['meta'][mkey].append(values)
+
+    def _concatenate_chunks(self):
+        """Helper to concatenate the arrays of the frames to the columns."""
+        chunks = self._chunks
+        del self._chunks
+        self.frame_ids = np.array(chunks['frame_ids'], dtype=np.uint64)
+        self.frame_cam_ids = np.array(chunks['frame_cam_ids'], dtype=int)
+        self.frame_indices = np.array(chunks['frame_indices'], dtype=int)
+        n_detections = np.array(chunks['n_detections'], dtype=int)
+        self.frame_offsets = np.concatenate(([0], np.cumsum(n_detections)))
+        self.detection_frames = np.repeat(np.arange(len(n_detections), dtype=np.int32),
+                                          n_detections)
+
+        def concatenate(arrays, dtype):
+            """Concatenates the arrays of the frames with detections."""
+            if len(arrays) == 0:
+                return np.empty(0, dtype=dtype)
+            return np.concatenate(arrays)
+        self.detection_idx = concatenate(chunks['detection_idx'], np.uint16)
+        self.x = concatenate(chunks['x'], np.uint16)
+        self.y = concatenate(chunks['y'], np.uint16)
+        self.orientation = concatenate(chunks['orientation'], np.float32)
+        self.bee_ids = concatenate(chunks['bee_ids'], np.uint8)
+        self.meta_columns = {mkey: concatenate(arrays, float)
+                             for mkey, arrays in chunks['meta'].items()}
+
+    def _make_id(self, frame_number, detection_idx):
+        """Generates the id of a detection in the same format as :class:`.DataWrapperBinary`.
+
+        Arguments:
+            frame_number (int): the number of the frame
+            detection_idx (int): the index of the detection in its frame
+
+        Returns:
+            str or int: the detection id
+        """
+        make_id = pack_detection_id if self.int_ids else format_detection_id
+        return make_id(self.frame_ids[frame_number], detection_idx,
+                       self.frame_cam_ids[frame_number])
+
+    def _get_row(self, detection_id):
+        """Helper to get the row of a detection in the columns.
+
+        Arguments:
+            detection_id (str or int): the id of the detection
+
+        Returns:
+            int: the row of the detection
+        """
+        if self.int_ids == isinstance(detection_id, string_types):
+            raise KeyError(detection_id)
+        try:
+            frame_id, detection_idx, cam_id = unpack_detection_id(detection_id)
+        except (TypeError, ValueError):
+            raise KeyError(detection_id)
+        frame_number = self._frame_lookup.get((frame_id, cam_id))
+        if frame_number is None:
+            raise KeyError(detection_id)
+        begin, end = self.frame_offsets[frame_number], self.frame_offsets[frame_number + 1]
+        rows = np.flatnonzero(self.detection_idx[begin:end] == detection_idx)
+        if len(rows) == 0:
+            raise KeyError(detection_id)
+        return begin + rows[0]
+
+    def _make_detections(self, rows):
+        """Builds the :obj:`.Detection` objects of `rows`.
+
+        Arguments:
+            rows (iterable of int): the rows of the detections
+
+        Returns:
+            :obj:`list` of :obj:`.Detection`: the detections in the order of `rows`
+        """
+        rows = np.asarray(rows, dtype=int)
+        frame_numbers = self.detection_frames[rows].tolist()
+        meta_values = [(mkey, column[rows].tolist()) for mkey, column in self.meta_columns.items()]
+        bee_ids = self.bee_ids[rows] if self.uint8_ids else (self.bee_ids[rows] / 255.).tolist()
+        detections = []
+        for i, (frame_number, detection_idx, x, y, orientation, bee_id) in enumerate(zip(
+                frame_numbers, self.detection_idx[rows].tolist(), self.x[rows].tolist(),
+                self.y[rows].tolist(), self.orientation[rows].tolist(), bee_ids)):
+            cam_id, timestamp = self.frame_keys[frame_number]
+            meta = {mkey: values[i] for mkey, values in meta_values}
+            meta[CAMKEY] = cam_id
+            detections.append(Detection(id=self._make_id(frame_number, detection_idx),
+                                        timestamp=timestamp, x=x, y=y, orientation=orientation,
+                                        beeId=bee_id, meta=meta))
+        return detections
+
+    def get_detection(self, detection_id):
+        return self._make_detections([self._get_row(detection_id)])[0]
+
+    def get_detections(self, detection_ids):
+        return self._make_detections([self._get_row(d_id) for d_id in detection_ids])
+
+    def get_frame_objects(self, cam_id=None, timestamp=None):
+        cam_id = cam_id or self.cam_ids[0]
+        timestamp = timestamp or self.cam_timestamps[cam_id][0]
+        frame_number = self.frame_numbers[(cam_id, timestamp)]
+        return self._make_detections(np.arange(self.frame_offsets[frame_number],
+                                               self.frame_offsets[frame_number + 1]))
+
+    def get_frame_columns(self, cam_id, timestamp):
+        """Gets views on the columns of the detections in a frame.
+
+        Arguments:
+            cam_id (int): the cam to consider
+            timestamp (timestamp): the timestamp of the frame
+
+        Returns:
+            :obj:`FrameColumns`: the features of the detections in the order of
+            :meth:`get_frame_objects`
+        """
+        frame_number = self.frame_numbers[(cam_id, timestamp)]
+        rows = slice(self.frame_offsets[frame_number], self.frame_offsets[frame_number + 1])
+        return FrameColumns(rows=np.arange(rows.start, rows.stop), x=self.x[rows], y=self.y[rows],
+                            orientation=self.orientation[rows], beeId=self.bee_ids[rows])
+
+    def _get_frame_positions(self, frame_key):
+        frame_number = self.frame_numbers.get(frame_key)
+        if frame_number is None:
+            return None
+        rows = slice(self.frame_offsets[frame_number], self.frame_offsets[frame_number + 1])
+        if rows.start == rows.stop:
+            return None
+        return np.column_stack((self.x[rows], self.y[rows]))
+
+    def _get_frame_detections(self, frame_key, indices):
+        begin = self.frame_offsets[self.frame_numbers[frame_key]]
+        return self._make_detections(begin + np.asarray(indices, dtype=int))
+
+    def _get_frame_ids(self, frame_key):
+        frame_number = self.frame_numbers[frame_key]
+        rows = slice(self.frame_offsets[frame_number], self.frame_offsets[frame_number + 1])
+        make_ids = pack_detection_ids if self.int_ids else format_detection_ids
+        return np.array(make_ids(self.frame_ids[frame_number], self.detection_idx[rows],
+                                 self.frame_cam_ids[frame_number]),
+                        dtype=np.uint64 if self.int_ids else None)
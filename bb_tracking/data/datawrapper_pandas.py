@@ -229,12 +229,7 @@ class DataWrapperPandas(DataWrapper):
         return self.get_detections(frame[self.cols['id']].values)
 
     def get_neighbors(self, frame_object, cam_id, radius=10, timestamp=None):
-        if isinstance(frame_object, Track):
-            detection = self.get_detection(frame_object.ids[-1])
-        elif isinstance(frame_object, Detection):
-            detection = frame_object
-        else:
-            raise TypeError("Type {0} not supported.".format(type(frame_object)))
+        detection = self._get_query_detection(frame_object)
         # determine search parameters
         timestamp = timestamp or detection.timestamp
 
@@ -248,6 +243,36 @@ class DataWrapperPandas(DataWrapper):
         ids = index[indices]
         return self.get_detections(ids[ids != detection.id].tolist())
 
+    def get_neighbors_bulk(self, frame_objects, cam_id, radius, timestamp, points=None):
+        tree, index = self._get_tree(cam_id, timestamp)
+        if index is None or len(frame_objects) == 0:
+            return np.empty(0, dtype=int), np.empty(0, dtype=int)
+        detections = [self._get_query_detection(frame_object) for frame_object in frame_objects]
+        if points is None:
+            points = [(detection.x, detection.y) for detection in detections]
+        neighbors = tree.query_ball_point(points, radius)
+        query_indices, candidate_indices = self._flatten_neighbors(neighbors)
+
+        # remove search items
+        query_ids = np.array([detection.id for detection in detections])
+        mask = index[candidate_indices] != query_ids[query_indices]
+        return query_indices[mask], candidate_indices[mask]
+
+    def _get_query_detection(self, frame_object):
+        """Helper to get the :obj:`.Detection` to search the neighborhood of `frame_object`.
+
+        Arguments:
+            frame_object (:obj:`.Detection` or :obj:`.Track`): frame object to search neighborhood
+
+        Returns:
+            :obj:`.Detection`: the detection itself or the last detection of a track
+        """
+        if isinstance(frame_object, Track):
+            return self.get_detection(frame_object.ids[-1])
+        elif isinstance(frame_object, Detection):
+            return frame_object
+        raise TypeError("Type {0} not supported.".format(type(frame_object)))
+
     def get_timestamps(self, cam_id=None):
         if cam_id is None:
             timestamps = self.detections[self.cols['timestamp']].unique()
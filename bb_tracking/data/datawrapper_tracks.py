@@ -10,6 +10,7 @@ Sometimes it is necessary to have additional information about detections for tr
 validation purposes. So it is posssible to inject another instance of :class:`.DataWrapper` and
 :class:`.DataWrapperTracks` will delegate tasks it can not fullfill to this instance.
 """
+import numpy as np
 from scipy.spatial import cKDTree
 from .constants import CAMKEY, DETKEY
 from .datastructures import Detection, Track
@@ -32,6 +33,9 @@ class DataWrapperTracks(DataWrapper):
     """:obj:`dict`: ``{(cam_id, timestamp): list of track}`` :obj:`.Track` ends in frame"""
     frame_track_start = None
     """:obj:`dict`: ``{(cam_id, timestamp): list of track}`` :obj:`.Track` starts in frame"""
+    cam_timestamps_starting = None
+    """:obj:`dict`: ``{cam_id: sorted list of timestamps}`` mapping with the frames that have
+    :obj:`.Track` starts"""
     frame_trees = None
     """:obj:`dict`: ``{(cam_id, timestamp): KDTree}`` mapping"""
     timestamps = None
@@ -75,17 +79,22 @@ class DataWrapperTracks(DataWrapper):
 
         # fill track dictionaries
         self.tracks = dict()
+        timestamps_starting = {cam_id: set() for cam_id in self.cam_ids}
         for track in tracks:
             assert track.id not in self.tracks.keys(), "Duplicate track ids."
             self.tracks[track.id] = track
             cam_id_start = list(self.get_camids(frame_object=track.meta[DETKEY][0]))[0]
             time_start = track.timestamps[0]
             self.frame_track_start[(cam_id_start, time_start)].append(track)
+            timestamps_starting[cam_id_start].add(time_start)
 
             cam_id_end = list(self.get_camids(frame_object=track.meta[DETKEY][-1]))[0]
             time_end = track.timestamps[-1]
             self.frame_track_end[(cam_id_end, time_end)].append(track)
 
+        self.cam_timestamps_starting = {cam_id: sorted(cam_timestamps)
+                                        for cam_id, cam_timestamps in timestamps_starting.items()}
+
         # precalculate kd-trees
         self.frame_trees = dict()
         for frame_key, tracks in self.frame_track_start.items():
@@ -160,18 +169,20 @@ class DataWrapperTracks(DataWrapper):
         timestamp = timestamp or self.cam_timestamps[cam_id][0]
         return self.frame_track_start[(cam_id, timestamp)]
 
+    def get_timestamps_starting(self, cam_id):
+        """Gets the timestamps of the frames on `cam_id` with :obj:`.Track` starts.
+
+        Arguments:
+            cam_id (int): the id of the camera
+
+        Returns:
+            :obj:`list` of timestamps: sorted timestamps with non empty
+            :meth:`get_frame_objects_starting`
+        """
+        return self.cam_timestamps_starting[cam_id]
+
     def get_neighbors(self, frame_object, cam_id, radius=10, timestamp=None):
-        if isinstance(frame_object, Track):
-            if DETKEY in frame_object.meta.keys():
-                detection = frame_object.meta[DETKEY][-1]
-            elif self.data is not None:
-                detection = self.get_detection(frame_object.ids[-1])
-            else:
-                raise TypeError("Track without detections not supported.")
-        elif isinstance(frame_object, Detection):
-            detection = frame_object
-        else:
-            raise TypeError("Type {0} not supported.".format(type(frame_object)))
+        detection = self._get_query_detection(frame_object)
         # determine search parameters
         timestamp = timestamp or detection.timestamp
         frame_key = (cam_id, timestamp)
@@ -189,6 +200,50 @@ class DataWrapperTracks(DataWrapper):
             found = [track for track in found if track.id != frame_object.id]
         return found
 
+    def get_neighbors_bulk(self, frame_objects, cam_id, radius, timestamp, points=None):
+        frame_key = (cam_id, timestamp)
+        if frame_key not in self.frame_trees or len(frame_objects) == 0:
+            return np.empty(0, dtype=int), np.empty(0, dtype=int)
+        detections = [self._get_query_detection(frame_object) for frame_object in frame_objects]
+        if points is None:
+            points = [(detection.x, detection.y) for detection in detections]
+        neighbors = self.frame_trees[frame_key].query_ball_point(points, radius)
+        query_indices, candidate_indices = self._flatten_neighbors(neighbors)
+
+        # remove search items, only tracks starting in the same frame can find themselves
+        same_frame = np.array([detection.timestamp == timestamp and
+                               isinstance(frame_object, Track)
+                               for detection, frame_object in zip(detections, frame_objects)],
+                              dtype=bool)
+        if np.any(same_frame[query_indices]):
+            # the ids of tracks and detections might have different types
+            query_ids = np.array([frame_object.id for frame_object in frame_objects],
+                                 dtype=object)
+            candidate_ids = np.array([track.id for track in self.frame_track_start[frame_key]],
+                                     dtype=object)[candidate_indices]
+            mask = ~same_frame[query_indices] | (candidate_ids != query_ids[query_indices])
+            query_indices, candidate_indices = query_indices[mask], candidate_indices[mask]
+        return query_indices, candidate_indices
+
+    def _get_query_detection(self, frame_object):
+        """Helper to get the :obj:`.Detection` to search the neighborhood of `frame_object`.
+
+        Arguments:
+            frame_object (:obj:`.Detection` or :obj:`.Track`): frame object to search neighborhood
+
+        Returns:
+            :obj:`.Detection`: the detection itself or the last detection of a track
+        """
+        if isinstance(frame_object, Track):
+            if DETKEY in frame_object.meta.keys():
+                return frame_object.meta[DETKEY][-1]
+            elif self.data is not None:
+                return self.get_detection(frame_object.ids[-1])
+            raise TypeError("Track without detections not supported.")
+        elif isinstance(frame_object, Detection):
+            return frame_object
+        raise TypeError("Type {0} not supported.".format(type(frame_object)))
+
     def get_timestamps(self, cam_id=None):
         if cam_id is not None:
             return self.cam_timestamps[cam_id]
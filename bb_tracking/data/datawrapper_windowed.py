@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+"""
+This implementation of :class:`.DataWrapper` only keeps a window of frames of a *bb_binary*
+repository in memory. The frames of each camera are loaded when they are requested and the oldest
+frames are removed once the window is full.
+
+The walkers request the frames of a camera in time order and only look back
+:attr:`.SimpleWalker.frame_diff` frames, so a window of ``frame_diff + 1`` frames is enough to
+walk through a repository of any length.
+"""
+from collections import deque, OrderedDict
+from .datawrapper_binary import decode_frame, DataWrapperBinary
+
+
+class DataWrapperWindowed(DataWrapperBinary):
+    """Class for access to detections via *bb_binary* :class:`Repository` with bounded memory.
+
+    Only the timestamps of all frames are read on initialization. The detections are the same as
+    in :class:`.DataWrapperBinary`, but the detections of frames outside of the window are not
+    available via :meth:`get_detection`.
+
+    Note:
+        The frames of a camera are read by a single iterator and the window is changed on every
+        request without locking. So the wrapper can not be shared by threads or by walks of
+        different time windows of the same camera. :meth:`.SimpleWalker.calc_tracks` rejects
+        `shards` and thread `workers` for this wrapper, process `workers` walk each camera on
+        their own copy of the wrapper.
+    """
+    window_size = None
+    """int: number of frames per camera that are kept"""
+    repository = None
+    """:class:`bb_binary.Repository`: the repository the frames are loaded from"""
+    meta_keys = None
+    """:obj:`dict`: ``{detecion_key: meta_key}`` mapping that is added as meta field in
+    detections"""
+    iter_kwargs = None
+    """:obj:`dict`: keyword arguments for :func:`Repository.iter_frames()`"""
+    cam_windows = None
+    """:obj:`dict`: ``{cam_id: deque of timestamps}`` mapping with the loaded frames"""
+
+    def __init__(self, repository, window_size, meta_keys=None, int_ids=False, uint8_ids=False,
+                 **kwargs):
+        """Initialization with the timestamps of a repository.
+
+        Arguments:
+            repository (:class:`bb_binary.Repository`): *bb_binary* Repository with detections
+            window_size (int): number of frames per camera that are kept
+
+        Keyword Arguments:
+            meta_keys (Optional :obj:`dict`): ``{detecion_key: meta_key}`` mapping that is added
+                as meta field in detections (detection fields defined in the *bb_binary* schema)
+            int_ids (Optional bool): use packed integers instead of strings as detection ids
+            uint8_ids (Optional bool): keep the id bits as uint8 arrays
+            **kwargs (:obj:`dict`): keyword arguments for :func:`Repository.iter_frames()`
+                without `cam`
+        """
+        # pylint:disable=super-init-not-called
+        assert window_size > 0, "At least one frame has to be kept."
+        self.window_size = window_size
+        self.int_ids = int_ids
+        self.uint8_ids = uint8_ids
+        self.repository = repository
+        self.meta_keys = meta_keys or dict()
+        self.iter_kwargs = kwargs
+        self.detections_dict = dict()
+        self.frame_detections = dict()
+        self.frame_trees = OrderedDict()
+        self.cam_windows = dict()
+        self._cam_frames = dict()
+        self._read_repository(repository, meta_keys, load_detections=False, **kwargs)
+        assert len(self.timestamps) > 0, "Repository is empty."
+
+    def _load_frame(self, cam_id, timestamp):
+        """Loads the frames of a camera up to `timestamp` and removes frames outside the window.
+
+        If `timestamp` is before the window the frames are read again starting at `timestamp`.
+
+        Arguments:
+            cam_id (int): the id of the camera
+            timestamp (timestamp): the timestamp of the frame
+        """
+        if (cam_id, timestamp) in self.frame_detections or cam_id not in self.cam_timestamps or \
+           timestamp not in self.get_time_index(cam_id=cam_id):
+            return
+        window = self.cam_windows.setdefault(cam_id, deque())
+        if len(window) > 0 and timestamp < window[0]:
+            self._remove_frames(cam_id, len(window))
+            del self._cam_frames[cam_id]
+        if cam_id not in self._cam_frames:
+            # the window is empty, so no frame before timestamp is needed
+            kwargs = dict(self.iter_kwargs, begin=timestamp)
+            self._cam_frames[cam_id] = iter(self.repository.iter_frames(cam=cam_id, **kwargs))
+
+        frames = self._cam_frames[cam_id]
+        while len(window) == 0 or window[-1] < timestamp:
+            frame, _ = next(frames, (None, None))
+            if frame is None:
+                break
+            if len(window) == self.window_size:
+                self._remove_frames(cam_id, 1)
+            self._add_frame(cam_id, decode_frame(frame, self.meta_keys))
+            window.append(frame.timestamp)
+
+    def _remove_frames(self, cam_id, n_frames):
+        """Removes the oldest frames of a camera with all their detections.
+
+        Arguments:
+            cam_id (int): the id of the camera
+            n_frames (int): the number of frames to remove
+        """
+        window = self.cam_windows[cam_id]
+        for _ in range(n_frames):
+            frame_key = (cam_id, window.popleft())
+            for detection in self.frame_detections.pop(frame_key):
+                del self.detections_dict[detection.id]
+            self.frame_trees.pop(frame_key, None)
+
+    def get_frame_objects(self, cam_id=None, timestamp=None):
+        cam_id = cam_id or self.cam_ids[0]
+        timestamp = timestamp or self.cam_timestamps[cam_id][0]
+        self._load_frame(cam_id, timestamp)
+        return self.frame_detections[(cam_id, timestamp)]
+
+    def get_neighbors(self, frame_object, cam_id, radius=10, timestamp=None):
+        timestamp = timestamp or self._get_query_detection(frame_object).timestamp
+        self._load_frame(cam_id, timestamp)
+        return super(DataWrapperWindowed, self).get_neighbors(frame_object, cam_id, radius=radius,
+                                                              timestamp=timestamp)
+
+    def get_neighbors_bulk(self, frame_objects, cam_id, radius, timestamp, points=None):
+        self._load_frame(cam_id, timestamp)
+        return super(DataWrapperWindowed, self).get_neighbors_bulk(frame_objects, cam_id, radius,
+                                                                   timestamp, points=points)
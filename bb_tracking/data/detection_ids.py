@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+"""Provides helpers for the ids of detections from *bb_binary* repositories.
+
+The *bb_binary* DataWrappers identify a detection by the id of its frame, its index in the frame
+and the id of its camera. The legacy form of the id is the string ``'f{frame}d{idx}c{cam}'``.
+With ``int_ids=True`` the same triple is packed into a single integer instead, which is cheaper to
+hash, to compare and to store in :attr:`.Track.ids`.
+
+The packed id uses the lowest :data:`CAM_BITS` bits for the camera, the next :data:`IDX_BITS`
+bits for the index and the remaining :data:`FRAME_BITS` bits for the frame id.
+"""
+import re
+import numpy as np
+from six import string_types
+
+CAM_BITS = 8
+"""int: number of bits for the camera id in a packed id"""
+IDX_BITS = 16
+"""int: number of bits for the index of the detection in a packed id"""
+FRAME_BITS = 40
+"""int: number of bits for the frame id in a packed id"""
+
+_STR_ID = re.compile(r'^f(\d+)d(\d+)c(\d+)$')
+""":obj:`re.RegexObject`: pattern of the legacy string ids"""
+
+
+def pack_detection_id(frame_id, detection_idx, cam_id):
+    """Packs the frame id, detection index and camera id into an integer id.
+
+    Arguments:
+        frame_id (int): *bb_binary* id of the frame
+        detection_idx (int): index of the detection in its frame
+        cam_id (int): the id of the camera
+
+    Returns:
+        int: the packed detection id
+
+    Raises:
+        ValueError: if one of the values does not fit in its bits
+    """
+    frame_id, detection_idx, cam_id = int(frame_id), int(detection_idx), int(cam_id)
+    if not (0 <= frame_id < 1 << FRAME_BITS and 0 <= detection_idx < 1 << IDX_BITS and
+            0 <= cam_id < 1 << CAM_BITS):
+        raise ValueError("Detection f{}d{}c{} can not be packed.".format(
+            frame_id, detection_idx, cam_id))
+    return (frame_id << (IDX_BITS + CAM_BITS)) | (detection_idx << CAM_BITS) | cam_id
+
+
+def pack_detection_ids(frame_id, detection_indices, cam_id):
+    """Packs the ids of all detections of a frame at once.
+
+    Same as :func:`pack_detection_id` for each index in `detection_indices`.
+
+    Arguments:
+        frame_id (int): *bb_binary* id of the frame
+        detection_indices (:obj:`np.array`): indices of the detections in their frame
+        cam_id (int): the id of the camera
+
+    Returns:
+        :obj:`list` of int: the packed detection ids
+
+    Raises:
+        ValueError: if one of the values does not fit in its bits
+    """
+    frame_id, cam_id = int(frame_id), int(cam_id)
+    detection_indices = np.asarray(detection_indices, dtype=np.int64)
+    if not (0 <= frame_id < 1 << FRAME_BITS and 0 <= cam_id < 1 << CAM_BITS and
+            np.all((detection_indices >= 0) & (detection_indices < 1 << IDX_BITS))):
+        raise ValueError("Detections of frame {} and cam {} can not be packed.".format(
+            frame_id, cam_id))
+    # 64 bits in total, so the ids are packed as unsigned integers
+    offset = np.uint64((frame_id << (IDX_BITS + CAM_BITS)) | cam_id)
+    return (offset | (detection_indices.astype(np.uint64) << np.uint64(CAM_BITS))).tolist()
+
+
+def unpack_detection_id(detection_id):
+    """Splits an id in the frame id, detection index and camera id.
+
+    Arguments:
+        detection_id (int or str): the packed or the legacy string id
+
+    Returns:
+        tuple: ``(frame_id, detection_idx, cam_id)``
+
+    Raises:
+        ValueError: if `detection_id` is not a valid id
+    """
+    if isinstance(detection_id, string_types):
+        match = _STR_ID.match(detection_id)
+        if match is None:
+            raise ValueError("Invalid detection id {}.".format(detection_id))
+        return tuple(int(value) for value in match.groups())
+    detection_id = int(detection_id)
+    if not 0 <= detection_id < 1 << (FRAME_BITS + IDX_BITS + CAM_BITS):
+        raise ValueError("Invalid detection id {}.".format(detection_id))
+    return (detection_id >> (IDX_BITS + CAM_BITS),
+            (detection_id >> CAM_BITS) & ((1 << IDX_BITS) - 1),
+            detection_id & ((1 << CAM_BITS) - 1))
+
+
+def format_detection_id(frame_id, detection_idx, cam_id):
+    """Formats the frame id, detection index and camera id as legacy string id.
+
+    Arguments:
+        frame_id (int): *bb_binary* id of the frame
+        detection_idx (int): index of the detection in its frame
+        cam_id (int): the id of the camera
+
+    Returns:
+        str: the detection id ``'f{frame}d{idx}c{cam}'``
+    """
+    return 'f{}d{}c{}'.format(frame_id, detection_idx, cam_id)
+
+
+def format_detection_ids(frame_id, detection_indices, cam_id):
+    """Formats the legacy string ids of all detections of a frame at once.
+
+    Same as :func:`format_detection_id` for each index in `detection_indices`.
+
+    Arguments:
+        frame_id (int): *bb_binary* id of the frame
+        detection_indices (:obj:`np.array`): indices of the detections in their frame
+        cam_id (int): the id of the camera
+
+    Returns:
+        :obj:`list` of str: the detection ids ``'f{frame}d{idx}c{cam}'``
+    """
+    prefix, suffix = 'f{}d'.format(frame_id), 'c{}'.format(cam_id)
+    return [prefix + str(detection_idx) + suffix
+            for detection_idx in np.asarray(detection_indices).tolist()]
+
+
+def detection_id_to_int(detection_id):
+    """Converts a legacy string id (or a packed id) to the packed integer id.
+
+    Arguments:
+        detection_id (int or str): the id to convert
+
+    Returns:
+        int: the packed detection id
+    """
+    return pack_detection_id(*unpack_detection_id(detection_id))
+
+
+def detection_id_to_str(detection_id):
+    """Converts a packed integer id (or a legacy string id) to the legacy string id.
+
+    Arguments:
+        detection_id (int or str): the id to convert
+
+    Returns:
+        str: the detection id ``'f{frame}d{idx}c{cam}'``
+    """
+    return format_detection_id(*unpack_detection_id(detection_id))
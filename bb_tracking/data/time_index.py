@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+"""Provides the :class:`TimeIndex` to map timestamps to their position in a sorted list.
+
+Every :class:`.DataWrapper` offers a :class:`TimeIndex` for all timestamps and for the
+timestamps of each camera via :meth:`.DataWrapper.get_time_index`.
+"""
+import numpy as np
+
+
+class TimeIndex(object):
+    """Sorted timestamps with fast lookup of their indices.
+
+    A :class:`TimeIndex` behaves like the sorted sequence of timestamps it is built from, so it
+    supports ``len()``, iteration and indexing. In addition to that it offers constant time
+    lookups of the index of a timestamp, vectorized lookups and slicing by time ranges.
+    """
+    timestamps = None
+    """iterable of timestamps: the sorted unique timestamps as given on initialization"""
+    array = None
+    """:obj:`np.array`: the timestamps as array for vectorized lookups"""
+
+    def __init__(self, timestamps):
+        """Initialization of a TimeIndex.
+
+        Arguments:
+            timestamps (iterable of timestamps): sorted unique timestamps
+        """
+        self.timestamps = timestamps
+        self.array = np.asarray(timestamps)
+        self._positions = {tstamp: idx for idx, tstamp in enumerate(timestamps)}
+        assert len(self._positions) == len(self.array), "Timestamps are not unique."
+
+    def __len__(self):
+        return len(self.array)
+
+    def __iter__(self):
+        return iter(self.timestamps)
+
+    def __getitem__(self, key):
+        return self.timestamps[key]
+
+    def __contains__(self, timestamp):
+        try:
+            self.index(timestamp)
+        except ValueError:
+            return False
+        return True
+
+    def index(self, timestamp):
+        """Returns the index of `timestamp`.
+
+        Arguments:
+            timestamp (timestamp): the timestamp to look up
+
+        Returns:
+            int: index of `timestamp` in :attr:`timestamps`
+
+        Raises:
+            ValueError: if `timestamp` is not in the index (like :meth:`list.index`)
+        """
+        try:
+            return self._positions[timestamp]
+        except (KeyError, TypeError):
+            # equal timestamps of another type might have a different hash
+            return int(self.get_indices([timestamp])[0])
+
+    def get_indices(self, timestamps):
+        """Returns the indices of all `timestamps` in one vectorized lookup.
+
+        Arguments:
+            timestamps (iterable of timestamps): the timestamps to look up
+
+        Returns:
+            :obj:`np.array`: indices of `timestamps` in :attr:`timestamps`
+
+        Raises:
+            ValueError: if one of the `timestamps` is not in the index
+        """
+        timestamps = np.asarray(timestamps)
+        indices = np.searchsorted(self.array, timestamps)
+        found = indices < len(self.array)
+        found[found] = self.array[indices[found]] == timestamps[found]
+        if not np.all(found):
+            raise ValueError("{0} is not in TimeIndex.".format(timestamps[~found][0]))
+        return indices
+
+    def get_range(self, start=None, stop=None):
+        """Returns the index range of the timestamps with ``start <= timestamp < stop``.
+
+        Keyword Arguments:
+            start (Optional timestamp): first timestamp in range, no restriction if :obj:`None`
+            stop (Optional timestamp): exclusive end of range, no restriction if :obj:`None`
+
+        Returns:
+            tuple: ``(start_idx, stop_idx)`` to slice :attr:`timestamps`
+        """
+        start_idx = 0 if start is None else int(np.searchsorted(self.array, start, side='left'))
+        stop_idx = len(self) if stop is None else int(np.searchsorted(self.array, stop,
+                                                                      side='left'))
+        return start_idx, max(start_idx, stop_idx)
+
+    def slice(self, start=None, stop=None):
+        """Returns the timestamps with ``start <= timestamp < stop``.
+
+        Keyword Arguments:
+            start (Optional timestamp): first timestamp in range, no restriction if :obj:`None`
+            stop (Optional timestamp): exclusive end of range, no restriction if :obj:`None`
+
+        Returns:
+            iterable of timestamps: slice of :attr:`timestamps`
+        """
+        start_idx, stop_idx = self.get_range(start=start, stop=stop)
+        return self.timestamps[start_idx:stop_idx]
@@ -9,18 +9,32 @@ from .scoring import bit_array_to_int_v, score_id_sim, score_id_sim_v,\
     score_id_sim_orientation, score_id_sim_orientation_v, \
     score_id_sim_rotating, score_id_sim_rotating_v, \
     score_id_sim_tracks_median_v, \
+    score_id_sim_uint8_v, score_id_sim_orientation_uint8_v, score_id_sim_rotating_uint8_v, \
+    score_id_sim_tracks_median_uint8_v, \
     distance_orientations, distance_orientations_v, distance_positions_v,\
-    calc_median_ids, calc_track_ids
+    calc_median_ids, calc_median_ids_uint8, calc_track_ids
 
 from .tracking import make_detection_score_fun, make_track_score_fun
 from .training import train_and_evaluate, train_bin_clf, generate_learning_data
 
 from .walker import SimpleWalker
+from .vectorized_walker import VectorizedWalker, make_array_score_fun
+from .online_walker import OnlineWalker
+from .windowed_walker import WindowedWalker
+from .hierarchical_walker import HierarchicalWalker
+from .motion import ConstantVelocityModel
+from .cascade import CascadeScoreFun, learn_cascade_bounds
+from .stats import WalkerStats
 
 __all__ = ['bit_array_to_int_v', 'score_id_sim', 'score_id_sim_v', 'score_id_sim_orientation',
            'score_id_sim_orientation_v', 'score_id_sim_rotating', 'score_id_sim_rotating_v',
-           'score_id_sim_tracks_median_v',
+           'score_id_sim_tracks_median_v', 'score_id_sim_uint8_v',
+           'score_id_sim_orientation_uint8_v', 'score_id_sim_rotating_uint8_v',
+           'score_id_sim_tracks_median_uint8_v',
            'distance_orientations', 'distance_orientations_v', 'distance_positions_v',
-           'calc_median_ids', 'calc_track_ids',
+           'calc_median_ids', 'calc_median_ids_uint8', 'calc_track_ids',
            'train_and_evaluate', 'train_bin_clf', 'generate_learning_data',
-           'make_detection_score_fun', 'make_track_score_fun', 'SimpleWalker']
+           'make_detection_score_fun', 'make_track_score_fun', 'SimpleWalker',
+           'VectorizedWalker', 'make_array_score_fun', 'OnlineWalker',
+           'WindowedWalker', 'HierarchicalWalker',
+           'ConstantVelocityModel', 'CascadeScoreFun', 'learn_cascade_bounds', 'WalkerStats']
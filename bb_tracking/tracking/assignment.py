@@ -0,0 +1,377 @@
+# -*- coding: utf-8 -*-
+"""Functions to resolve claims of waiting tracks on frame objects.
+
+A claim is a weighted pair of a waiting :obj:`.Track` (row) and a frame object (column). Resolving
+the claims is a minimum weight matching in a bipartite graph. Pairs without a claim are marked
+with `max_weight` in a cost matrix and are never part of the result.
+
+Note:
+    Claims are passed as three flat arrays ``(rows, cols, costs)`` like a sparse matrix in
+    coordinate format. Only claims with ``cost < max_weight`` are considered.
+
+All functions share the signature ``fun(rows, cols, costs, shape, max_weight)`` and return the
+assigned claims as ``(rows, cols)`` arrays. :func:`resolve_claims_dense` and
+:func:`resolve_claims_sparse` are exact. :func:`resolve_claims_auction` is exact up to a tolerance,
+a coarse tolerance and :func:`resolve_claims_greedy` trade optimality for speed.
+:func:`resolve_claims_auto` selects one of them by the number and density of the claims.
+"""
+import numpy as np
+from scipy.optimize import linear_sum_assignment
+from scipy.sparse import coo_matrix, csr_matrix
+from scipy.sparse.csgraph import connected_components
+try:
+    from scipy.sparse.csgraph import min_weight_full_bipartite_matching
+except ImportError:  # pragma: no cover
+    # only available in scipy >= 1.6
+    min_weight_full_bipartite_matching = None
+
+
+def resolve_claims_dense(rows, cols, costs, shape, max_weight):
+    """Resolves claims with :func:`linear_sum_assignment` on the full cost matrix.
+
+    Arguments:
+        rows (:obj:`np.array`): row indices of the claims
+        cols (:obj:`np.array`): column indices of the claims
+        costs (:obj:`np.array`): costs of the claims
+        shape (tuple): shape of the cost matrix
+        max_weight (float): weight that marks non assignable pairs
+
+    Returns:
+        tuple: ``(rows, cols)`` arrays with the assigned claims
+    """
+    cost_matrix = np.full(shape, max_weight)
+    cost_matrix[rows, cols] = costs
+    rows, cols = linear_sum_assignment(cost_matrix)
+    mask = cost_matrix[rows, cols] < max_weight
+    return rows[mask], cols[mask]
+
+
+def resolve_claims_sparse(rows, cols, costs, shape, max_weight, sparse_min_size=10000):
+    """Resolves claims for each connected component of the claim graph separately.
+
+    The claims between tracks and frame objects form a sparse bipartite graph. Each connected
+    component is solved on its own: components with a single row or a single column get their
+    cheapest claim, small components are solved in chunks with :func:`linear_sum_assignment` on
+    their blocks of the cost matrix and big ones with
+    :func:`scipy.sparse.csgraph.min_weight_full_bipartite_matching` if available.
+
+    The result has the same total weight as :func:`resolve_claims_dense`, so both are identical
+    unless there are several optimal assignments.
+
+    Arguments:
+        rows (:obj:`np.array`): row indices of the claims
+        cols (:obj:`np.array`): column indices of the claims
+        costs (:obj:`np.array`): costs of the claims
+        shape (tuple): shape of the cost matrix
+        max_weight (float): weight that marks non assignable pairs
+
+    Keyword Arguments:
+        sparse_min_size (int): components with at least this number of cells in their block of
+            the cost matrix are solved with the sparse solver
+
+    Returns:
+        tuple: ``(rows, cols)`` arrays with the assigned claims
+    """
+    rows, cols, costs = np.asarray(rows), np.asarray(cols), np.asarray(costs, dtype=float)
+    mask = costs < max_weight
+    rows, cols, costs = rows[mask], cols[mask], costs[mask]
+    if len(costs) == 0:
+        return np.empty(0, dtype=int), np.empty(0, dtype=int)
+
+    # label the connected components via the rows of their claims
+    n_rows, n_nodes = shape[0], shape[0] + shape[1]
+    graph = coo_matrix((np.ones(len(rows)), (rows, n_rows + cols)), shape=(n_nodes, n_nodes))
+    n_labels, labels = connected_components(graph, directed=False)
+    claim_labels = labels[rows]
+
+    # components with a single row or a single column assign their cheapest claim
+    row_counts = np.bincount(labels[np.unique(rows)], minlength=n_labels)
+    col_counts = np.bincount(labels[n_rows + np.unique(cols)], minlength=n_labels)
+    star = ((row_counts == 1) | (col_counts == 1))[claim_labels]
+    claims = np.flatnonzero(star)
+    claims = claims[np.lexsort((costs[claims], claim_labels[claims]))]
+    cheapest = np.ones(len(claims), dtype=bool)
+    cheapest[1:] = claim_labels[claims[1:]] != claim_labels[claims[:-1]]
+    result_rows, result_cols = [rows[claims[cheapest]]], [cols[claims[cheapest]]]
+
+    order = np.argsort(claim_labels[~star], kind='mergesort')
+    multiple = np.flatnonzero(~star)[order]
+    splits = np.flatnonzero(np.diff(claim_labels[multiple])) + 1
+    # small components are solved in chunks, their blocks in the cost matrix of a chunk stay
+    # independent because the claims between them are not assignable
+    chunks, chunk, chunk_rows, chunk_cols = [], [], 0, 0
+    for claims in np.split(multiple, splits) if len(multiple) > 0 else []:
+        label = claim_labels[claims[0]]
+        n_cells = (chunk_rows + row_counts[label]) * (chunk_cols + col_counts[label])
+        if len(chunk) > 0 and n_cells >= sparse_min_size:
+            chunks.append(np.concatenate(chunk))
+            chunk, chunk_rows, chunk_cols = [], 0, 0
+        chunk.append(claims)
+        chunk_rows += row_counts[label]
+        chunk_cols += col_counts[label]
+    if len(chunk) > 0:
+        chunks.append(np.concatenate(chunk))
+    for claims in chunks:
+        component_rows, component_cols = _resolve_component(
+            rows[claims], cols[claims], costs[claims], max_weight, sparse_min_size)
+        result_rows.append(component_rows)
+        result_cols.append(component_cols)
+    return np.concatenate(result_rows), np.concatenate(result_cols)
+
+
+def _resolve_component(rows, cols, costs, max_weight, sparse_min_size):
+    """Resolves the claims of one or several connected components of the claim graph.
+
+    Arguments:
+        rows (:obj:`np.array`): row indices of the claims
+        cols (:obj:`np.array`): column indices of the claims
+        costs (:obj:`np.array`): costs of the claims, all smaller than `max_weight`
+        max_weight (float): weight that marks non assignable pairs
+        sparse_min_size (int): minimum block size to use the sparse solver
+
+    Returns:
+        tuple: ``(rows, cols)`` arrays with the assigned claims
+    """
+    unique_rows, local_rows = np.unique(rows, return_inverse=True)
+    unique_cols, local_cols = np.unique(cols, return_inverse=True)
+    n_rows, n_cols = len(unique_rows), len(unique_cols)
+    if n_rows * n_cols < sparse_min_size or min_weight_full_bipartite_matching is None:
+        assigned_rows, assigned_cols = resolve_claims_dense(local_rows, local_cols, costs,
+                                                            (n_rows, n_cols), max_weight)
+        return unique_rows[assigned_rows], unique_cols[assigned_cols]
+
+    # Every row gets an additional column that stands for "not assigned" with max_weight, so a
+    # full matching of the rows always exists and has the same optimum as the dense problem.
+    # The solver ignores zero weights so all weights are shifted to be positive.
+    offset = 1. - min(np.min(costs), max_weight)
+    biadjacency = csr_matrix(
+        (np.concatenate((costs, np.full(n_rows, max_weight))) + offset,
+         (np.concatenate((local_rows, np.arange(n_rows))),
+          np.concatenate((local_cols, n_cols + np.arange(n_rows))))),
+        shape=(n_rows, n_cols + n_rows))
+    assigned_rows, assigned_cols = min_weight_full_bipartite_matching(biadjacency)
+    mask = assigned_cols < n_cols
+    return unique_rows[assigned_rows[mask]], unique_cols[assigned_cols[mask]]
+
+
+def resolve_claims_auto(rows, cols, costs, shape, max_weight, sparse_min_size=10000,
+                        dense_min_density=0.25, greedy_min_claims=None):
+    """Resolves claims with a function that is selected by the size and density of the claims.
+
+    Dense claims are resolved with :func:`resolve_claims_dense`, because the connected components
+    do not pay off when most pairs are claimed. Sparse claims are resolved exactly with
+    :func:`resolve_claims_sparse` unless there are at least `greedy_min_claims` claims, then
+    :func:`resolve_claims_greedy` is used.
+
+    Arguments:
+        rows (:obj:`np.array`): row indices of the claims
+        cols (:obj:`np.array`): column indices of the claims
+        costs (:obj:`np.array`): costs of the claims
+        shape (tuple): shape of the cost matrix
+        max_weight (float): weight that marks non assignable pairs
+
+    Keyword Arguments:
+        sparse_min_size (int): passed to :func:`resolve_claims_sparse`
+        dense_min_density (float): minimum fraction of claimed pairs to use the dense function
+        greedy_min_claims (Optional int): minimum number of claims to resolve them greedy,
+            :obj:`None` to always resolve exactly
+
+    Returns:
+        tuple: ``(rows, cols)`` arrays with the assigned claims
+    """
+    n_claims, n_cells = len(costs), shape[0] * shape[1]
+    if n_cells > 0 and n_claims >= dense_min_density * n_cells:
+        return resolve_claims_dense(rows, cols, costs, shape, max_weight)
+    if greedy_min_claims is not None and n_claims >= greedy_min_claims:
+        return resolve_claims_greedy(rows, cols, costs, shape, max_weight)
+    return resolve_claims_sparse(rows, cols, costs, shape, max_weight,
+                                 sparse_min_size=sparse_min_size)
+
+
+def resolve_claims_greedy(rows, cols, costs, shape, max_weight):
+    """Resolves claims best first: the cheapest claim whose row and column are free is assigned.
+
+    The result is not optimal but it is fast for big frames.
+
+    Arguments:
+        rows (:obj:`np.array`): row indices of the claims
+        cols (:obj:`np.array`): column indices of the claims
+        costs (:obj:`np.array`): costs of the claims
+        shape (tuple): shape of the cost matrix
+        max_weight (float): weight that marks non assignable pairs
+
+    Returns:
+        tuple: ``(rows, cols)`` arrays with the assigned claims
+    """
+    rows, cols, costs = np.asarray(rows), np.asarray(cols), np.asarray(costs, dtype=float)
+    order = np.argsort(costs, kind='mergesort')
+    order = order[costs[order] < max_weight]
+    row_free = np.ones(shape[0], dtype=bool)
+    col_free = np.ones(shape[1], dtype=bool)
+    n_max = min(shape)
+    assigned = []
+    for claim, row, col in zip(order.tolist(), rows[order].tolist(), cols[order].tolist()):
+        if row_free[row] and col_free[col]:
+            row_free[row] = col_free[col] = False
+            assigned.append(claim)
+            if len(assigned) == n_max:
+                break
+    assigned = np.array(assigned, dtype=int)
+    return rows[assigned], cols[assigned]
+
+
+def resolve_claims_auction(rows, cols, costs, shape, max_weight, epsilon=1e-3, scaling=5.):
+    """Resolves claims with the auction algorithm and epsilon scaling.
+
+    The rows bid for the columns of their claims, every round all unassigned rows bid in parallel
+    (Jacobi auction). A row stays unassigned if no claim is better than ``max_weight``. The bid
+    increment starts big and is reduced by `scaling` in each phase until it reaches `epsilon`.
+    Columns that are not assigned anymore but kept a price from an earlier phase bid for rows in
+    reverse auction iterations, so the total cost of the result is at most
+    ``min(shape) * epsilon`` bigger than the optimum.
+
+    Arguments:
+        rows (:obj:`np.array`): row indices of the claims
+        cols (:obj:`np.array`): column indices of the claims
+        costs (:obj:`np.array`): costs of the claims
+        shape (tuple): shape of the cost matrix
+        max_weight (float): weight that marks non assignable pairs
+
+    Keyword Arguments:
+        epsilon (Optional float): bid increment of the last phase
+        scaling (Optional float): factor to reduce the bid increment between phases
+
+    Returns:
+        tuple: ``(rows, cols)`` arrays with the assigned claims
+    """
+    assert epsilon > 0 and scaling > 1, "Invalid bid increments."
+    rows, cols, costs = np.asarray(rows), np.asarray(cols), np.asarray(costs, dtype=float)
+    mask = costs < max_weight
+    order = np.argsort(rows[mask], kind='mergesort')
+    rows, cols = rows[mask][order], cols[mask][order]
+    # benefits are positive, not assigning a row has a benefit of 0
+    benefits = max_weight - costs[mask][order]
+    if len(benefits) == 0:
+        return np.empty(0, dtype=int), np.empty(0, dtype=int)
+
+    auction = _Auction(rows, cols, benefits, shape)
+    eps = max(np.max(benefits), epsilon) / scaling
+    while True:
+        eps = max(eps, epsilon)
+        auction.forward(eps)
+        auction.reverse(eps)
+        if eps == epsilon:
+            break
+        eps /= scaling
+    assigned = auction.claim_of_row[auction.claim_of_row >= 0]
+    return rows[assigned], cols[assigned]
+
+
+class _Auction(object):
+    """State of an auction with the claims as bids of rows for columns.
+
+    Every row has a private option to stay unassigned with benefit 0 and price 0.
+    """
+
+    def __init__(self, rows, cols, benefits, shape):
+        """Initialization of an auction with all prices 0.
+
+        Arguments:
+            rows (:obj:`np.array`): sorted row indices of the claims
+            cols (:obj:`np.array`): column indices of the claims
+            benefits (:obj:`np.array`): positive benefits of the claims
+            shape (tuple): shape of the cost matrix
+        """
+        self.rows, self.cols, self.benefits = rows, cols, benefits
+        self.prices = np.zeros(shape[1])
+        self.claim_of_row = np.full(shape[0], -1, dtype=int)
+        self.row_of_col = np.full(shape[1], -1, dtype=int)
+        self.col_order = np.argsort(cols, kind='mergesort')
+        self.col_starts = np.searchsorted(cols[self.col_order], np.arange(shape[1] + 1))
+
+    def forward(self, eps):
+        """Unassigns all rows and lets them bid until every row is assigned or gives up.
+
+        Arguments:
+            eps (float): bid increment
+        """
+        rows, cols, benefits, prices = self.rows, self.cols, self.benefits, self.prices
+        self.claim_of_row[:] = -1
+        self.row_of_col[:] = -1
+        # rows without a claim worth its price stay unassigned, prices only increase
+        bidding = np.zeros(len(self.claim_of_row), dtype=bool)
+        bidding[rows] = True
+        while True:
+            claims = np.flatnonzero(bidding[rows])
+            if len(claims) == 0:
+                break
+            claim_rows = rows[claims]
+            values = benefits[claims] - prices[cols[claims]]
+            starts = np.flatnonzero(np.concatenate(([True], claim_rows[1:] != claim_rows[:-1])))
+            segments = np.repeat(np.arange(len(starts)), np.diff(np.append(starts, len(claims))))
+            best = np.maximum.reduceat(values, starts)
+            # first claim with the best value of each row
+            candidates = np.flatnonzero(values == best[segments])
+            best_claims = candidates[np.concatenate(
+                ([True], segments[candidates][1:] != segments[candidates][:-1]))]
+            others = values.copy()
+            others[best_claims] = -np.inf
+            # the second best is at least to stay unassigned
+            second = np.maximum(np.maximum.reduceat(others, starts), 0.)
+
+            bidders = claim_rows[starts]
+            bids = prices[cols[claims[best_claims]]] + best - second + eps
+            gives_up = best <= 0
+            bidding[bidders[gives_up]] = False
+            bidders, bids = bidders[~gives_up], bids[~gives_up]
+            best_claims = claims[best_claims[~gives_up]]
+            bid_cols = cols[best_claims]
+            if len(bidders) == 0:
+                break
+
+            # the highest bid for each column wins
+            order = np.lexsort((bids, bid_cols))
+            last = np.append(bid_cols[order][1:] != bid_cols[order][:-1], True)
+            winners, won_claims = bidders[order][last], best_claims[order][last]
+            won_cols = cols[won_claims]
+            outbid = self.row_of_col[won_cols]
+            outbid = outbid[outbid >= 0]
+            self.claim_of_row[outbid] = -1
+            bidding[outbid] = True
+            prices[won_cols] = bids[order][last]
+            self.row_of_col[won_cols] = winners
+            self.claim_of_row[winners] = won_claims
+            bidding[winners] = False
+
+    def reverse(self, eps):
+        """Lets unassigned columns with a positive price bid for rows or lowers their price to 0.
+
+        Arguments:
+            eps (float): bid increment
+        """
+        rows, benefits, prices = self.rows, self.benefits, self.prices
+        assigned = self.claim_of_row >= 0
+        profits = np.zeros(len(self.claim_of_row))
+        profits[assigned] = (benefits[self.claim_of_row[assigned]] -
+                             prices[self.cols[self.claim_of_row[assigned]]])
+        queue = np.flatnonzero((self.row_of_col < 0) & (prices > 0)).tolist()
+        while len(queue) > 0:
+            col = queue.pop()
+            claims = self.col_order[self.col_starts[col]:self.col_starts[col + 1]]
+            values = benefits[claims] - profits[rows[claims]]
+            best_idx = np.argmax(values)
+            if values[best_idx] - eps <= 0:
+                prices[col] = 0
+                continue
+            values[best_idx] = -np.inf
+            claim, row = claims[best_idx], rows[claims[best_idx]]
+            prices[col] = max(0., np.max(values) - eps)
+            # the row leaves its previous column
+            if self.claim_of_row[row] >= 0:
+                previous = self.cols[self.claim_of_row[row]]
+                self.row_of_col[previous] = -1
+                if prices[previous] > 0:
+                    queue.append(previous)
+            self.claim_of_row[row] = claim
+            self.row_of_col[col] = row
+            profits[row] = benefits[claim] - prices[col]
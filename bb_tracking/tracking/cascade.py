@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+"""Provides scoring functions that evaluate their features as a cascade.
+
+A regular scoring function calculates all features for every pair of a waiting :obj:`.Track` and
+a candidate. Most candidates could already be rejected with a cheap feature like the distance
+via :func:`.distance_positions_v`. A :class:`CascadeScoreFun` evaluates the features in order and
+calculates later (expensive) features only for the pairs that are within the bounds of all
+earlier features. Rejected pairs get :attr:`CascadeScoreFun.max_weight` and are never assigned.
+
+The features use the same ``{name: fun(tracks, frame_objects_test)}`` format as
+:func:`.train_bin_clf`, so bounds might be learned from truth data via :func:`learn_cascade_bounds`
+or directly with the `cascade` argument of :func:`.train_bin_clf`.
+
+Note:
+    A matching pair that is rejected by the cascade can not be assigned, no matter how good its
+    other features are. Bounds that are exactly the range of the matching pairs in the learning
+    data reject every matching pair just outside of this range, so the learned bounds should get a
+    `margin`. Wider bounds reject less matching pairs but also evaluate the later features for
+    more pairs. A `quantile` makes the bounds robust against outliers in the learning data, but
+    rejects the given fraction of the matching pairs on purpose.
+"""
+import numpy as np
+
+
+class CascadeScoreFun(object):
+    """Scoring function that rejects pairs as early as possible in a cascade of features."""
+    features = None
+    """:obj:`collections.OrderedDict`: ``{name: fun(tracks, frame_objects_test)}`` mapping"""
+    bounds = None
+    """:obj:`dict`: ``{name: (min_value, max_value)}`` mapping with the bounds of the stages"""
+    weight_fun = None
+    """func: calculates the weights from the feature matrix of the accepted pairs"""
+    max_weight = 1000.
+    """float: weight of rejected pairs, the same as :attr:`.SimpleWalker.max_weight`"""
+    evaluated = None
+    """:obj:`dict`: ``{name: count}`` mapping with the number of pairs each feature was evaluated
+    for"""
+
+    def __init__(self, features, bounds, weight_fun, max_weight=1000.):
+        """Initialization of a cascade scoring function.
+
+        The features are evaluated in the order of `features`, so cheap features with bounds
+        should come first. A pair is rejected as soon as a feature value is outside of its bounds.
+        Features without bounds are only calculated for the final weights.
+
+        Arguments:
+            features (:obj:`collections.OrderedDict`): ``{name: fun(tracks, frame_objects_test)}``
+                mapping with the features in order of evaluation
+            bounds (:obj:`dict`): ``{name: (min_value, max_value)}`` mapping, :obj:`None` for no
+                restriction in one direction
+            weight_fun (func): function to calculate the weights of the accepted pairs from a
+                matrix with one column per feature in order of `features`
+
+        Keyword Arguments:
+            max_weight (Optional float): weight of rejected pairs
+        """
+        assert set(bounds.keys()) <= set(features.keys()), "Bounds for unknown features."
+        self.features = features
+        self.bounds = bounds
+        self.weight_fun = weight_fun
+        self.max_weight = max_weight
+        self.evaluated = {key: 0 for key in features.keys()}
+
+    def __call__(self, tracks_path, frame_objects_test):
+        """Scores `tracks_path` and `frame_objects_test` pairs.
+
+        Arguments:
+            tracks_path (:obj:`list` of :obj:`.Track`): A list with the :obj:`.Track` objects
+            frame_objects_test (:obj:`list` of :obj:`.Track` or :obj:`.Detection`): A list with
+                either :obj:`.Track` or :obj:`.Detection` that is scored with `tracks_path`.
+
+        Returns:
+            :obj:`np.array`: weights of the pairs with :attr:`max_weight` for rejected pairs
+        """
+        weights = np.full(len(tracks_path), self.max_weight)
+        accepted = np.arange(len(tracks_path))
+        clf_data = np.empty((len(tracks_path), len(self.features)))
+        for column, (key, fun) in enumerate(self.features.items()):
+            if len(accepted) == 0:
+                return weights
+            if len(accepted) < len(tracks_path):
+                values = fun([tracks_path[i] for i in accepted],
+                             [frame_objects_test[i] for i in accepted])
+            else:
+                values = fun(tracks_path, frame_objects_test)
+            self.evaluated[key] += len(accepted)
+            values = np.asarray(values, dtype=float)
+            min_value, max_value = self.bounds.get(key, (None, None))
+            mask = np.ones(len(values), dtype=bool)
+            if min_value is not None:
+                mask &= values >= min_value
+            if max_value is not None:
+                mask &= values <= max_value
+            # reject pairs and remove them from the previous features
+            clf_data = clf_data[mask]
+            clf_data[:, column] = values[mask]
+            accepted = accepted[mask]
+        if len(accepted) > 0:
+            weights[accepted] = np.minimum(self.weight_fun(clf_data), self.max_weight)
+        return weights
+
+
+def learn_cascade_bounds(x_data, y_data, features, cascade, quantile=0., margin=0.):
+    """Learns the bounds of the cascade stages from learning data.
+
+    The bounds of a feature are the range of its values for the matching pairs. With `quantile`
+    the given fraction of matching pairs is cut off on both sides. With `margin` the bounds are
+    widened by the given fraction of this range on both sides.
+
+    Arguments:
+        x_data (:obj:`np.array`): The learning data with one column per feature
+        y_data (:obj:`np.array`): The correct classes for the learning data
+        features (:obj:`collections.OrderedDict`): the features in order of the columns of `x_data`
+        cascade (iterable): names of the features that are used to reject pairs
+
+    Keyword Arguments:
+        quantile (Optional float): fraction of matching pairs that might be rejected on each side
+        margin (Optional float): fraction of the range of the bounds that is added on each side
+
+    Returns:
+        :obj:`dict`: ``{name: (min_value, max_value)}`` mapping with the bounds of the stages
+    """
+    assert 0 <= quantile < 0.5, "The quantile has to be in [0, 0.5)."
+    assert margin >= 0, "The margin can not be negative."
+    columns = {key: column for column, key in enumerate(features.keys())}
+    matching = np.asarray(x_data)[np.asarray(y_data) == 1]
+    bounds = dict()
+    for key in cascade:
+        values = matching[:, columns[key]]
+        min_value = float(np.percentile(values, 100. * quantile))
+        max_value = float(np.percentile(values, 100. * (1 - quantile)))
+        extension = margin * (max_value - min_value)
+        bounds[key] = (min_value - extension, max_value + extension)
+    return bounds
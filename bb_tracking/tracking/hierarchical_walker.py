@@ -0,0 +1,200 @@
+# -*- coding: utf-8 -*-
+"""Provides a walker that merges detections to tracklets and tracklets to tracks in one pass.
+
+Usually the tracklets of a :class:`.SimpleWalker` on detections are collected, wrapped in a
+:class:`.DataWrapperTracks` and merged by a second :class:`.SimpleWalker`. The
+:class:`HierarchicalWalker` hands each closed tracklet directly to the track walker instead. The
+tracklet starts are indexed in a :class:`TrackletBuffer` as they arrive, and the track walker
+visits a frame as soon as no tracklet that starts in this frame is still waiting.
+"""
+# pylint:disable=protected-access
+import heapq
+from scipy.spatial import cKDTree
+from ..data import DataWrapperTracks
+from ..data.constants import DETKEY
+from .walker import SimpleWalker
+
+
+class TrackletBuffer(DataWrapperTracks):
+    """A :class:`.DataWrapperTracks` that only keeps the tracklet starts that are not walked yet.
+
+    The timestamps and detections are taken from the :class:`.DataWrapper` of the detections.
+    """
+    # pylint:disable=super-init-not-called
+
+    def __init__(self, data):
+        """Initialization of an empty TrackletBuffer.
+
+        Arguments:
+            data (:class:`.DataWrapper`): the DataWrapper the tracklets are calculated on
+        """
+        self.data = data
+        self.cam_ids = list(data.get_camids())
+        self.frame_track_start = dict()
+        self.frame_trees = dict()
+        self.tracks = dict()
+
+    def add_track(self, cam_id, track):
+        """Adds a tracklet to the frame of its first detection.
+
+        Arguments:
+            cam_id (int): the id of the camera
+            track (:obj:`.Track`): the tracklet
+        """
+        assert track.id not in self.tracks, "Duplicate track ids."
+        self.tracks[track.id] = track
+        self.frame_track_start.setdefault((cam_id, track.timestamps[0]), []).append(track)
+
+    def seal_frame(self, cam_id, timestamp):
+        """Builds the spatial tree of a frame once all of its tracklet starts are added.
+
+        Arguments:
+            cam_id (int): the id of the camera
+            timestamp (timestamp): the timestamp of the frame
+        """
+        tracks = self.frame_track_start.get((cam_id, timestamp), [])
+        if len(tracks) > 0:
+            self.frame_trees[(cam_id, timestamp)] = cKDTree(
+                [(track.meta[DETKEY][0].x, track.meta[DETKEY][0].y) for track in tracks])
+
+    def drop_frame(self, cam_id, timestamp):
+        """Removes a frame with all its tracklet starts after it is walked.
+
+        Arguments:
+            cam_id (int): the id of the camera
+            timestamp (timestamp): the timestamp of the frame
+        """
+        for track in self.frame_track_start.pop((cam_id, timestamp), []):
+            del self.tracks[track.id]
+        self.frame_trees.pop((cam_id, timestamp), None)
+
+    def get_frame_objects(self, cam_id=None, timestamp=None):
+        # the track ends are not indexed
+        raise NotImplementedError()
+
+    def get_frame_objects_starting(self, cam_id=None, timestamp=None):
+        return self.frame_track_start.get((cam_id, timestamp), [])
+
+    def get_timestamps_starting(self, cam_id):
+        # the frames with track starts are only known after the detections are walked
+        raise NotImplementedError()
+
+    def get_timestamps(self, cam_id=None):
+        return self.data.get_timestamps(cam_id=cam_id)
+
+    def get_time_index(self, cam_id=None):
+        return self.data.get_time_index(cam_id=cam_id)
+
+
+class HierarchicalWalker(object):
+    """Class to merge detections to tracklets and tracklets to tracks in a single pass."""
+    detection_walker = None
+    """:class:`.SimpleWalker`: the walker that merges detections to tracklets"""
+    track_walker = None
+    """:class:`.SimpleWalker`: the walker that merges tracklets to tracks"""
+    buffer = None
+    """:class:`TrackletBuffer`: the tracklets that are not merged yet"""
+
+    def __init__(self, data_wrapper, detection_score_fun, track_score_fun, frame_diff, radius,
+                 track_frame_diff, track_radius, track_prefix=None):
+        """Initialization of a hierarchical Walker.
+
+        The tracks are the same as from a :class:`.SimpleWalker` on a :class:`.DataWrapperTracks`
+        with all the tracklets, but the tracklets are never held in memory at once. A tracklet
+        is merged once the frames that have waiting tracklets starting before it are walked.
+
+        Arguments:
+            data_wrapper (:obj:`.DataWrapper`): a :obj:`.DataWrapper` object to access detections
+            detection_score_fun (func): scoring function for tracklets and detections
+            track_score_fun (func): scoring function for tracks and tracklets
+            frame_diff (int): after n frames a tracklet is closed if no matching detection is found
+            radius (int): radius in image coordinates to restrict neighborhood search of detections
+            track_frame_diff (int): after n frames a track is closed if no matching tracklet is
+                found
+            track_radius (int): radius in image coordinates to restrict neighborhood search of
+                tracklets
+
+        Keyword Argument:
+            track_prefix (Optional str): prefix for :attr:`.Track.id` for unique track ids
+        """
+        self.detection_walker = SimpleWalker(data_wrapper, detection_score_fun, frame_diff, radius)
+        self.buffer = TrackletBuffer(data_wrapper)
+        self.track_walker = SimpleWalker(self.buffer, track_score_fun, track_frame_diff,
+                                         track_radius, track_prefix=track_prefix)
+
+    def calc_tracks(self, start=None, stop=None):
+        """Merge detections to tracklets and the tracklets to :obj:`.Track` objects.
+
+        Keyword Arguments:
+            start (tstamp): restrict to frames with tstamp >= start
+            stop (tstamp): restrict to frames with tstamp < stop
+
+        Returns:
+            :obj:`list` of :obj:`.Track`: :obj:`list` of merged :obj:`.Track`
+        """
+        return list(self.iter_tracks(start=start, stop=stop))
+
+    def iter_tracks(self, start=None, stop=None):
+        """Merge detections to tracklets and the tracklets to :obj:`.Track` objects and yield them
+        once they are closed.
+
+        Keyword Arguments:
+            start (tstamp): restrict to frames with tstamp >= start
+            stop (tstamp): restrict to frames with tstamp < stop
+
+        Yields:
+            :obj:`.Track`: the closed tracks in the same order as from the track walker
+        """
+        for cam_id in self.detection_walker.data.get_camids():
+            tstamps = self.buffer.get_time_index(cam_id=cam_id)
+            _, last_idx = tstamps.get_range(start, stop)
+            events = self._iter_tracklet_starts(cam_id, start, stop)
+            for track in self.track_walker._iter_events_tracks(cam_id, tstamps, events, last_idx):
+                if self.track_walker.stats is not None:
+                    self.track_walker.stats.count('tracks_closed')
+                yield track
+
+    def _iter_tracklet_starts(self, cam_id, start, stop):
+        """Walks through the detections of one camera and yields the frames with tracklet starts.
+
+        A frame is yielded once all the tracklets that start in it are closed and added to
+        :attr:`buffer`. It is removed from :attr:`buffer` when the next frame is requested.
+
+        Arguments:
+            cam_id (int): the cam to consider
+            start (tstamp): restrict to frames with tstamp >= start
+            stop (tstamp): restrict to frames with tstamp < stop
+
+        Yields:
+            int: ascending time indices of the frames with tracklet starts
+        """
+        walker = self.detection_walker
+        tstamps = walker.data.get_time_index(cam_id=cam_id)
+        first_idx, last_idx = tstamps.get_range(start, stop)
+        # time indices of the frames with tracklet starts that are not yielded yet
+        pending, pending_set = [], set()
+        closed_tracks, waiting = [], []
+        for time_idx in range(first_idx, last_idx):
+            waiting = walker._calc_timestep_detections(cam_id, time_idx, tstamps[time_idx],
+                                                       tstamps, waiting, closed_tracks)
+            # close remaining tracklets after the last frame
+            if time_idx == last_idx - 1:
+                closed_tracks.extend(track for _, track in waiting)
+                waiting = []
+            for track in closed_tracks:
+                self.buffer.add_track(cam_id, walker._flatten_track(track))
+                start_idx = tstamps.index(track.timestamps[0])
+                if start_idx not in pending_set:
+                    pending_set.add(start_idx)
+                    heapq.heappush(pending, start_idx)
+            del closed_tracks[:]
+
+            # the frames before the start of the oldest waiting tracklet are complete
+            complete_idx = min(tstamps.index(track.timestamps[0]) for _, track in waiting) \
+                if waiting else time_idx + 1
+            while len(pending) > 0 and pending[0] < complete_idx:
+                event_idx = heapq.heappop(pending)
+                pending_set.remove(event_idx)
+                self.buffer.seal_frame(cam_id, tstamps[event_idx])
+                yield event_idx
+                self.buffer.drop_frame(cam_id, tstamps[event_idx])
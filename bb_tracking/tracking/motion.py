@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+"""Provides motion models to restrict the neighborhood search of the walkers.
+
+Without a motion model the walkers search for candidates around the last detection of each
+waiting track with the fixed :attr:`.SimpleWalker.radius`. This radius has to cover the fastest
+bees, so slow bees get many useless candidates. A motion model predicts the position of each
+track in the current frame and a gate (search radius) for each track, that grows with the number
+of frames since the last detection.
+
+A motion model offers a ``predict(tracks, gaps, tstamp, radius)`` method and a ``history``
+attribute with the number of last detections of a track the prediction depends on. It is used by
+setting :attr:`.SimpleWalker.motion_model`.
+"""
+import numpy as np
+from ..data import Track
+from ..data.constants import DETKEY
+
+
+class ConstantVelocityModel(object):
+    """Predicts the positions of tracks with the velocity between their last two detections."""
+    history = 2
+    """int: number of last detections of a track the prediction depends on"""
+    base_radius = None
+    """float: gate for tracks that were extended in the last frame"""
+    radius_growth = None
+    """float: increase of the gate for each frame without detection"""
+
+    def __init__(self, base_radius, radius_growth=0.):
+        """Initialization of a constant velocity model.
+
+        The gate of a track is ``base_radius + radius_growth * (gap - 1)`` with `gap` the number
+        of frames since the last detection of the track, but never bigger than the radius of the
+        walker. Tracks with a single detection have no velocity, so they are searched with the
+        radius of the walker around their last detection.
+
+        Arguments:
+            base_radius (float): gate for tracks that were extended in the last frame
+
+        Keyword Arguments:
+            radius_growth (Optional float): increase of the gate for each frame without detection
+        """
+        assert base_radius > 0, "The gate has to be positive."
+        assert radius_growth >= 0, "The gate can not shrink with time."
+        self.base_radius = base_radius
+        self.radius_growth = radius_growth
+
+    def predict(self, tracks, gaps, tstamp, radius):
+        """Predicts the positions of `tracks` at `tstamp` and their gates.
+
+        Arguments:
+            tracks (:obj:`list` of :obj:`.Track`): the waiting tracks
+            gaps (:obj:`np.array`): number of frames since the last detection of each track
+            tstamp (timestamp): the timestamp of the current frame
+            radius (float): the radius of the walker as upper bound of the gates
+
+        Returns:
+            tuple: tuple containing:
+                - **points** (:obj:`np.array`): predicted ``(x, y)`` position of each track
+                - **radii** (:obj:`np.array`): gate of each track
+        """
+        detections = []
+        for track in tracks:
+            if not isinstance(track, Track):
+                raise TypeError("Type {0} not supported.".format(type(track)))
+            if DETKEY not in track.meta:
+                raise TypeError("Track without detections not supported.")
+            detections.append(track.meta[DETKEY])
+        radii = np.minimum(self.base_radius + self.radius_growth * (np.asarray(gaps) - 1.),
+                           radius)
+        if len(detections) == 0:
+            return np.empty((0, 2)), radii
+        last = [track_detections[-1] for track_detections in detections]
+        points = np.array([(detection.x, detection.y) for detection in last], dtype=float)
+
+        # tracks with a single detection have no velocity
+        moving = np.array([len(track_detections) > 1 for track_detections in detections])
+        radii[~moving] = radius
+        if not np.any(moving):
+            return points, radii
+        last = [detection for detection, is_moving in zip(last, moving) if is_moving]
+        previous = [track_detections[-2] for track_detections, is_moving
+                    in zip(detections, moving) if is_moving]
+        last_tstamps = np.array([detection.timestamp for detection in last])
+        previous_tstamps = np.array([detection.timestamp for detection in previous])
+        ratios = np.asarray((tstamp - last_tstamps) / (last_tstamps - previous_tstamps),
+                            dtype=float)
+        velocities = points[moving] - np.array([(detection.x, detection.y)
+                                                for detection in previous], dtype=float)
+        points[moving] += ratios[:, np.newaxis] * velocities
+        return points, radii
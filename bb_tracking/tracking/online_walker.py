@@ -0,0 +1,208 @@
+# -*- coding: utf-8 -*-
+"""Provides a walker to track detections while the frames are still produced.
+
+The :class:`OnlineWalker` does not iterate over a complete :class:`.DataWrapper`. Instead the frames
+are pushed one after another via :meth:`OnlineWalker.push_frame` and the tracks are returned as soon
+as they are closed.
+"""
+from collections import deque
+import numpy as np
+from scipy.spatial import cKDTree
+from ..data import DataWrapper, Track
+from ..data.constants import DETKEY
+from .walker import SimpleWalker
+
+
+class FrameBuffer(DataWrapper):
+    """A :class:`.DataWrapper` that only keeps the most recent frames of each camera."""
+    max_frames = None
+    """int: number of frames per camera that are kept"""
+    cam_frames = None
+    """:obj:`dict`: ``{cam_id: deque of timestamps}`` mapping with the kept frames"""
+    frame_detections = None
+    """:obj:`dict`: ``{(cam_id, timestamp): detections}`` mapping for :obj:`.Detection`"""
+    frame_trees = None
+    """:obj:`dict`: ``{(cam_id, timestamp): KDTree}`` mapping"""
+
+    def __init__(self, max_frames):
+        """Initialization of an empty FrameBuffer.
+
+        Arguments:
+            max_frames (int): number of frames per camera that are kept
+        """
+        assert max_frames > 0, "At least one frame has to be kept."
+        self.max_frames = max_frames
+        self.cam_frames = dict()
+        self.frame_detections = dict()
+        self.frame_trees = dict()
+
+    def add_frame(self, cam_id, timestamp, detections):
+        """Adds a frame and removes the oldest frame of the camera if the buffer is full.
+
+        Arguments:
+            cam_id (int): the id of the camera
+            timestamp (timestamp): the timestamp of the frame, bigger than the last one of the cam
+            detections (:obj:`list` of :obj:`.Detection`): the detections in the frame
+        """
+        frames = self.cam_frames.setdefault(cam_id, deque())
+        assert len(frames) == 0 or timestamp > frames[-1], \
+            "Frames of a camera have to be added in order."
+        if len(frames) == self.max_frames:
+            frame_key = (cam_id, frames.popleft())
+            del self.frame_detections[frame_key]
+            self.frame_trees.pop(frame_key, None)
+        frames.append(timestamp)
+        detections = list(detections)
+        self.frame_detections[(cam_id, timestamp)] = detections
+        if len(detections) > 0:
+            self.frame_trees[(cam_id, timestamp)] = cKDTree(
+                [(detection.x, detection.y) for detection in detections])
+
+    def get_camids(self, frame_object=None):
+        if frame_object is not None:
+            raise NotImplementedError()
+        return list(sorted(self.cam_frames.keys()))
+
+    def get_detection(self, detection_id):
+        raise NotImplementedError()
+
+    def get_detections(self, detection_ids):
+        raise NotImplementedError()
+
+    def get_frame_objects(self, cam_id=None, timestamp=None):
+        return self.frame_detections[(cam_id, timestamp)]
+
+    def get_neighbors(self, frame_object, cam_id, radius=10, timestamp=None):
+        _, candidate_indices = self.get_neighbors_bulk([frame_object], cam_id, radius, timestamp)
+        detections = self.frame_detections[(cam_id, timestamp)]
+        return [detections[cidx] for cidx in candidate_indices]
+
+    def get_neighbors_bulk(self, frame_objects, cam_id, radius, timestamp, points=None):
+        frame_key = (cam_id, timestamp)
+        if frame_key not in self.frame_trees or len(frame_objects) == 0:
+            return np.empty(0, dtype=int), np.empty(0, dtype=int)
+        # tracks are searched with their last detection
+        detections = [frame_object.meta[DETKEY][-1] if isinstance(frame_object, Track)
+                      else frame_object for frame_object in frame_objects]
+        if points is None:
+            points = [(detection.x, detection.y) for detection in detections]
+        neighbors = self.frame_trees[frame_key].query_ball_point(points, radius)
+        query_indices, candidate_indices = self._flatten_neighbors(neighbors)
+
+        # remove search items, only queries from the same frame can find themselves
+        same_frame = np.array([detection.timestamp == timestamp for detection in detections],
+                              dtype=bool)
+        pairs = np.flatnonzero(same_frame[query_indices])
+        if len(pairs) > 0:
+            frame_detections = self.frame_detections[frame_key]
+            same_ids = np.array([frame_detections[cidx].id == detections[qidx].id
+                                 for qidx, cidx in zip(query_indices[pairs].tolist(),
+                                                       candidate_indices[pairs].tolist())],
+                                dtype=bool)
+            mask = np.ones(len(query_indices), dtype=bool)
+            mask[pairs[same_ids]] = False
+            query_indices, candidate_indices = query_indices[mask], candidate_indices[mask]
+        return query_indices, candidate_indices
+
+    def get_timestamps(self, cam_id=None):
+        if cam_id is not None:
+            return list(self.cam_frames.get(cam_id, []))
+        return list(sorted(set(tstamp for frames in self.cam_frames.values()
+                               for tstamp in frames)))
+
+    def get_time_index(self, cam_id=None):
+        # the kept frames change with every added frame
+        raise NotImplementedError()
+
+
+class OnlineWalker(SimpleWalker):
+    """Class to track detections of frames that are pushed one after another."""
+    callback = None
+    """func: optional function that is called with each closed :obj:`.Track`"""
+    cam_waiting = None
+    """:obj:`dict`: ``{cam_id: waiting list}`` mapping with the waiting tracks of each camera"""
+    cam_time_idx = None
+    """:obj:`dict`: ``{cam_id: int}`` mapping with the number of pushed frames of each camera"""
+
+    def __init__(self, score_fun, frame_diff, radius, track_prefix=None, callback=None):
+        """Initialization of an online Walker.
+
+        The tracks are calculated like with the :class:`.SimpleWalker`, but only the last
+        ``frame_diff + 1`` frames of each camera are kept in a :class:`FrameBuffer`. Pushing all
+        frames of a camera gives the same tracks as :meth:`.SimpleWalker.calc_tracks`.
+
+        Arguments:
+            score_fun (func): scoring function to calculate the weights between two frame objects
+            frame_diff (int): after n frames a close track if no matching object is found
+            radius (int): radius in image coordinates to restrict neighborhood search
+
+        Keyword Argument:
+            track_prefix (Optional str): prefix for :attr:`.Track.id` for unique track ids
+            callback (Optional func): function that is called with each closed :obj:`.Track`
+        """
+        super(OnlineWalker, self).__init__(FrameBuffer(frame_diff + 1), score_fun, frame_diff,
+                                           radius, track_prefix=track_prefix)
+        self.callback = callback
+        self.cam_waiting = dict()
+        self.cam_time_idx = dict()
+
+    def calc_tracks(self, start=None, stop=None, workers=None, use_threads=False, shards=None,
+                    overlap=None, checkpoint=None):
+        raise NotImplementedError("Use push_frame() to add frames to the OnlineWalker.")
+
+    def iter_tracks(self, start=None, stop=None, checkpoint=None):
+        raise NotImplementedError("Use push_frame() to add frames to the OnlineWalker.")
+
+    def resume(self, checkpoint):
+        raise NotImplementedError("Checkpoints are not implemented for the OnlineWalker.")
+
+    def push_frame(self, cam_id, timestamp, detections):
+        """Assigns the detections of a new frame to the waiting tracks of the camera.
+
+        Arguments:
+            cam_id (int): the id of the camera
+            timestamp (timestamp): the timestamp of the frame, bigger than the last one of the cam
+            detections (:obj:`list` of :obj:`.Detection`): the detections in the frame
+
+        Returns:
+            :obj:`list` of :obj:`.Track`: the tracks of the camera that are closed with this frame
+        """
+        self.data.add_frame(cam_id, timestamp, detections)
+        time_idx = self.cam_time_idx.get(cam_id, 0)
+        closed_tracks = []
+        self.cam_waiting[cam_id] = self._calc_timestep_detections(
+            cam_id, time_idx, timestamp, self.data.get_timestamps(cam_id=cam_id),
+            self.cam_waiting.get(cam_id, []), closed_tracks)
+        self.cam_time_idx[cam_id] = time_idx + 1
+        return self._emit(closed_tracks)
+
+    def flush(self, cam_id=None):
+        """Closes all waiting tracks, e.g. at the end of the data.
+
+        Keyword Arguments:
+            cam_id (Optional int): only close the tracks of this camera
+
+        Returns:
+            :obj:`list` of :obj:`.Track`: the closed tracks
+        """
+        cam_ids = list(sorted(self.cam_waiting.keys())) if cam_id is None else [cam_id]
+        closed_tracks = []
+        for cam in cam_ids:
+            closed_tracks.extend(track for _, track in self.cam_waiting.pop(cam, []))
+        return self._emit(closed_tracks)
+
+    def _emit(self, closed_tracks):
+        """Calls :attr:`callback` with each closed track.
+
+        Arguments:
+            closed_tracks (:obj:`list` of :obj:`.Track`): the closed tracks
+
+        Returns:
+            :obj:`list` of :obj:`.Track`: the closed tracks
+        """
+        if self.stats is not None:
+            self.stats.count('tracks_closed', len(closed_tracks))
+        if self.callback is not None:
+            for track in closed_tracks:
+                self.callback(track)
+        return closed_tracks
@@ -385,6 +385,9 @@ def bit_array_to_int_v(bit_arrays, threshold=0.5, endian='little'):
         Instead of bit_arrays you could also pass lists with :obj:`.Detection` objects.
         In this case the :attr:`.Detection.beeId` is used and interpreted as bit array.
 
+        Bit arrays with dtype uint8 (see :attr:`.DataWrapperBinary.uint8_ids`) are in the range
+        ``0`` to ``255``, the threshold is scaled accordingly.
+
     Arguments:
         bit_arrays (:obj:`list` of arrays or :obj:`.Detection`): Iterable with ids to decode.
 
@@ -400,7 +403,10 @@ def bit_array_to_int_v(bit_arrays, threshold=0.5, endian='little'):
     if endian == 'little':
         bit_arrays = [arr[::-1] for arr in bit_arrays]
     assert len(bit_arrays[0]) == 12, "Only implemented for 12 bit representation."
-    arr = np.packbits(np.array(bit_arrays) >= threshold, axis=1)
+    bit_arrays = np.array(bit_arrays)
+    if bit_arrays.dtype == np.uint8:
+        threshold *= 255
+    arr = np.packbits(bit_arrays >= threshold, axis=1)
     arr = arr.astype(np.int16, copy=False)
     return np.left_shift(arr[:, 0], 4) | np.right_shift(arr[:, 1], 4)
 
@@ -437,7 +443,8 @@ def calc_track_ids(tracks):
     threshold to decide whether a bit is set or not.
 
     Note:
-        Used as default implementation to calculate :attr:`.Score.calc_id`.
+        Used as default implementation to calculate :attr:`.Score.calc_id`. Detections with uint8
+        :attr:`.Detection.beeId` use the median of :func:`calc_median_ids_uint8`.
 
     Arguments:
         tracks (:obj:`list` of :obj:`.Track`): A list of :obj:`.Track` object to calculate
@@ -446,4 +453,152 @@ def calc_track_ids(tracks):
     Returns:
         int: the calculated id for the :obj:`.Track`
     """
+    if len(tracks) > 0 and np.asarray(tracks[0].meta[DETKEY][0].beeId).dtype == np.uint8:
+        return bit_array_to_int_v(calc_median_ids_uint8(tracks) / 255.)
     return bit_array_to_int_v(calc_median_ids(tracks))
+
+
+def _stack_uint8_ids(detections):
+    """Helper to stack the uint8 id bits of detections to a ``N x 12`` array.
+
+    Arguments:
+        detections (:obj:`list` of :obj:`.Detection`): Iterable with :obj:`.Detection` objects
+            with uint8 :attr:`.Detection.beeId` (see :attr:`.DataWrapperBinary.uint8_ids`)
+
+    Returns:
+        :obj:`np.array`: int16 matrix with the id bits (``0`` to ``255``) in each row
+    """
+    return np.array([det.beeId for det in detections], dtype=np.uint8).astype(np.int16)
+
+
+def score_id_sim_uint8_v(detections1, detections2):
+    """Compares two uint8 id frequency distributions for similarity (vectorized)
+
+    Same as :func:`score_id_sim_v` for detections with uint8 :attr:`.Detection.beeId`, but the
+    distance is calculated with integers.
+
+    Arguments:
+        detections1 (:obj:`list` of :obj:`.Detection`): Iterable with Detections
+        detections2 (:obj:`list` of :obj:`.Detection`): Iterable with Detections
+
+    Returns:
+        :obj:`np.array`: Use Manhattan distance :math:`\\sum_i |id1_i - id2_i| / 255`
+    """
+    assert len(detections1) == len(detections2), "Detection lists do not have the same length."
+    arr1 = _stack_uint8_ids(detections1)
+    arr2 = _stack_uint8_ids(detections2)
+    assert np.all(arr1.shape == arr2.shape), "Detections do not have the same length of id bits."
+    return np.sum(np.abs(arr1 - arr2), axis=1) / 255.
+
+
+def score_id_sim_orientation_uint8_v(detections1, detections2,
+                                     range_bonus_orientation=(math.pi / 6),
+                                     value_bonus_orientation=1.):
+    """Compares uint8 id frequency distributions for similarity (vectorized)
+
+    Same as :func:`score_id_sim_orientation_v` for detections with uint8
+    :attr:`.Detection.beeId`, but the distance is calculated with integers.
+
+    Arguments:
+        detections1 (:obj:`list` of :obj:`.Detection`): Iterable with `.Detection`
+        detections2 (:obj:`list` of :obj:`.Detection`): Iterable with `.Detection`
+
+    Keyword Arguments:
+        range_bonus_orientation (Optional float): range in degrees, so that two orientations
+            get a bonus
+        value_bonus_orientation (Optional float): value to add if orientations are within
+            `range_bonus_orientation`
+
+    Returns:
+        :obj:`np.array`: Use Manhattan distance :math:`\\sum_i |id1_i - id2_i| / 255`
+    """
+    assert len(detections1) == len(detections2), "Detection lists do not have the same length."
+    arr1 = _stack_uint8_ids(detections1)
+    arr2 = _stack_uint8_ids(detections2)
+    assert np.all(arr1.shape == arr2.shape), "Detections do not have the same length of id bits."
+    orientations1 = np.array([det.orientation for det in detections1], dtype=float)
+    orientations2 = np.array([det.orientation for det in detections2], dtype=float)
+    score_orientations = (np.sum(np.abs(arr1 - arr2), axis=1) / 255. -
+                          ((np.fabs(orientations1 - orientations2) <= range_bonus_orientation) *
+                           float(value_bonus_orientation) / arr1.shape[1]))
+    score_orientations[score_orientations < 0] = 0
+    return score_orientations
+
+
+def score_id_sim_rotating_uint8_v(detections1, detections2, rotation_penalty=0.5):
+    """Compares uint8 id frequency distributions for similarity by rotating them (vectorized)
+
+    Same as :func:`score_id_sim_rotating` for detections with uint8 :attr:`.Detection.beeId`,
+    but the distances are calculated with integers.
+
+    Arguments:
+        detections1 (:obj:`list` of :obj:`.Detection`): Iterable with `.Detection`
+        detections2 (:obj:`list` of :obj:`.Detection`): Iterable with `.Detection`
+
+    Keyword Arguments:
+        rotation_penalty (Optional float): the penalty that is added for a rotation of 1
+            to the left or right
+
+    Returns:
+        :obj:`np.array`: Manhattan distance but also rotated with added rotation_penalty.
+    """
+    assert len(detections1) == len(detections2), "Detection lists do not have the same length."
+    arr1 = _stack_uint8_ids(detections1)
+    arr2 = _stack_uint8_ids(detections2)
+    assert np.all(arr1.shape == arr2.shape), "Detections do not have the same length of id bits."
+
+    n = float(arr1.shape[1])
+    score = np.full(arr1.shape[0], np.inf)
+    # rotate left and right
+    for direction in [-1, 1]:
+        for i in range(int(math.ceil(n / 2)) + 1):
+            test_score = np.sum(np.abs(arr1 - np.roll(arr2, direction * i, axis=1)), axis=1)
+            score = np.minimum(score, test_score / 255. + i * rotation_penalty)
+    return score
+
+
+def score_id_sim_tracks_median_uint8_v(tracks1, tracks2):
+    """Compares uint8 id frequency distributions of tracks by comparing the median (vectorized)
+
+    Same as :func:`score_id_sim_tracks_median_v` for detections with uint8
+    :attr:`.Detection.beeId`.
+
+    Arguments:
+        tracks1 (:obj:`list` of :obj:`.Track`): Iterable with Tracks
+        tracks2 (:obj:`list` of :obj:`.Track`): Iterable with Tracks
+
+    Returns:
+        :obj:`np.array`: Use Manhattan distance
+        :math:`\\sum_i |Median(ids1)_i - Median(ids2)_i| / 255`
+    """
+    assert len(tracks1) == len(tracks2), "Track lists do not have the same length."
+
+    arr1 = calc_median_ids_uint8(tracks1)
+    arr2 = calc_median_ids_uint8(tracks2)
+    assert np.all(arr1.shape == arr2.shape), "Detections do not have the same length of id bits."
+    return np.sum(np.fabs(arr1 - arr2), axis=1) / 255.
+
+
+def calc_median_ids_uint8(tracks):
+    """Helper to calculate the median bit of the uint8 ids in the given tracks.
+
+    Same as :func:`calc_median_ids` for detections with uint8 :attr:`.Detection.beeId`. The
+    median is calculated on the uint8 values and therefore in the range ``0`` to ``255``.
+
+    Arguments:
+        tracks(:obj:`list` of :obj:`.Track`): Iterable with Tracks
+
+    Returns:
+        :obj:`np.array`: median for all the bits in the given track
+    """
+    meta_key = 'median_id_uint8'
+    ids_median = []
+    for track in tracks:
+        if meta_key in track.meta.keys() and track.meta[meta_key][0] == len(track.ids):
+            ids_median.append(track.meta[meta_key][1])
+        else:
+            track_median = np.median(np.array([det.beeId for det in track.meta[DETKEY]],
+                                              dtype=np.uint8), axis=0)
+            ids_median.append(track_median)
+            track.meta[meta_key] = (len(track.ids), track_median)
+    return np.array(ids_median)
@@ -0,0 +1,183 @@
+# -*- coding: utf-8 -*-
+"""Provides statistics about the stages of a walk.
+
+A :class:`WalkerStats` object is set as :attr:`.SimpleWalker.stats` and collects:
+
+- **timers**: cumulative seconds of the stages ``frame_objects`` (loading the frame objects),
+  ``neighbors`` (neighborhood search), ``scoring`` (scoring function), ``assignment`` (resolving
+  the claims) and ``bookkeeping`` (extending, starting and closing tracks)
+- **histograms**: ``waiting`` (size of the waiting list), ``candidates`` (number of scored pairs)
+  per frame and ``cost_matrix`` (shape of the claims that are resolved)
+- **counters**: ``tracks_opened`` and ``tracks_closed``
+
+Without stats object the walker only checks for :obj:`None`, so the instrumentation costs nothing
+when disabled.
+
+With workers or shards each isolated walk collects its own statistics, they are combined with
+:meth:`WalkerStats.merge` once the walks are finished.
+"""
+from collections import Counter
+import json
+import sys
+from timeit import default_timer
+import numpy as np
+
+
+class WalkerStats(object):
+    """Collects timers, histograms and counters of the walkers."""
+    timers = None
+    """:obj:`dict`: ``{stage: seconds}`` mapping with the cumulative time of each stage"""
+    histograms = None
+    """:obj:`dict`: ``{name: Counter}`` mapping with the frequencies of the observed values"""
+    counters = None
+    """:obj:`dict`: ``{name: int}`` mapping with event counters"""
+    frames = 0
+    """int: number of walked frames"""
+    emit_interval = None
+    """int: number of frames between two JSON lines, :obj:`None` to never emit them"""
+    stream = None
+    """file: file like object for the JSON lines"""
+    started = None
+    """float: time of the first measurement"""
+
+    def __init__(self, emit_interval=None, stream=None):
+        """Initialization of empty statistics.
+
+        Keyword Arguments:
+            emit_interval (Optional int): write the statistics as JSON line every n frames
+            stream (Optional file): file like object for the JSON lines (default: stderr)
+        """
+        assert emit_interval is None or emit_interval > 0, "The interval has to be positive."
+        self.emit_interval = emit_interval
+        self.stream = stream
+        self.reset()
+
+    def reset(self):
+        """Discards all measurements."""
+        self.timers = dict()
+        self.histograms = dict()
+        self.counters = dict()
+        self.frames = 0
+        self.started = None
+        self._emitted = (None, 0)
+
+    def add_time(self, stage, seconds):
+        """Adds the duration of a stage.
+
+        Arguments:
+            stage (str): name of the stage
+            seconds (float): duration in seconds
+        """
+        self.start(offset=seconds)
+        self.timers[stage] = self.timers.get(stage, 0.) + seconds
+
+    def count(self, name, value=1):
+        """Increments a counter.
+
+        Arguments:
+            name (str): name of the counter
+
+        Keyword Arguments:
+            value (Optional int): increment
+        """
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def observe(self, name, value):
+        """Adds a value to a histogram.
+
+        Arguments:
+            name (str): name of the histogram
+            value (hashable): the observed value, e.g. an int or a shape tuple
+        """
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            histogram = self.histograms[name] = Counter()
+        histogram[value] += 1
+
+    def add_frame(self):
+        """Counts a walked frame and emits a JSON line every :attr:`emit_interval` frames."""
+        self.start()
+        self.frames += 1
+        if self.emit_interval is not None and self.frames % self.emit_interval == 0:
+            self.emit()
+
+    def start(self, offset=0.):
+        """Sets the time of the first measurement unless it is already set.
+
+        Keyword Arguments:
+            offset (Optional float): seconds the first measurement started before now
+        """
+        if self.started is None:
+            self.started = default_timer() - offset
+
+    def merge(self, other, counters=True):
+        """Adds the measurements of another walk, e.g. of a worker.
+
+        The time of the first measurement is not changed, so the throughput is measured from the
+        start of this object.
+
+        Arguments:
+            other (:obj:`WalkerStats`): the statistics to add
+
+        Keyword Arguments:
+            counters (Optional bool): also add the counters and the frames of `other`
+        """
+        for stage, seconds in other.timers.items():
+            self.timers[stage] = self.timers.get(stage, 0.) + seconds
+        for name, histogram in other.histograms.items():
+            self.histograms.setdefault(name, Counter()).update(histogram)
+        if counters:
+            for name, value in other.counters.items():
+                self.count(name, value)
+            self.frames += other.frames
+
+    def elapsed(self):
+        """Returns the seconds since the first measurement."""
+        return 0. if self.started is None else default_timer() - self.started
+
+    def as_dict(self, histograms=True):
+        """Returns the statistics as :obj:`dict` that is serializable as JSON.
+
+        Histogram values are converted to strings, shapes are written as ``rowsxcols``.
+
+        Keyword Arguments:
+            histograms (Optional bool): include the complete histograms and not only their
+                mean and maximum in ``summaries``
+
+        Returns:
+            :obj:`dict`: the statistics with the throughput in frames per second
+        """
+        elapsed = self.elapsed()
+        stats = dict(frames=self.frames, elapsed=elapsed,
+                     fps=self.frames / elapsed if elapsed > 0 else 0.,
+                     timers=dict(self.timers), counters=dict(self.counters))
+        summaries = dict()
+        for name, histogram in self.histograms.items():
+            values = np.array(list(histogram.keys()), dtype=float)
+            weights = np.array(list(histogram.values()), dtype=float)
+            summaries[name] = dict(mean=np.average(values, axis=0, weights=weights).tolist(),
+                                   max=np.max(values, axis=0).tolist())
+        stats['summaries'] = summaries
+        if histograms:
+            stats['histograms'] = {
+                name: {"x".join(str(dim) for dim in value) if isinstance(value, tuple)
+                       else str(value): frequency for value, frequency in histogram.items()}
+                for name, histogram in self.histograms.items()}
+        return stats
+
+    def emit(self):
+        """Writes the statistics without histograms as JSON line to :attr:`stream`.
+
+        The line also contains the throughput since the last emitted line as ``interval_fps``.
+        """
+        stats = self.as_dict(histograms=False)
+        emitted_time, emitted_frames = self._emitted
+        now = default_timer()
+        if emitted_time is None:
+            stats['interval_fps'] = stats['fps']
+        else:
+            stats['interval_fps'] = (self.frames - emitted_frames) / max(now - emitted_time, 1e-9)
+        self._emitted = (now, self.frames)
+        stream = sys.stderr if self.stream is None else self.stream
+        stream.write(json.dumps(stats, sort_keys=True) + "\n")
+        stream.flush()
@@ -11,11 +11,13 @@ from sklearn.pipeline import make_pipeline
 from sklearn.preprocessing import StandardScaler
 from sklearn.svm import LinearSVC
 from ..data.constants import DETKEY
-from .scoring import distance_positions_v, score_id_sim_orientation_v
+from .scoring import distance_positions_v, score_id_sim_orientation_v, \
+    score_id_sim_orientation_uint8_v
 from .training import train_bin_clf
 
 
-def make_detection_score_fun(dw_truth, frame_diff=1, radius=110, clf=None, **kwargs):
+def make_detection_score_fun(dw_truth, frame_diff=1, radius=110, clf=None, uint8_ids=False,
+                             **kwargs):
     """Function to generate a scoring function that scores tracks and matching detections.
 
     Note:
@@ -33,6 +35,8 @@ def make_detection_score_fun(dw_truth, frame_diff=1, radius=110, clf=None, **kwa
         clf (scikit-learn classifier): a scikit-learn classifier that will be trained
         frame_diff (int): after n frames close track if no matching object is found
         radius (int): radius in image coordinates to restrict neighborhood search
+        uint8_ids (bool): use :func:`.score_id_sim_orientation_uint8_v` for DataWrappers with
+            :attr:`.DataWrapperBinary.uint8_ids`
         **kwargs (:obj:`dict`): keyword arguments for :func:`train_bin_clf`
 
     Returns:
@@ -43,11 +47,12 @@ def make_detection_score_fun(dw_truth, frame_diff=1, radius=110, clf=None, **kwa
     """
     if clf is None:
         clf = make_pipeline(StandardScaler(), LinearSVC(dual=False))
+    score_id_sim = score_id_sim_orientation_uint8_v if uint8_ids else score_id_sim_orientation_v
     features = OrderedDict()
     features['score_distances'] = lambda tracks, detections:\
         distance_positions_v([track.meta[DETKEY][-1] for track in tracks], detections)
     features['score_id_sim_orientation'] = lambda tracks, detections:\
-        score_id_sim_orientation_v([track.meta[DETKEY][-1] for track in tracks], detections)
+        score_id_sim([track.meta[DETKEY][-1] for track in tracks], detections)
     train_bin_clf(clf, dw_truth, features, frame_diff, radius, **kwargs)
 
     def score_fun(tracks, detections_test):
@@ -63,7 +68,7 @@ def make_detection_score_fun(dw_truth, frame_diff=1, radius=110, clf=None, **kwa
             :obj:`np.array`: iterable with negative scores (the smaller the better) or infinity
         """
         detections_path = [track.meta[DETKEY][-1] for track in tracks]
-        score_orientations = score_id_sim_orientation_v(detections_path, detections_test)
+        score_orientations = score_id_sim(detections_path, detections_test)
         score_distances = distance_positions_v(detections_path, detections_test)
         clf_data = np.array((score_distances, score_orientations)).T
         if hasattr(clf, "predict_proba"):
@@ -80,7 +85,8 @@ def make_detection_score_fun(dw_truth, frame_diff=1, radius=110, clf=None, **kwa
     return score_fun, clf
 
 
-def make_track_score_fun(dw_truth, frame_diff=15, radius=np.inf, clf=None, **kwargs):
+def make_track_score_fun(dw_truth, frame_diff=15, radius=np.inf, clf=None, uint8_ids=False,
+                         **kwargs):
     """Function to generate a scoring function that scores tracks and matching tracks.
 
     Note:
@@ -94,6 +100,8 @@ def make_track_score_fun(dw_truth, frame_diff=15, radius=np.inf, clf=None, **kwa
 
     Keyword Arguments:
         clf (scikit-learn classifier): a scikit-learn classifier that will be trained
+        uint8_ids (bool): use :func:`.score_id_sim_orientation_uint8_v` for DataWrappers with
+            :attr:`.DataWrapperBinary.uint8_ids`
         **kwargs (:obj:`dict`): keyword arguments for :func:`.train_bin_clf`
 
     Returns:
@@ -108,13 +116,14 @@ def make_track_score_fun(dw_truth, frame_diff=15, radius=np.inf, clf=None, **kwa
     """
     if clf is None:
         clf = make_pipeline(StandardScaler(), LinearSVC(dual=False))
+    score_id_sim = score_id_sim_orientation_uint8_v if uint8_ids else score_id_sim_orientation_v
     features = OrderedDict()
     features['score_distances'] = lambda tracks, tracks_test:\
         distance_positions_v([track.meta[DETKEY][-1] for track in tracks],
                              [track.meta[DETKEY][0] for track in tracks_test])
     features['score_id_sim_orientation'] = lambda tracks, tracks_test:\
-        score_id_sim_orientation_v([track.meta[DETKEY][-1] for track in tracks],
-                                   [track.meta[DETKEY][0] for track in tracks_test])
+        score_id_sim([track.meta[DETKEY][-1] for track in tracks],
+                     [track.meta[DETKEY][0] for track in tracks_test])
     train_bin_clf(clf, dw_truth, features, frame_diff, radius, **kwargs)
 
     def score_fun(tracks, tracks_test):
@@ -131,7 +140,7 @@ def make_track_score_fun(dw_truth, frame_diff=15, radius=np.inf, clf=None, **kwa
         """
         detections_path = [track.meta[DETKEY][-1] for track in tracks]
         detections_test = [track.meta[DETKEY][0] for track in tracks_test]
-        score_orientations = score_id_sim_orientation_v(detections_path, detections_test)
+        score_orientations = score_id_sim(detections_path, detections_test)
         score_distances = distance_positions_v(detections_path, detections_test)
         clf_data = np.array((score_distances, score_orientations)).T
         if hasattr(clf, "predict_proba"):
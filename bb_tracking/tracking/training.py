@@ -11,6 +11,7 @@ from sklearn.model_selection import cross_val_predict, StratifiedShuffleSplit
 from sklearn.metrics import classification_report, roc_curve, auc
 from ..data import DataWrapperTracks
 from ..validation import Validator, convert_validated_to_pandas
+from .cascade import CascadeScoreFun, learn_cascade_bounds
 from .walker import SimpleWalker
 
 
@@ -134,7 +135,8 @@ def train_and_evaluate(clf, x_data, y_data, verbose=False, **kwargs):
         clf.fit(x_data[train_indices], y_data[train_indices], **kwargs)
 
 
-def train_bin_clf(clf, dw_truth, features, frame_diff, radius, **kwargs):
+def train_bin_clf(clf, dw_truth, features, frame_diff, radius, cascade=None, cascade_quantile=0.,
+                  cascade_margin=0.1, **kwargs):
     """Function to train a binary classifier using truth data.
 
     The features are used to train a binary classifier to corresponding frame objects.
@@ -147,6 +149,13 @@ def train_bin_clf(clf, dw_truth, features, frame_diff, radius, **kwargs):
     the generated learning data for training the classifier. Use this data if you want to use some
     *custom* training methods.
 
+    With `cascade` the scoring function is a :class:`.CascadeScoreFun` that rejects pairs outside
+    of the range of the matching pairs in the learning data (see :func:`.learn_cascade_bounds`)
+    for the given features before the next features and the classifier are evaluated. Rejected
+    pairs are never assigned, so by default the bounds get a margin of 10% of the learned range
+    on each side. A smaller `cascade_margin` (or a `cascade_quantile`) rejects more pairs early,
+    but also more matching pairs that are slightly outside of the range of the learning data.
+
     Arguments:
         clf (scikit-learn classifier): a scikit-learn classifier that will be trained
         dw_truth (:class:`.DataWrapperTruth`): :class:`.DataWrapperTruth` with truth data
@@ -155,6 +164,11 @@ def train_bin_clf(clf, dw_truth, features, frame_diff, radius, **kwargs):
         radius (int): radius in image coordinates to restrict neighborhood search
 
     Keyword Arguments:
+        cascade (Optional iterable): names of the features that are used to reject pairs
+        cascade_quantile (Optional float): fraction of the matching pairs in the learning data
+            that might be rejected on each side of the bounds
+        cascade_margin (Optional float): fraction of the learned range of a feature that is added
+            to its bounds on each side
         verbose (Optional bool): if true prints some information about training success
         **kwargs (:obj:`dict`): Keyword arguments for :func:`train_and_evaluate()` that are also
             passed to ``clf.fit()``.
@@ -182,6 +196,17 @@ def train_bin_clf(clf, dw_truth, features, frame_diff, radius, **kwargs):
             :obj:`np.array`: Scores for`tracks_path` and `frame_objects_test` pairs.
         """
         clf_data = np.array([fun(tracks_path, frame_objects_test) for fun in features.values()]).T
+        return score_clf_data(clf_data)
+
+    def score_clf_data(clf_data):
+        """Calculates the weights for the features in `clf_data` with the classifier.
+
+        Arguments:
+            clf_data (:obj:`np.array`): matrix with one column per feature
+
+        Returns:
+            :obj:`np.array`: Scores for the rows of `clf_data`
+        """
         if hasattr(clf, "predict_proba"):
             # we have do adapt the return of predict_proba to be compatible with decision_function
             class_scores = clf.predict_proba(clf_data)
@@ -198,4 +223,8 @@ def train_bin_clf(clf, dw_truth, features, frame_diff, radius, **kwargs):
     features = copy.deepcopy(features)
     x_data, y_data, _ = generate_learning_data(dw_truth, features, frame_diff, radius)
     train_and_evaluate(clf, x_data, y_data, **kwargs)
+    if cascade is not None:
+        bounds = learn_cascade_bounds(x_data, y_data, features, cascade,
+                                      quantile=cascade_quantile, margin=cascade_margin)
+        return x_data, y_data, CascadeScoreFun(features, bounds, score_clf_data)
     return x_data, y_data, score_fun_generic
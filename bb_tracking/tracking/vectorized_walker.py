@@ -0,0 +1,327 @@
+# -*- coding: utf-8 -*-
+"""Provides a walker that keeps the waiting list as arrays.
+
+The :class:`VectorizedWalker` produces the same tracks as the :class:`.SimpleWalker` but stores
+the tails of the waiting tracks as :obj:`FrameArrays`. Closing, claiming, scoring and updating
+the waiting tracks are array operations per frame.
+
+Scoring functions for the :class:`VectorizedWalker` get two :obj:`FrameArrays` with the pairs to
+score line by line. :func:`make_array_score_fun` adapts a scoring function of the
+:class:`.SimpleWalker` to this interface.
+
+With a :class:`.DataWrapperColumnar` the arrays of a frame are taken from its columns, see
+:meth:`.DataWrapperColumnar.get_frame_columns`.
+"""
+from collections import namedtuple
+import math
+import numpy as np
+from six import PY3
+from ..data import DataWrapperColumnar, DataWrapperTracks, Track
+from ..data.constants import DETKEY
+from .walker import SimpleWalker
+
+FrameArrays = namedtuple('FrameArrays', ['ids', 'x', 'y', 'orientation', 'beeId', 'objects'])
+if PY3:
+    FrameArrays.__doc__ = """
+:obj:`FrameArrays` hold the features of several :obj:`.Detection` objects as arrays.
+
+For waiting tracks the features are taken from the last :obj:`.Detection` of each track.
+
+Attributes:
+    ids (:obj:`np.array`): ids of the detections
+    x (:obj:`np.array`): x positions in image coordinates
+    y (:obj:`np.array`): y positions in image coordinates
+    orientation (:obj:`np.array`): orientations of the tags
+    beeId (:obj:`np.array`): matrix with the id bit frequency distribution in each row
+    objects (:obj:`np.array`): the :obj:`.Detection` (or waiting :obj:`.Track`) objects
+"""
+
+
+def make_frame_arrays(detections, columns=None):
+    """Converts a list of :obj:`.Detection` to :obj:`FrameArrays`.
+
+    Arguments:
+        detections (:obj:`list` of :obj:`.Detection`): Iterable with :obj:`.Detection`
+
+    Keyword Arguments:
+        columns (Optional :obj:`.FrameColumns`): the columns of `detections` to take the
+            features from instead of the :obj:`.Detection` objects
+
+    Returns:
+        :obj:`FrameArrays`: the features of `detections` as arrays
+    """
+    objects = np.empty(len(detections), dtype=object)
+    for idx, detection in enumerate(detections):
+        objects[idx] = detection
+    ids = np.array([det.id for det in detections], dtype=object)
+    if columns is not None:
+        return FrameArrays(ids=ids, x=columns.x.astype(float), y=columns.y.astype(float),
+                           orientation=columns.orientation.astype(float),
+                           beeId=columns.beeId / 255., objects=objects)
+    bee_ids = np.array([det.beeId for det in detections])
+    # uint8 ids (see DataWrapperBinary.uint8_ids) are scaled to the frequency distribution
+    bee_ids = bee_ids / 255. if bee_ids.dtype == np.uint8 else bee_ids.astype(float)
+    return FrameArrays(ids=ids,
+                       x=np.array([det.x for det in detections], dtype=float),
+                       y=np.array([det.y for det in detections], dtype=float),
+                       orientation=np.array([det.orientation for det in detections], dtype=float),
+                       beeId=bee_ids,
+                       objects=objects)
+
+
+def take_frame_arrays(arrays, indices):
+    """Selects the entries with `indices` (or a boolean mask) from all arrays.
+
+    Arguments:
+        arrays (:obj:`FrameArrays`): the arrays to select from
+        indices (:obj:`np.array`): indices or boolean mask
+
+    Returns:
+        :obj:`FrameArrays`: the selected entries
+    """
+    return FrameArrays(*[array[indices] for array in arrays])
+
+
+def make_array_score_fun(score_fun):
+    """Adapts a scoring function of the :class:`.SimpleWalker` to :obj:`FrameArrays`.
+
+    Arguments:
+        score_fun (func): scoring function with :obj:`.Track` and :obj:`.Detection` lists
+
+    Returns:
+        func: scoring function with the waiting :obj:`FrameArrays` and the :obj:`FrameArrays` of
+        the detections
+    """
+    def array_score_fun(path, candidates):
+        """Scores the waiting tracks and detections of the two :obj:`FrameArrays` line by line."""
+        return score_fun(list(path.objects), list(candidates.objects))
+    return array_score_fun
+
+
+def distance_positions_arrays(path, candidates):
+    """Calculates the euclidean distances between the x and y positions.
+
+    Same as :func:`.distance_positions_v` for :obj:`FrameArrays`.
+
+    Arguments:
+        path (:obj:`FrameArrays`): features of the waiting tracks
+        candidates (:obj:`FrameArrays`): features of the detections
+
+    Returns:
+        :obj:`np.array`: Euclidean distance between detections line by line
+    """
+    return np.linalg.norm(np.column_stack((path.x, path.y)) -
+                          np.column_stack((candidates.x, candidates.y)), axis=1)
+
+
+def score_id_sim_orientation_arrays(path, candidates, range_bonus_orientation=(math.pi / 6),
+                                    value_bonus_orientation=1.):
+    """Compares id frequency distributions for similarity with a bonus for similar orientations.
+
+    Same as :func:`.score_id_sim_orientation_v` for :obj:`FrameArrays`.
+
+    Arguments:
+        path (:obj:`FrameArrays`): features of the waiting tracks
+        candidates (:obj:`FrameArrays`): features of the detections
+
+    Keyword Arguments:
+        range_bonus_orientation (Optional float): range in degrees, so that two orientations
+            get a bonus
+        value_bonus_orientation (Optional float): value to add if orientations are within
+            `range_bonus_orientation`
+
+    Returns:
+        :obj:`np.array`: Use Manhattan distance :math:`\\sum_i |id1_i - id2_i|`
+    """
+    assert path.beeId.shape == candidates.beeId.shape, \
+        "Detections do not have the same length of id bits."
+    score_orientations = (np.sum(np.fabs(path.beeId - candidates.beeId), axis=1) -
+                          ((np.fabs(path.orientation - candidates.orientation) <=
+                            range_bonus_orientation) *
+                           float(value_bonus_orientation) / path.beeId.shape[1]))
+    score_orientations[score_orientations < 0] = 0
+    return score_orientations
+
+
+class VectorizedWalker(SimpleWalker):
+    """Class for walking through the beesbook data with an array based waiting list."""
+    array_score_fun = None
+    """func: scoring function to calculate the weights between two :obj:`FrameArrays`"""
+
+    def __init__(self, data_wrapper, score_fun, frame_diff, radius, track_prefix=None,
+                 array_score_fun=None):
+        """Initialization of a vectorized Walker to calculate tracks.
+
+        The waiting list is stored as :obj:`FrameArrays` with the last detection of each track and
+        an array with the time index of the last assignment. The tracks are the same as the
+        tracks of the :class:`.SimpleWalker`.
+
+        Note:
+            Only supports walking on :obj:`.Detection` objects and neither `shards` nor
+            `checkpoint` in :meth:`calc_tracks`.
+
+        Arguments:
+            data_wrapper (:obj:`.DataWrapper`): a :obj:`.DataWrapper` object to access frame objects
+            score_fun (func): scoring function to calculate the weights between two frame objects
+            frame_diff (int): after n frames a close track if no matching object is found
+            radius (int): radius in image coordinates to restrict neighborhood search
+
+        Keyword Argument:
+            track_prefix (Optional str): prefix for :attr:`.Track.id` for unique track ids
+            array_score_fun (Optional func): scoring function on :obj:`FrameArrays`, default is
+                `score_fun` adapted via :func:`make_array_score_fun`
+        """
+        super(VectorizedWalker, self).__init__(data_wrapper, score_fun, frame_diff, radius,
+                                               track_prefix=track_prefix)
+        self.array_score_fun = array_score_fun or make_array_score_fun(score_fun)
+
+    def calc_tracks(self, start=None, stop=None, workers=None, use_threads=False, shards=None,
+                    overlap=None, checkpoint=None):
+        self._check_walk_arguments(shards=shards, checkpoint=checkpoint)
+        return super(VectorizedWalker, self).calc_tracks(
+            start=start, stop=stop, workers=workers, use_threads=use_threads, overlap=overlap)
+
+    def iter_tracks(self, start=None, stop=None, checkpoint=None):
+        self._check_walk_arguments(checkpoint=checkpoint)
+        return super(VectorizedWalker, self).iter_tracks(start=start, stop=stop)
+
+    @staticmethod
+    def _check_walk_arguments(shards=None, checkpoint=None):
+        """Rejects the arguments of :meth:`calc_tracks` that the :class:`VectorizedWalker` does
+        not support.
+
+        Keyword Arguments:
+            shards (Optional int): number of time windows per camera
+            checkpoint (Optional str): directory to save checkpoints in
+
+        Raises:
+            NotImplementedError: if `shards` or `checkpoint` is used
+        """
+        if shards is not None and shards > 1:
+            raise NotImplementedError("The VectorizedWalker does not support shards, walk the "
+                                      "cameras in parallel with workers instead.")
+        if checkpoint is not None:
+            raise NotImplementedError("The VectorizedWalker does not support checkpoints.")
+
+    def _iter_camera(self, cam_id, start, stop):
+        if isinstance(self.data, DataWrapperTracks):
+            raise NotImplementedError("The VectorizedWalker is only implemented for detections.")
+
+        tstamps = self.data.get_time_index(cam_id=cam_id)
+        waiting, waiting_time = None, None
+        for time_idx, tstamp in enumerate(tstamps):
+            # not within time range (yet)
+            if start is not None and tstamp < start:
+                continue
+
+            # out of time range (now)
+            if stop is not None and tstamp >= stop:
+                break
+
+            # close tracks
+            if waiting is not None:
+                closed = (time_idx - waiting_time) > self.frame_diff
+                for track in waiting.objects[closed]:
+                    yield track
+                waiting, waiting_time = take_frame_arrays(waiting, ~closed), waiting_time[~closed]
+
+            detections = self._get_frame_objects(cam_id, tstamp,
+                                                 [] if waiting is None else waiting.ids)
+            if len(detections) == 0:
+                continue
+            columns = None
+            if isinstance(self.data, DataWrapperColumnar):
+                columns = self.data.get_frame_columns(cam_id, tstamp)
+            frame = make_frame_arrays(detections, columns=columns)
+            assigned = self._calc_assign_arrays(cam_id, time_idx, tstamp, frame, waiting,
+                                                waiting_time)
+            waiting, waiting_time = self._calc_initialize_arrays(
+                time_idx, take_frame_arrays(frame, ~assigned), waiting, waiting_time)
+
+        # close remaining tracks
+        if waiting is not None:
+            for track in waiting.objects:
+                yield track
+
+    def _calc_assign_arrays(self, cam_id, time_idx, tstamp, frame, waiting, waiting_time):
+        """Assigns the detections of a frame to the waiting tracks.
+
+        The waiting arrays are updated in place.
+
+        Arguments:
+            cam_id (int): the cam to consider
+            time_idx (int): current time index
+            tstamp (tstamp): the current tstamp
+            frame (:obj:`FrameArrays`): the detections of the current frame
+            waiting (:obj:`FrameArrays`): the last detections of the waiting tracks
+            waiting_time (:obj:`np.array`): time indices of the last assignment to waiting tracks
+
+        Returns:
+            :obj:`np.array`: boolean mask with the assigned detections of `frame`
+        """
+        assigned = np.zeros(len(frame.ids), dtype=bool)
+        if waiting is None or len(waiting.ids) == 0:
+            return assigned
+
+        # make claims, the spatial tree of the frame is cached by the data wrapper
+        tracks = list(waiting.objects)
+        if self.motion_model is None:
+            points, radii = np.column_stack((waiting.x, waiting.y)), self.radius
+        else:
+            points, radii = self.motion_model.predict(
+                tracks, time_idx - waiting_time, tstamp, self.radius)
+        rows, cols = self.data.get_neighbors_bulk(tracks, cam_id, radii, tstamp, points=points)
+        if len(rows) == 0:
+            return assigned
+        costs = np.asarray(self.array_score_fun(take_frame_arrays(waiting, rows),
+                                                take_frame_arrays(frame, cols)), dtype=float)
+
+        # resolve claims with the tracks in the same order as the SimpleWalker
+        if self.sort_claims:
+            order = np.argsort(waiting.ids, kind='mergesort')
+            ranks = np.empty(len(order), dtype=int)
+            ranks[order] = np.arange(len(order))
+            rows = ranks[rows]
+        rows, cols = self._resolve_claims_sparse(rows, cols, costs,
+                                                 (len(waiting.ids), len(frame.ids)))
+        if self.sort_claims:
+            rows = order[rows]
+
+        # update waiting tracks
+        assigned[cols] = True
+        waiting_time[rows] = time_idx
+        for field in ('ids', 'x', 'y', 'orientation', 'beeId'):
+            getattr(waiting, field)[rows] = getattr(frame, field)[cols]
+        for track, detection in zip(waiting.objects[rows], frame.objects[cols]):
+            track.ids.append(detection.id)
+            track.timestamps.append(tstamp)
+            track.meta[DETKEY].append(detection)
+        return assigned
+
+    def _calc_initialize_arrays(self, time_idx, frame, waiting, waiting_time):
+        """Starts a new track for each detection and adds them to the waiting arrays.
+
+        Arguments:
+            time_idx (int): current time index
+            frame (:obj:`FrameArrays`): the detections that start new tracks
+            waiting (:obj:`FrameArrays`): the last detections of the waiting tracks
+            waiting_time (:obj:`np.array`): time indices of the last assignment to waiting tracks
+
+        Returns:
+            tuple: tuple containing:
+                - **waiting** (:obj:`FrameArrays`): the waiting arrays with the new tracks
+                - **waiting_time** (:obj:`np.array`): time indices with the new tracks
+        """
+        tracks = np.empty(len(frame.ids), dtype=object)
+        for idx, detection in enumerate(frame.objects):
+            tracks[idx] = Track(id=self._make_track_id(self.track_id_count + idx),
+                                ids=[detection.id], timestamps=[detection.timestamp],
+                                meta={DETKEY: [detection, ]})
+        self.track_id_count += len(tracks)
+        new_waiting = frame._replace(objects=tracks)
+        new_time = np.full(len(tracks), time_idx, dtype=int)
+        if waiting is None:
+            return new_waiting, new_time
+        return (FrameArrays(*[np.concatenate((array, new_array))
+                              for array, new_array in zip(waiting, new_waiting)]),
+                np.concatenate((waiting_time, new_time)))
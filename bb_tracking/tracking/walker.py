@@ -6,11 +6,38 @@ You basically *just* have to provide a scoring function. Examples and helpers to
 functions are provided in :mod:`.training`.
 """
 # pylint:disable=too-many-arguments,too-few-public-methods
+from bisect import bisect_left
 import copy
+import heapq
+from itertools import chain, count
+import multiprocessing
+from multiprocessing.pool import ThreadPool
+import os
 import numpy as np
 from scipy.optimize import linear_sum_assignment
-from ..data import DataWrapperTracks, Detection, Track
+from six.moves import cPickle as pickle
+from timeit import default_timer
+from .assignment import resolve_claims_auction, resolve_claims_auto, resolve_claims_dense, \
+    resolve_claims_greedy, resolve_claims_sparse
+from ..data import DataWrapperTracks, DataWrapperWindowed, Detection, RopeList, TimeIndex, Track
 from ..data.constants import DETKEY
+from .stats import WalkerStats
+
+_POOL_WALKER = None
+""":obj:`SimpleWalker`: walker of a process pool worker, set via :func:`_init_pool_walker`"""
+
+
+def _init_pool_walker(walker):
+    """Initializer for process pool workers to hand over the walker only once per worker."""
+    global _POOL_WALKER  # pylint:disable=global-statement
+    _POOL_WALKER = walker
+
+
+def _run_pool_task(args):
+    """Runs ``(method, task)`` with the walker of a process pool worker, see
+    :meth:`SimpleWalker._map_tasks`."""
+    method, task = args
+    return getattr(_POOL_WALKER, method)(task)
 
 
 class SimpleWalker(object):
@@ -29,6 +56,28 @@ class SimpleWalker(object):
     """float: used to mark non assignable pairs in a cost matrix"""
     prune_weight = 1000.
     """float: used to ignore claims with bad weights"""
+    assignment = 'dense'
+    """str or func: ``'dense'`` to resolve the claims on the full cost matrix, ``'sparse'`` to
+    resolve them per connected component, ``'auction'`` to resolve them up to a tolerance (see
+    :attr:`auction_epsilon`), ``'greedy'`` to assign the cheapest claims first and ``'auto'`` to
+    select the exact or the greedy assignment per frame. A function with the signature
+    ``fun(rows, cols, costs, shape, max_weight)`` is used as it is. The ``'sparse'`` assignment
+    has the same minimal costs as ``'dense'``, but might break ties between equal costs
+    differently."""
+    sparse_min_size = 10000
+    """int: minimum number of cells in the cost matrix of a connected component of claims to use a
+    sparse solver. Only relevant for the ``'sparse'`` and ``'auto'`` assignment."""
+    greedy_min_claims = None
+    """int: minimum number of claims in a frame to resolve them greedy with the ``'auto'``
+    assignment, :obj:`None` to always resolve them exactly"""
+    auction_epsilon = 1e-3
+    """float: bid increment of the last phase of the ``'auction'`` assignment. The total costs of
+    a frame are at most ``auction_epsilon`` per track above the minimum, a coarse value needs
+    fewer bidding rounds."""
+    sort_claims = False
+    """bool: resolve the claims with the waiting tracks ordered by the id of their last detection
+    instead of the order of the waiting list. Always used for the walks of shards, so ties are
+    broken independently of where a walk started."""
     min_track_start_length = 1
     """int: minimum length of track to start a new track as base of a path.
     Only relevant when assigning :obj:`.Track` to other :obj:`Track` objects."""
@@ -36,6 +85,13 @@ class SimpleWalker(object):
     """(:obj:`set`): keeps track of all the tracks that are already assigned"""
     track_prefix = None
     """str: prefix for :attr:`.Track.id` for unique track ids over several instances"""
+    motion_model = None
+    """object: optional motion model to predict positions and gates, see :mod:`.motion`"""
+    checkpoint_interval = 1000
+    """int: number of frames of a camera between two checkpoints"""
+    stats = None
+    """:obj:`.WalkerStats`: optional statistics of the stages of the walk, :obj:`None` disables
+    the instrumentation"""
 
     def __init__(self, data_wrapper, score_fun, frame_diff, radius, track_prefix=None):
         """Initialization of a simple Walker to calculate tracks.
@@ -62,45 +118,676 @@ class SimpleWalker(object):
         self.track_prefix = track_prefix
         self.assigned_tracks = set()
 
-    def calc_tracks(self, start=None, stop=None):
+    def calc_tracks(self, start=None, stop=None, workers=None, use_threads=False, shards=None,
+                    overlap=None, checkpoint=None):
         """Merge frame objects to bigger :obj:`.Track` objects.
 
         Note:
             At the moment this walker only considers the frame objects on each camera separately.
             This will have to be adjusted once the stitching is completed.
 
+        The cameras never share tracks, so with `workers` each camera is walked in its own worker.
+        The track ids are renumbered afterwards, so the result is the same as walking the cameras
+        one after another. A process pool relies on *fork* to hand the walker to the workers
+        (otherwise the walker including `score_fun` has to be picklable), a thread pool shares
+        the walker and works with any `score_fun`. A :class:`.DataWrapperWindowed` can not be
+        shared, so it is only walked with a process pool and without `shards`.
+
+        With `shards` the frames of each camera are split in time windows that are walked
+        independently and stitched afterwards, see :meth:`_stitch_shards`. Only supported for
+        :obj:`.Detection` objects. The shards always resolve the claims with :attr:`sort_claims`.
+        The stitched tracks are only identical to the tracks of a sequential walk with
+        :attr:`sort_claims` if `score_fun` uses no more than the last detection of a waiting track.
+
+        With `checkpoint` the state of the walker is saved every :attr:`checkpoint_interval`
+        frames, so an interrupted run can be continued via :meth:`resume`. Not supported in
+        combination with `workers` or `shards`.
+
+        With `workers` or `shards` each isolated walk collects its own :attr:`stats`, they are
+        merged into :attr:`stats` once all walks are finished. The frames and tracks are counted
+        for the merged result, the timers and histograms also contain the frames a shard is
+        walked before its time window.
+
         Keyword Arguments:
             start (tstamp): restrict to frames with tstamp >= start
             stop (tstamp): restrict to frames with tstamp < stop
+            workers (Optional int): number of workers to walk the cameras (or shards) in parallel
+            use_threads (Optional bool): use a thread pool instead of a process pool for `workers`
+            shards (Optional int): number of time windows per camera
+            overlap (Optional int): number of frames a shard is walked before its time window,
+                at least :attr:`frame_diff` (default: ``2 * (frame_diff + 1)``)
+            checkpoint (Optional str): directory to save checkpoints in
 
         Returns:
             :obj:`list` of :obj:`.Track`: :obj:`list` of merged :obj:`.Track`
         """
+        cam_ids = list(self.data.get_camids())
+        if isinstance(self.data, DataWrapperWindowed) and (
+                (shards is not None and shards > 1) or
+                (use_threads and workers is not None and workers > 1)):
+            raise NotImplementedError("DataWrapperWindowed can not be shared by shards or threads.")
+        if checkpoint is not None:
+            assert (workers is None or workers <= 1) and (shards is None or shards <= 1), \
+                "Checkpoints are not supported with workers or shards."
+            return list(self.iter_tracks(start=start, stop=stop, checkpoint=checkpoint))
+        if self.stats is not None:
+            self.stats.start()
+        if shards is not None and shards > 1:
+            return self._calc_tracks_sharded(cam_ids, start, stop, workers, use_threads,
+                                             shards, overlap)
+        if workers is None or workers <= 1 or len(cam_ids) <= 1:
+            return list(self.iter_tracks(start=start, stop=stop))
+
+        tasks = [(cam_id, start, stop) for cam_id in cam_ids]
+        return self._merge_isolated(
+            self._map_tasks('_walk_camera_isolated', tasks, workers, use_threads))
+
+    def iter_tracks(self, start=None, stop=None, checkpoint=None):
+        """Merge frame objects to bigger :obj:`.Track` objects and yield them once they are closed.
+
+        Same as :meth:`calc_tracks` without workers or shards, but the walker does not keep the
+        closed tracks. So the tracks can be processed while walking through the data without
+        holding all of them in memory.
+
+        Keyword Arguments:
+            start (tstamp): restrict to frames with tstamp >= start
+            stop (tstamp): restrict to frames with tstamp < stop
+            checkpoint (Optional str): directory to save checkpoints in, see :meth:`resume`
+
+        Yields:
+            :obj:`.Track`: the closed tracks in the same order as returned by :meth:`calc_tracks`
+        """
+        if checkpoint is not None:
+            tracks = self._iter_checkpointed(checkpoint, start=start, stop=stop)
+        else:
+            tracks = (track for cam_id in self.data.get_camids()
+                      for track in self._iter_camera(cam_id, start, stop))
+        for track in tracks:
+            if self.stats is not None:
+                self.stats.count('tracks_closed')
+            yield track
+
+    def resume(self, checkpoint):
+        """Continues an interrupted :meth:`calc_tracks` run from its last checkpoint.
+
+        The walker needs the same data, scoring function and parameters as the interrupted run.
+
+        Arguments:
+            checkpoint (str): directory with the checkpoints of the interrupted run
+
+        Returns:
+            :obj:`list` of :obj:`.Track`: all tracks, the same as from an uninterrupted run
+        """
+        return list(self.iter_resume(checkpoint))
+
+    def iter_resume(self, checkpoint):
+        """Continues an interrupted :meth:`iter_tracks` run from its last checkpoint.
+
+        The tracks that were closed before the checkpoint are read from the checkpoint directory,
+        so all tracks are yielded in the same order as in an uninterrupted run.
+
+        Arguments:
+            checkpoint (str): directory with the checkpoints of the interrupted run
+
+        Yields:
+            :obj:`.Track`: the closed tracks
+        """
+        with open(os.path.join(checkpoint, self._checkpoint_state), 'rb') as state_file:
+            state = pickle.load(state_file)
+        assert state['cam_ids'] == list(self.data.get_camids()), \
+            "The checkpoint does not match the data."
+        for track in self._iter_checkpointed(checkpoint, state=state):
+            yield track
+
+    _checkpoint_state = 'state.pkl'
+    """str: file name of the walker state in a checkpoint directory"""
+    _checkpoint_tracks = 'tracks.pkl'
+    """str: file name of the closed tracks in a checkpoint directory"""
+
+    def _iter_checkpointed(self, checkpoint, start=None, stop=None, state=None):
+        """Walks through all cameras and saves a checkpoint every :attr:`checkpoint_interval`
+        frames.
+
+        The closed tracks are appended to a file in the `checkpoint` directory. A checkpoint is
+        the state of the walker, the position in the data and the size of the tracks file. It
+        replaces the previous checkpoint atomically.
+
+        Arguments:
+            checkpoint (str): directory to save checkpoints in
+
+        Keyword Arguments:
+            start (tstamp): restrict to frames with tstamp >= start
+            stop (tstamp): restrict to frames with tstamp < stop
+            state (Optional :obj:`dict`): checkpoint to continue from
+
+        Yields:
+            :obj:`.Track`: the closed tracks including the ones from before `state`
+        """
+        tracks_path = os.path.join(checkpoint, self._checkpoint_tracks)
+        cam_ids = list(self.data.get_camids())
+        if state is None:
+            if not os.path.isdir(checkpoint):
+                os.makedirs(checkpoint)
+            state = dict(cam_ids=cam_ids, start=start, stop=stop, cam_idx=0, time_idx=None,
+                         waiting=[], n_tracks=0, tracks_offset=0)
+            open(tracks_path, 'wb').close()
+        else:
+            self.track_id_count = state['track_id_count']
+            self.assigned_tracks = state['assigned_tracks']
+            # remove tracks that were written after the checkpoint
+            with open(tracks_path, 'r+b') as tracks_file:
+                tracks_file.truncate(state['tracks_offset'])
+            with open(tracks_path, 'rb') as tracks_file:
+                for _ in range(state['n_tracks']):
+                    yield pickle.load(tracks_file)
+
         if isinstance(self.data, DataWrapperTracks):
             calc_timestep = self._calc_timestep_tracks
         else:
             calc_timestep = self._calc_timestep_detections
 
+        n_tracks = state['n_tracks']
+        closed_tracks = []
+        with open(tracks_path, 'ab') as tracks_file:
+            for cam_idx in range(state['cam_idx'], len(cam_ids)):
+                cam_id = cam_ids[cam_idx]
+                tstamps = self.data.get_time_index(cam_id=cam_id)
+                first_idx, last_idx = tstamps.get_range(state['start'], state['stop'])
+                resumed_idx, waiting = None, []
+                if cam_idx == state['cam_idx'] and state['time_idx'] is not None:
+                    resumed_idx, waiting = state['time_idx'], state['waiting']
+                for time_idx in range(first_idx if resumed_idx is None else resumed_idx,
+                                      last_idx):
+                    if (time_idx - first_idx) % self.checkpoint_interval == 0 and \
+                       time_idx != resumed_idx:
+                        state.update(cam_idx=cam_idx, time_idx=time_idx, waiting=waiting,
+                                     n_tracks=n_tracks)
+                        self._save_checkpoint(checkpoint, state, tracks_file)
+                    waiting = calc_timestep(cam_id, time_idx, tstamps[time_idx], tstamps,
+                                            waiting, closed_tracks)
+                    # close remaining tracks after the last frame
+                    if time_idx == last_idx - 1:
+                        closed_tracks.extend(waiting_track for _, waiting_track in waiting)
+                    for track in closed_tracks:
+                        track = self._flatten_track(track)
+                        pickle.dump(track, tracks_file, pickle.HIGHEST_PROTOCOL)
+                        n_tracks += 1
+                        yield track
+                    del closed_tracks[:]
+            # mark the walk as finished
+            state.update(cam_idx=len(cam_ids), time_idx=None, waiting=[], n_tracks=n_tracks)
+            self._save_checkpoint(checkpoint, state, tracks_file)
+
+    def _save_checkpoint(self, checkpoint, state, tracks_file):
+        """Saves the `state` of the walk and replaces the previous checkpoint.
+
+        Arguments:
+            checkpoint (str): directory to save checkpoints in
+            state (:obj:`dict`): position and waiting list of the walk
+            tracks_file (file): the opened file with the closed tracks
+        """
+        tracks_file.flush()
+        os.fsync(tracks_file.fileno())
+        state.update(track_id_count=self.track_id_count, assigned_tracks=self.assigned_tracks,
+                     tracks_offset=tracks_file.tell())
+        state_path = os.path.join(checkpoint, self._checkpoint_state)
+        with open(state_path + '.tmp', 'wb') as state_file:
+            pickle.dump(state, state_file, pickle.HIGHEST_PROTOCOL)
+            state_file.flush()
+            os.fsync(state_file.fileno())
+        os.rename(state_path + '.tmp', state_path)
+
+    def _map_tasks(self, method, tasks, workers, use_threads):
+        """Runs the walker `method` for each task, in a process or thread pool with `workers`.
+
+        Arguments:
+            method (str): name of the walker method that is called with a single task
+            tasks (:obj:`list`): the tasks to process
+            workers (int): number of workers, runs in this process if :obj:`None` or 1
+            use_threads (bool): use a thread pool instead of a process pool
+
+        Returns:
+            :obj:`list`: the results of `method` in the order of `tasks`
+        """
+        if workers is None or workers <= 1:
+            return [getattr(self, method)(task) for task in tasks]
+        if use_threads:
+            pool = ThreadPool(processes=workers)
+            map_args = (getattr(self, method), tasks)
+        else:
+            pool = multiprocessing.Pool(processes=workers, initializer=_init_pool_walker,
+                                        initargs=(self, ))
+            map_args = (_run_pool_task, [(method, task) for task in tasks])
+        try:
+            return pool.map(*map_args)
+        finally:
+            pool.close()
+            pool.join()
+
+    def _walk_camera(self, cam_id, start, stop):
+        """Walks through all frames of one camera and closes the remaining tracks at the end.
+
+        Arguments:
+            cam_id (int): the cam to consider
+            start (tstamp): restrict to frames with tstamp >= start
+            stop (tstamp): restrict to frames with tstamp < stop
+
+        Returns:
+            :obj:`list` of :obj:`.Track`: closed tracks in the order they were closed
+        """
+        return list(self._iter_camera(cam_id, start, stop))
+
+    def _iter_camera(self, cam_id, start, stop):
+        """Walks through all frames of one camera and yields the tracks once they are closed.
+
+        Arguments:
+            cam_id (int): the cam to consider
+            start (tstamp): restrict to frames with tstamp >= start
+            stop (tstamp): restrict to frames with tstamp < stop
+
+        Yields:
+            :obj:`.Track`: closed tracks in the order they were closed
+        """
+        if isinstance(self.data, DataWrapperTracks):
+            for track in self._iter_camera_tracks(cam_id, start, stop):
+                yield track
+            return
+
         closed_tracks = []
-        for cam_id in self.data.get_camids():
-            tstamps = self.data.get_timestamps(cam_id=cam_id)
-            waiting = []
-            for time_idx, tstamp in enumerate(tstamps):
-                # not within time range (yet)
-                if start is not None and tstamp < start:
+        tstamps = self.data.get_time_index(cam_id=cam_id)
+        waiting = []
+        for time_idx, tstamp in enumerate(tstamps):
+            # not within time range (yet)
+            if start is not None and tstamp < start:
+                continue
+
+            # out of time range (now)
+            if stop is not None and tstamp >= stop:
+                break
+
+            waiting = self._calc_timestep_detections(cam_id, time_idx, tstamp, tstamps, waiting,
+                                                     closed_tracks)
+            for track in closed_tracks:
+                yield self._flatten_track(track)
+            del closed_tracks[:]
+
+        # close remaining tracks
+        for _, waiting_track in waiting:
+            yield self._flatten_track(waiting_track)
+
+    def _iter_camera_tracks(self, cam_id, start, stop):
+        """Walks through the frames of one camera with :obj:`.Track` starts.
+
+        Most frames have no track starts, so only the frames of
+        :meth:`.DataWrapperTracks.get_timestamps_starting` are visited. Tracks are closed via a
+        priority queue with the time index of their expiry, so the tracks are the same and closed
+        in the same order as by :meth:`_calc_timestep_tracks` on every frame.
+
+        Arguments:
+            cam_id (int): the cam to consider
+            start (tstamp): restrict to frames with tstamp >= start
+            stop (tstamp): restrict to frames with tstamp < stop
+
+        Yields:
+            :obj:`.Track`: closed tracks in the order they were closed
+        """
+        tstamps = self.data.get_time_index(cam_id=cam_id)
+        first_idx, last_idx = tstamps.get_range(start, stop)
+        event_indices = tstamps.get_indices(self.data.get_timestamps_starting(cam_id))
+        event_indices = event_indices[(event_indices >= first_idx) & (event_indices < last_idx)]
+        for track in self._iter_events_tracks(cam_id, tstamps, event_indices.tolist(), last_idx):
+            yield track
+
+    def _iter_events_tracks(self, cam_id, tstamps, event_indices, last_idx):
+        """Walks through the frames of one camera with the time indices of `event_indices`.
+
+        The time indices are only requested from `event_indices` when the walk reaches them, so
+        the track starts of a frame might be added to :attr:`data` while walking.
+
+        Arguments:
+            cam_id (int): the cam to consider
+            tstamps (:obj:`.TimeIndex`): all available timestamps of the camera
+            event_indices (iterable of int): ascending time indices of the frames with track starts
+            last_idx (int): time index of the first frame that is not walked
+
+        Yields:
+            :obj:`.Track`: closed tracks in the order they were closed
+        """
+        # entries are (expiry index, position in waiting list, waiting entry), an entry is
+        # outdated if the track was extended since
+        expiries = []
+        scheduled = dict()
+        positions = count()
+        waiting = []
+        for time_idx in chain(event_indices, [last_idx]):
+            # close tracks that expired since the last event, the order is the same as when
+            # closing them frame by frame
+            closed = set()
+            while len(expiries) > 0 and expiries[0][0] <= min(time_idx, last_idx - 1):
+                expiry, _, entry = heapq.heappop(expiries)
+                if scheduled.get(id(entry), (None, ))[0] != expiry:
                     continue
+                del scheduled[id(entry)]
+                closed.add(id(entry))
+                yield self._flatten_track(entry[1])
+            if len(closed) > 0:
+                waiting = [entry for entry in waiting if id(entry) not in closed]
+            if time_idx == last_idx:
+                break
+
+            tstamp = tstamps[time_idx]
+            fot = self._get_frame_objects(cam_id, tstamp, waiting, starting=True)
+            assigned = set()
+            if waiting:
+                waiting, assigned = self._calc_assign(cam_id, time_idx, tstamp, tstamps, fot,
+                                                      waiting)
+            self.assigned_tracks |= set([frame_object.id for frame_object in fot])
+            unassigned = [frame_object for frame_object in fot if frame_object.id not in assigned]
+            waiting = self._calc_initialize(time_idx, tstamps, unassigned, waiting)
+
+            # schedule new and extended tracks
+            for entry in waiting:
+                expiry = entry[0] + self.frame_diff + 1
+                previous = scheduled.get(id(entry))
+                if previous is None:
+                    previous = (None, next(positions))
+                if previous[0] != expiry:
+                    scheduled[id(entry)] = (expiry, previous[1])
+                    heapq.heappush(expiries, (expiry, previous[1], entry))
+
+        # close remaining tracks
+        for _, waiting_track in waiting:
+            yield self._flatten_track(waiting_track)
+
+    @staticmethod
+    def _flatten_track(track):
+        """Converts the :obj:`.RopeList` objects of a track to lists.
+
+        Arguments:
+            track (:obj:`.Track`): a closed track
+
+        Returns:
+            :obj:`.Track`: the track with lists only
+        """
+        if not isinstance(track.ids, RopeList):
+            return track
+        meta = {key: list(value) if isinstance(value, RopeList) else value
+                for key, value in track.meta.items()}
+        return track._replace(ids=list(track.ids), timestamps=list(track.timestamps), meta=meta)
+
+    def _walk_camera_isolated(self, task):
+        """Walks one camera on a copy of the walker that counts track ids from zero.
+
+        Arguments:
+            task (tuple): ``(cam_id, start, stop)`` as used by :meth:`_walk_camera`
+
+        Returns:
+            tuple: tuple containing:
+                - **closed_tracks** (:obj:`list` of :obj:`.Track`): tracks with local int ids
+                - **track_id_count** (int): number of track ids used on this camera
+                - **assigned_tracks** (:obj:`set`): ids of assigned tracks on this camera
+                - **stats** (:obj:`.WalkerStats`): statistics of the walk or :obj:`None`
+        """
+        walker = self._isolated_copy()
+        closed_tracks = walker._walk_camera(*task)
+        return closed_tracks, walker.track_id_count, walker.assigned_tracks, walker.stats
+
+    def _isolated_copy(self):
+        """Returns a shallow copy of the walker with its own counters, statistics and local int
+        track ids."""
+        walker = copy.copy(self)
+        walker.track_id_count = 0
+        walker.track_prefix = None
+        walker.assigned_tracks = set()
+        if self.stats is not None:
+            walker.stats = WalkerStats()
+        return walker
+
+    def _calc_tracks_sharded(self, cam_ids, start, stop, workers, use_threads, shards, overlap):
+        """Walks the cameras in time windows and stitches them, see :meth:`calc_tracks`.
+
+        Arguments:
+            cam_ids (:obj:`list` of int): the cams to consider
+            start (tstamp): restrict to frames with tstamp >= start
+            stop (tstamp): restrict to frames with tstamp < stop
+            workers (int): number of workers to walk the shards in parallel
+            use_threads (bool): use a thread pool instead of a process pool
+            shards (int): number of time windows per camera
+            overlap (int): number of frames a shard is walked before its time window
+
+        Returns:
+            :obj:`list` of :obj:`.Track`: :obj:`list` of merged :obj:`.Track`
+        """
+        if isinstance(self.data, DataWrapperTracks):
+            raise NotImplementedError("Sharded walking is only implemented for detections.")
+        if overlap is None:
+            overlap = 2 * (self.frame_diff + 1)
+        assert overlap >= self.frame_diff, "The overlap has to be at least frame_diff frames."
+
+        tasks, cam_bounds = [], []
+        for cam_id in cam_ids:
+            first_idx, last_idx = self.data.get_time_index(cam_id=cam_id).get_range(start, stop)
+            n_shards = max(1, min(shards, last_idx - first_idx))
+            bounds = [first_idx + i * (last_idx - first_idx) // n_shards
+                      for i in range(n_shards + 1)]
+            cam_bounds.append(bounds)
+            tasks.append((cam_id, bounds[0], bounds[0], bounds[1], 0))
+            for i in range(1, n_shards):
+                tasks.append((cam_id, max(first_idx, bounds[i] - overlap), bounds[i],
+                              bounds[i + 1], overlap))
+        results = self._map_tasks('_walk_shard', tasks, workers, use_threads)
+
+        cam_results = []
+        for cam_id, bounds in zip(cam_ids, cam_bounds):
+            n_shards = len(bounds) - 1
+            cam_results.append(self._stitch_shards(cam_id, bounds, results[:n_shards]))
+            results = results[n_shards:]
+        return self._merge_isolated(cam_results)
+
+    def _walk_shard(self, task):
+        """Walks one time window of a camera on a copy of the walker with local track ids.
+
+        The walk starts some frames before the window to warm up the waiting list. For the first
+        frames of the window the state of the waiting list is recorded, so that
+        :meth:`_stitch_shards` finds the frame where the walk synchronizes with the walk of the
+        preceding window.
+
+        Arguments:
+            task (tuple): ``(cam_id, warmup_idx, window_idx, stop_idx, n_snapshots)`` with
+                indices in the timestamps of the camera
+
+        Returns:
+            tuple: tuple containing:
+                - **closed_tracks** (:obj:`list` of :obj:`.Track`): tracks closed in the walk
+                - **waiting** (:obj:`list` of :obj:`.Track`): the waiting list at `stop_idx`
+                - **snapshots** (:obj:`dict`): ``{time_idx: state}`` mapping with the
+                  :meth:`_waiting_state` before the frame with `time_idx` is walked
+                - **stats** (:obj:`.WalkerStats`): statistics of the walk or :obj:`None`
+        """
+        cam_id, warmup_idx, window_idx, stop_idx, n_snapshots = task
+        walker = self._isolated_copy()
+        walker.sort_claims = True
+        tstamps = self.data.get_time_index(cam_id=cam_id)
+        closed_tracks, waiting, snapshots = [], [], dict()
+        for time_idx in range(warmup_idx, stop_idx):
+            if window_idx <= time_idx < window_idx + n_snapshots:
+                snapshots[time_idx] = self._waiting_state(waiting)
+            waiting = walker._calc_timestep_detections(cam_id, time_idx, tstamps[time_idx],
+                                                       tstamps, waiting, closed_tracks)
+        return closed_tracks, waiting, snapshots, walker.stats
+
+    def _waiting_state(self, waiting):
+        """Describes the waiting list by the last detections and time index of its tracks.
 
-                # out of time range (now)
-                if stop is not None and tstamp >= stop:
+        Without :attr:`motion_model` only the last detection of a track is considered, otherwise
+        the last ``motion_model.history`` detections the prediction depends on.
+
+        Arguments:
+            waiting (list of :obj:`.Track`): the waiting list with tracks to be extended or closed
+
+        Returns:
+            :obj:`frozenset`: set with ``(time_idx, detection ids)`` tuples
+        """
+        history = 1 if self.motion_model is None else self.motion_model.history
+        return frozenset((time_idx, tuple(track.ids[-history:])) for time_idx, track in waiting)
+
+    def _stitch_shards(self, cam_id, bounds, shard_results):
+        """Stitches the walks of consecutive time windows of a camera.
+
+        The walk of the preceding windows is authoritative. It is continued into the next window
+        until its waiting list matches a recorded state of the next walk. From this frame on both
+        walks are equal, so the open tracks are extended with the detections the next walk
+        assigned afterwards and the tracks of the warm up are dropped. If the walks do not
+        synchronize the whole window is walked again from the authoritative state.
+
+        Note:
+            The result is only identical to a sequential walk if `score_fun` considers no more
+            than the last detection of a waiting track, like the scoring function generated by
+            :func:`.make_detection_score_fun`.
+
+        Arguments:
+            cam_id (int): the cam to consider
+            bounds (:obj:`list` of int): time indices of the window borders
+            shard_results (:obj:`list` of tuple): results of :meth:`_walk_shard` for the windows
+
+        Returns:
+            tuple: same as :meth:`_walk_camera_isolated`
+        """
+        walker = self._isolated_copy()
+        walker.sort_claims = True
+        tstamps = self.data.get_time_index(cam_id=cam_id)
+        closed_tracks, waiting, _, _ = shard_results[0]
+        for i in range(1, len(shard_results)):
+            shard_closed, shard_waiting, snapshots, _ = shard_results[i]
+            sync_idx = None
+            for time_idx in range(bounds[i], bounds[i + 1]):
+                if time_idx in snapshots and snapshots[time_idx] == self._waiting_state(waiting):
+                    sync_idx = time_idx
                     break
+                waiting = walker._calc_timestep_detections(cam_id, time_idx, tstamps[time_idx],
+                                                           tstamps, waiting, closed_tracks)
+            # the window was walked again if there was no synchronization
+            if sync_idx is not None:
+                waiting = self._stitch_tracks(tstamps[sync_idx], waiting, closed_tracks,
+                                              shard_closed, shard_waiting)
+        tracks = closed_tracks + [track for _, track in waiting]
+        stats = walker.stats
+        if stats is not None:
+            # the timers and histograms include the warm up, the frames and tracks are counted
+            # like in a sequential walk
+            for shard_result in shard_results:
+                stats.merge(shard_result[3], counters=False)
+            stats.counters, stats.frames = dict(), bounds[-1] - bounds[0]
+            if len(tracks) > 0:
+                stats.count('tracks_opened', len(tracks))
+        return self._sequential_order(cam_id, bounds[-1], tracks), len(tracks), set(), stats
 
-                waiting = calc_timestep(cam_id, time_idx, tstamp, tstamps, waiting, closed_tracks)
+    @staticmethod
+    def _stitch_tracks(sync_tstamp, waiting, closed_tracks, shard_closed, shard_waiting):
+        """Extends the waiting tracks with the tracks of the next shard at `sync_tstamp`.
 
-            # close remaining tracks
-            for _, waiting_track in waiting:
-                closed_tracks.append(waiting_track)
+        Arguments:
+            sync_tstamp (tstamp): timestamp of the frame where both walks are synchronized
+            waiting (list of :obj:`.Track`): the authoritative waiting list at `sync_tstamp`
+            closed_tracks (list of :obj:`.Track`): authoritative closed tracks, will be extended
+            shard_closed (list of :obj:`.Track`): closed tracks of the next shard
+            shard_waiting (list of :obj:`.Track`): the waiting list at the end of the next shard
+
+        Returns:
+            list of :obj:`.Track`: the waiting list at the end of the next shard
+        """
+        tails = {track.ids[-1]: track for _, track in waiting}
+
+        def stitch(track):
+            """Returns the stitched track or :obj:`None` if the track was closed before."""
+            if track.timestamps[0] >= sync_tstamp:
+                return track
+            tail_idx = bisect_left(track.timestamps, sync_tstamp) - 1
+            base_track = tails.get(track.ids[tail_idx])
+            if base_track is not None:
+                base_track.ids.extend(track.ids[tail_idx + 1:])
+                base_track.timestamps.extend(track.timestamps[tail_idx + 1:])
+                base_track.meta[DETKEY].extend(track.meta[DETKEY][tail_idx + 1:])
+            return base_track
+
+        for track in shard_closed:
+            track = stitch(track)
+            if track is not None:
+                closed_tracks.append(track)
+        return [[time_idx, stitch(track)] for time_idx, track in shard_waiting]
+
+    def _sequential_order(self, cam_id, stop_idx, tracks):
+        """Numbers and orders tracks of a camera like :meth:`_walk_camera` would.
+
+        A sequential walk creates tracks frame by frame in the order of the frame objects and
+        closes them :attr:`frame_diff` frames after their last detection in order of creation.
+
+        Arguments:
+            cam_id (int): the cam to consider
+            stop_idx (int): time index of the first frame that is not walked
+            tracks (list of :obj:`.Track`): the tracks of the camera
+
+        Returns:
+            list of :obj:`.Track`: tracks with local int ids in the order they are closed
+        """
+        time_index = self.data.get_time_index(cam_id=cam_id)
+        frame_positions = dict()
+        creation_keys = []
+        for track in tracks:
+            tstamp = track.timestamps[0]
+            if tstamp not in frame_positions:
+                frame_objects = self.data.get_frame_objects(cam_id=cam_id, timestamp=tstamp)
+                frame_positions[tstamp] = {fo.id: pos for pos, fo in enumerate(frame_objects)}
+            creation_keys.append((time_index.index(tstamp), frame_positions[tstamp][track.ids[0]]))
+        ranks = [0] * len(tracks)
+        for rank, idx in enumerate(sorted(range(len(tracks)), key=creation_keys.__getitem__)):
+            ranks[idx] = rank
+        close_keys = [(min(time_index.index(track.timestamps[-1]) + self.frame_diff + 1, stop_idx),
+                       ranks[idx]) for idx, track in enumerate(tracks)]
+        return [tracks[idx]._replace(id=ranks[idx])
+                for idx in sorted(range(len(tracks)), key=close_keys.__getitem__)]
+
+    def _merge_isolated(self, results):
+        """Merges the results of :meth:`_walk_camera_isolated` in camera order.
+
+        The local track ids are shifted by the ids used on the cameras before, so the ids are the
+        same as if the cameras were walked one after another by this walker. The statistics of the
+        cameras are added to :attr:`stats`.
+
+        Arguments:
+            results (:obj:`list` of tuple): results of :meth:`_walk_camera_isolated`
+
+        Returns:
+            :obj:`list` of :obj:`.Track`: :obj:`list` of merged :obj:`.Track`
+        """
+        closed_tracks = []
+        for cam_tracks, track_id_count, assigned_tracks, stats in results:
+            for track in cam_tracks:
+                closed_tracks.append(
+                    track._replace(id=self._make_track_id(self.track_id_count + track.id)))
+            self.track_id_count += track_id_count
+            self.assigned_tracks |= assigned_tracks
+            if self.stats is not None:
+                self.stats.merge(stats)
+                if len(cam_tracks) > 0:
+                    self.stats.count('tracks_closed', len(cam_tracks))
+        if self.stats is not None and self.stats.emit_interval is not None:
+            self.stats.emit()
         return closed_tracks
 
+    def _make_track_id(self, count):
+        """Generates the :attr:`.Track.id` for the given counter value.
+
+        Arguments:
+            count (int): value of the track id counter
+
+        Returns:
+            int or str: the track id, prefixed with :attr:`track_prefix` if set
+        """
+        if self.track_prefix is None:
+            return count
+        return "".join([self.track_prefix, str(count)])
+
     def _calc_timestep_detections(self, cam_id, time_idx, tstamp, tstamps, waiting, closed_tracks):
         """Assigns detections of type :obj:`Detection` to tracks :obj:`Track` in the waiting list.
 
@@ -108,7 +795,7 @@ class SimpleWalker(object):
             cam_id (int): the cam to consider
             time_idx (int): current time index in `tstamps`
             tstamp (tstamp): the current timestamp
-            tstamps (list of timestamps): list of all available timestamps for walker
+            tstamps (:obj:`.TimeIndex` or list of timestamps): all available timestamps for walker
             waiting (:obj:`list` of :obj:`.Track`): the waiting list with tracks to be extended
                 or closed
             closed_tracks (:obj:`list` of :obj:`.Track`): list with closed tracks
@@ -116,7 +803,7 @@ class SimpleWalker(object):
         Returns:
             list of obj:`.Track`: new waiting list with new or extended tracks
         """
-        frame_objects = self.data.get_frame_objects(cam_id=cam_id, timestamp=tstamp)
+        frame_objects = self._get_frame_objects(cam_id, tstamp, waiting)
         # no waiting tracks so load all from current frame
         if not waiting:
             waiting = self._calc_initialize(time_idx, tstamps, frame_objects, waiting)
@@ -126,10 +813,9 @@ class SimpleWalker(object):
         # assign frame objects to tracks
         waiting, assigned = self._calc_assign(cam_id, time_idx, tstamp, tstamps,
                                               frame_objects, waiting)
-        # add unclaimed frame objects as new tracks
-        unassigned = set([obj.id for obj in frame_objects]) - assigned
-        return self._calc_initialize(time_idx, tstamps,
-                                     self.data.get_detections(unassigned), waiting)
+        # add unclaimed frame objects as new tracks (keep frame order for deterministic track ids)
+        unassigned = [obj for obj in frame_objects if obj.id not in assigned]
+        return self._calc_initialize(time_idx, tstamps, unassigned, waiting)
 
     def _calc_timestep_tracks(self, cam_id, time_idx, tstamp, tstamps, waiting, closed_tracks):
         """Assigns tracks of type :obj:`.Track` to other tracks of type :obj:`.Track`
@@ -139,7 +825,7 @@ class SimpleWalker(object):
             cam_id (int): the cam to consider
             time_idx (int): current time index in `tstamps`
             tstamp (tstamp): the current tstamp
-            tstamps (list of timestamps): list of all available timestamps for walker
+            tstamps (:obj:`.TimeIndex` or list of timestamps): all available timestamps for walker
             waiting (:obj:`list` of :obj:`.Track`): the waiting list with tracks to be extended
                 or closed
             closed_tracks (:obj:`list` of :obj:`.Track`): list with closed tracks
@@ -147,7 +833,7 @@ class SimpleWalker(object):
         Returns:
             :obj:`list` of obj:`.Track`: new waiting list with new or extended tracks
         """
-        fot = self.data.get_frame_objects_starting(cam_id=cam_id, timestamp=tstamp)
+        fot = self._get_frame_objects(cam_id, tstamp, waiting, starting=True)
         # no waiting tracks so load all from current frame
         if not waiting:
             waiting = self._calc_initialize(time_idx, tstamps, fot, waiting)
@@ -158,17 +844,43 @@ class SimpleWalker(object):
         # assign frame objects to tracks
         waiting, assigned = self._calc_assign(cam_id, time_idx, tstamp, tstamps, fot, waiting)
         # add unclaimed frame objects as new tracks
-        all_ids = set([frame_object.id for frame_object in fot])
-        self.assigned_tracks |= all_ids
-        unassigned = all_ids - assigned
-        return self._calc_initialize(time_idx, tstamps, self.data.get_tracks(unassigned), waiting)
+        self.assigned_tracks |= set([frame_object.id for frame_object in fot])
+        unassigned = [frame_object for frame_object in fot if frame_object.id not in assigned]
+        return self._calc_initialize(time_idx, tstamps, unassigned, waiting)
+
+    def _get_frame_objects(self, cam_id, tstamp, waiting, starting=False):
+        """Loads the frame objects of a frame and counts the frame in :attr:`stats`.
+
+        Arguments:
+            cam_id (int): the cam to consider
+            tstamp (tstamp): the current tstamp
+            waiting (list of :obj:`.Track`): the waiting list at the beginning of the frame
+
+        Keyword Arguments:
+            starting (Optional bool): load the :obj:`.Track` objects starting in the frame
+
+        Returns:
+            list of :obj:`.Detection` or :obj:`.Track`: the frame objects
+        """
+        stats = self.stats
+        if stats is not None:
+            started = default_timer()
+        if starting:
+            frame_objects = self.data.get_frame_objects_starting(cam_id=cam_id, timestamp=tstamp)
+        else:
+            frame_objects = self.data.get_frame_objects(cam_id=cam_id, timestamp=tstamp)
+        if stats is not None:
+            stats.add_time('frame_objects', default_timer() - started)
+            stats.observe('waiting', len(waiting))
+            stats.add_frame()
+        return frame_objects
 
     def _calc_initialize(self, time_idx, tstamps, frame_objects, waiting):
         """Initializes the waiting list with Tracks.
 
         Arguments:
             time_idx (int): current time index in `tstamps`
-            tstamps (list of timestamps): list of all available timestamps for walker
+            tstamps (:obj:`.TimeIndex` or list of timestamps): all available timestamps for walker
             frame_objects (list of :obj:`.Detection` or :obj:`.Track`): the frame objects associated
                 with the current frame
             waiting (list of :obj:`.Track`): the waiting list with tracks to be extended or closed
@@ -178,33 +890,38 @@ class SimpleWalker(object):
         """
         if len(frame_objects) == 0:
             return waiting
+        stats = self.stats
+        if stats is not None:
+            started, n_waiting = default_timer(), len(waiting)
         object_type = type(frame_objects[0])
         if object_type is Detection:
             for frame_object in frame_objects:
-                if self.track_prefix is None:
-                    track_id = self.track_id_count
-                else:
-                    track_id = "".join([self.track_prefix, str(self.track_id_count)])
+                track_id = self._make_track_id(self.track_id_count)
                 waiting.append([time_idx, Track(id=track_id,
                                                 ids=[frame_object.id],
                                                 timestamps=[frame_object.timestamp],
                                                 meta={DETKEY: [frame_object, ]})])
                 self.track_id_count += 1
         elif object_type is Track:
+            time_index = self._get_time_index(tstamps)
             for frame_object in frame_objects:
                 if len(frame_object.ids) >= self.min_track_start_length:
-                    if self.track_prefix is None:
-                        track_id = self.track_id_count
-                    else:
-                        track_id = "".join([self.track_prefix, str(self.track_id_count)])
-                    track = copy.deepcopy(frame_object)
+                    track_id = self._make_track_id(self.track_id_count)
+                    # reference the lists of the track instead of copying them
+                    meta = {key: RopeList([value]) if isinstance(value, list)
+                            else copy.deepcopy(value) for key, value in frame_object.meta.items()}
+                    track = Track(id=track_id, ids=RopeList([frame_object.ids]),
+                                  timestamps=RopeList([frame_object.timestamps]), meta=meta)
                     # get offset because a track has a length
-                    new_time_idx = np.where(np.array(tstamps) == track.timestamps[-1])[0][0]
-                    waiting.append([new_time_idx, track._replace(id=track_id)])
+                    new_time_idx = time_index.index(track.timestamps[-1])
+                    waiting.append([new_time_idx, track])
                     self.track_id_count += 1
         else:
             raise TypeError("Type {0} not supported.".format(object_type))
 
+        if stats is not None:
+            stats.add_time('bookkeeping', default_timer() - started)
+            stats.count('tracks_opened', len(waiting) - n_waiting)
         return waiting
 
     def _calc_close_tracks(self, time_idx, waiting, closed_tracks):
@@ -218,12 +935,17 @@ class SimpleWalker(object):
         Returns:
             waiting (list of :obj:`.Track`): the waiting list with tracks to be extended or closed
         """
+        stats = self.stats
+        if stats is not None:
+            started = default_timer()
         new_waiting = []
         for time_last_add, waiting_track in waiting:
             if (time_idx - time_last_add) > self.frame_diff:
                 closed_tracks.append(waiting_track)
             else:
                 new_waiting.append([time_last_add, waiting_track])
+        if stats is not None:
+            stats.add_time('bookkeeping', default_timer() - started)
         return new_waiting
 
     def _calc_assign(self, cam_id, time_idx, tstamp, tstamps, frame_objects, waiting):
@@ -233,7 +955,7 @@ class SimpleWalker(object):
             cam_id (int): the cam to consider
             time_idx (int): current time index in `tstamps`
             tstamp (tstamp): the current tstamp
-            tstamps (list of timestamps): list of all available timestamps for walker
+            tstamps (:obj:`.TimeIndex` or list of timestamps): all available timestamps for walker
             frame_objects (list of :obj:`.Detection` or :obj:`.Track`): the frame objects associated
                 with the current frame
             waiting (list of :obj:`.Track`): the waiting list with tracks to be extended or closed
@@ -248,16 +970,27 @@ class SimpleWalker(object):
             return waiting, set()
         if not isinstance(frame_objects[0], (Detection, Track)):
             raise TypeError("Type {0} not supported.".format(type(frame_objects[0])))
-        # make claims
-        cost_matrix = self._calc_make_claims(cam_id, time_idx, tstamp, frame_objects, waiting)
-        # resolve claims
+        # make claims and resolve them, optionally with the tracks in a canonical order so the
+        # assignment does not depend on the order of the waiting list
+        waiting_indices, fo_indices, costs = self._calc_make_claims_sparse(
+            cam_id, time_idx, tstamp, frame_objects, waiting)
+        if self.sort_claims:
+            order = self._claims_order(waiting)
+            ranks = np.empty(len(order), dtype=int)
+            ranks[order] = np.arange(len(order))
+            waiting_indices = ranks[waiting_indices]
+        else:
+            order = np.arange(len(waiting))
+        time_index = self._get_time_index(tstamps)
         assigned = set()
-        rows, cols = self._resolve_claims(cost_matrix)
+        rows, cols = self._resolve_claims_sparse(waiting_indices, fo_indices, costs,
+                                                 (len(waiting), len(frame_objects)))
+        stats = self.stats
+        if stats is not None:
+            started = default_timer()
         # append assigned frame objects to tracks
-        for waiting_idx, fo_idx in zip(rows, cols):
-            # do not add if cost is too high
-            if cost_matrix[waiting_idx, fo_idx] >= self.max_weight:
-                continue
+        for row, fo_idx in zip(rows, cols):
+            waiting_idx = order[row]
             waiting[waiting_idx][0] = time_idx
 
             frame_object = frame_objects[fo_idx]
@@ -269,9 +1002,10 @@ class SimpleWalker(object):
                 track.meta[DETKEY].append(frame_object)
             elif isinstance(frame_object, Track):
                 # get offset because a track has a length and we won't see it again for some time
-                new_time_idx = np.where(np.array(tstamps) == frame_object.timestamps[-1])[0][0]
+                new_time_idx = time_index.index(frame_object.timestamps[-1])
 
                 waiting[waiting_idx][0] = new_time_idx
+                # tracks from _calc_initialize only reference the lists of frame_object
                 track.ids.extend(frame_object.ids)
                 track.timestamps.extend(frame_object.timestamps)
                 for key in track.meta.keys():
@@ -282,8 +1016,37 @@ class SimpleWalker(object):
             else:  # pragma: no cover
                 raise TypeError("Type {0} not supported.".format(type(frame_object)))
 
+        if stats is not None:
+            stats.add_time('bookkeeping', default_timer() - started)
         return waiting, assigned
 
+    @staticmethod
+    def _get_time_index(tstamps):
+        """Returns `tstamps` as :obj:`.TimeIndex` to look up the index of timestamps.
+
+        Arguments:
+            tstamps (:obj:`.TimeIndex` or list of timestamps): all available timestamps for walker
+
+        Returns:
+            :obj:`.TimeIndex`: `tstamps` or a new :obj:`.TimeIndex` if it is a list
+        """
+        if isinstance(tstamps, TimeIndex):
+            return tstamps
+        return TimeIndex(tstamps)
+
+    @staticmethod
+    def _claims_order(waiting):
+        """Orders the waiting list by the id of the last detection of each track.
+
+        Arguments:
+            waiting (list of :obj:`.Track`): the waiting list with tracks to be extended or closed
+
+        Returns:
+            :obj:`np.array`: indices of the waiting list in canonical order
+        """
+        return np.array(sorted(range(len(waiting)), key=lambda idx: waiting[idx][1].ids[-1]),
+                        dtype=int)
+
     def _calc_make_claims(self, cam_id, time_idx, tstamp, frame_objects, waiting):
         """Make claims for tracks in waiting list.
 
@@ -299,26 +1062,57 @@ class SimpleWalker(object):
             cost_matrix (:obj:`np.array`): Matrix with waiting (row)
                 to frame object (col) assignment weight
         """
-        # pylint:disable=too-many-locals
-        fo_index_rev = {fo.id: value for value, fo in enumerate(frame_objects)}
+        waiting_indices, fo_indices, costs = self._calc_make_claims_sparse(
+            cam_id, time_idx, tstamp, frame_objects, waiting)
+        cost_matrix = np.full((len(waiting), len(frame_objects)), self.max_weight)
+        cost_matrix[waiting_indices, fo_indices] = costs
+        return cost_matrix
 
-        waiting_indices, fo_indices, tracks_path, fo_test = [], [], [], []
-        for i, (track_time_idx, track_path) in enumerate(waiting):
-            if track_time_idx >= time_idx:
-                continue
-            neighbors = self.data.get_neighbors(track_path, cam_id,
-                                                radius=self.radius, timestamp=tstamp)
-            if not neighbors:
-                continue
+    def _calc_make_claims_sparse(self, cam_id, time_idx, tstamp, frame_objects, waiting):
+        """Make claims for tracks in waiting list as sparse list of weighted pairs.
 
-            waiting_indices.extend([i] * len(neighbors))
-            fo_indices.extend([fo_index_rev[fo.id] for fo in neighbors])
-            tracks_path.extend([track_path] * len(neighbors))
-            fo_test.extend(neighbors)
-        cost_matrix = np.full((len(waiting), len(fo_index_rev)), self.max_weight)
-        if len(fo_test) > 0:
-            cost_matrix[waiting_indices, fo_indices] = self.score_fun(tracks_path, fo_test)
-        return cost_matrix
+        Arguments:
+            cam_id (int): the cam to consider
+            time_idx (int): current time index in `tstamps`
+            tstamp (tstamp): the current tstamp
+            frame_objects (list of :obj:`.Detection` or :obj:`.Track`): the frame objects associated
+                with the current frame
+            waiting (list of :obj:`.Track`): the waiting list with tracks to be extended or closed
+
+        Returns:
+            tuple: tuple containing:
+                - **waiting_indices** (:obj:`np.array`): indices in the waiting list
+                - **fo_indices** (:obj:`np.array`): indices in `frame_objects`
+                - **costs** (:obj:`np.array`): assignment weight of each pair
+        """
+        rows = [i for i, (track_time_idx, _) in enumerate(waiting) if track_time_idx < time_idx]
+        if len(rows) == 0:
+            return np.empty(0, dtype=int), np.empty(0, dtype=int), np.empty(0)
+        tracks_path = [waiting[i][1] for i in rows]
+        stats = self.stats
+        if stats is not None:
+            started = default_timer()
+        # one spatial query for all the tracks that are due
+        if self.motion_model is None:
+            query_indices, fo_indices = self.data.get_neighbors_bulk(tracks_path, cam_id,
+                                                                     self.radius, tstamp)
+        else:
+            gaps = time_idx - np.array([waiting[i][0] for i in rows])
+            points, radii = self.motion_model.predict(tracks_path, gaps, tstamp, self.radius)
+            query_indices, fo_indices = self.data.get_neighbors_bulk(
+                tracks_path, cam_id, radii, tstamp, points=points)
+        if stats is not None:
+            stats.add_time('neighbors', default_timer() - started)
+            stats.observe('candidates', len(query_indices))
+        if len(query_indices) == 0:
+            return np.empty(0, dtype=int), np.empty(0, dtype=int), np.empty(0)
+        if stats is not None:
+            started = default_timer()
+        costs = self.score_fun([tracks_path[i] for i in query_indices],
+                               [frame_objects[i] for i in fo_indices])
+        if stats is not None:
+            stats.add_time('scoring', default_timer() - started)
+        return np.array(rows)[query_indices], fo_indices, np.asarray(costs, dtype=float)
 
     def _resolve_claims(self, cost_matrix):
         """Resolves claims in cost_matrix.
@@ -333,3 +1127,62 @@ class SimpleWalker(object):
         """
         cost_matrix[cost_matrix >= self.prune_weight] = self.max_weight
         return linear_sum_assignment(cost_matrix)
+
+    def _resolve_claims_sparse(self, rows, cols, costs, shape):
+        """Resolves claims given as weighted pairs.
+
+        Claims with weights of at least :attr:`prune_weight` or :attr:`max_weight` are ignored.
+        Depending on :attr:`assignment` the claims are resolved per connected component, on the
+        full cost matrix or with one of the other functions of :mod:`.assignment`. Only the
+        ``'greedy'`` and ``'auction'`` assignment might not find the minimal costs.
+
+        Arguments:
+            rows (:obj:`np.array`): row indices of the claims
+            cols (:obj:`np.array`): column indices of the claims
+            costs (:obj:`np.array`): weights of the claims
+            shape (tuple): shape of the cost matrix
+
+        Returns:
+            rows (:obj:`np.array`): Row Indices that are assigned to columns
+            cols (:obj:`np.array`): Col Indices that are assigned to rows in same order
+        """
+        assert callable(self.assignment) or \
+            self.assignment in ('sparse', 'dense', 'auction', 'greedy', 'auto'), \
+            "Assignment {0} not supported.".format(self.assignment)
+        mask = costs < min(self.prune_weight, self.max_weight)
+        rows, cols, costs = rows[mask], cols[mask], costs[mask]
+        if self.stats is None:
+            return self._call_assignment(rows, cols, costs, shape)
+        started = default_timer()
+        result = self._call_assignment(rows, cols, costs, shape)
+        self.stats.add_time('assignment', default_timer() - started)
+        self.stats.observe('cost_matrix', tuple(shape))
+        return result
+
+    def _call_assignment(self, rows, cols, costs, shape):
+        """Calls the function of :attr:`assignment` with the claims that are not ignored.
+
+        Arguments:
+            rows (:obj:`np.array`): row indices of the claims
+            cols (:obj:`np.array`): column indices of the claims
+            costs (:obj:`np.array`): weights of the claims
+            shape (tuple): shape of the cost matrix
+
+        Returns:
+            tuple: ``(rows, cols)`` arrays with the assigned claims
+        """
+        if callable(self.assignment):
+            return self.assignment(rows, cols, costs, shape, self.max_weight)
+        elif self.assignment == 'dense':
+            return resolve_claims_dense(rows, cols, costs, shape, self.max_weight)
+        elif self.assignment == 'auction':
+            return resolve_claims_auction(rows, cols, costs, shape, self.max_weight,
+                                          epsilon=self.auction_epsilon)
+        elif self.assignment == 'greedy':
+            return resolve_claims_greedy(rows, cols, costs, shape, self.max_weight)
+        elif self.assignment == 'auto':
+            return resolve_claims_auto(rows, cols, costs, shape, self.max_weight,
+                                       sparse_min_size=self.sparse_min_size,
+                                       greedy_min_claims=self.greedy_min_claims)
+        return resolve_claims_sparse(rows, cols, costs, shape, self.max_weight,
+                                     sparse_min_size=self.sparse_min_size)
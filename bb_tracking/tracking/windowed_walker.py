@@ -0,0 +1,238 @@
+# -*- coding: utf-8 -*-
+"""Provides a walker that assigns the detections of several frames at once.
+
+The :class:`SimpleWalker` decides the assignments frame by frame. The :class:`WindowedWalker`
+collects the claims of all frames in a window of :attr:`WindowedWalker.window_size` frames,
+scores them with one call of the scoring function and resolves them as one problem. A detection
+of the window might be linked to a waiting track or to a detection of an earlier frame of the
+window, so gaps are closed jointly for the whole window.
+
+Every detection has at most one predecessor and one successor and links only point forward in
+time. The min-cost flow through the window is therefore a minimum weight matching between the
+predecessors (waiting tracks and detections) and the detections of the window, that is resolved
+with the same functions as the claims of a single frame (see :attr:`.SimpleWalker.assignment`).
+"""
+import numpy as np
+from scipy.spatial import cKDTree
+from ..data import DataWrapperTracks, Detection, Track
+from ..data.constants import DETKEY
+from .walker import SimpleWalker
+
+
+class WindowedWalker(SimpleWalker):
+    """Class for walking through the beesbook data in windows of several frames.
+
+    Note:
+        :meth:`calc_tracks` does not support `shards` and `checkpoint`. The cameras can still be
+        walked in parallel with `workers`.
+    """
+    window_size = None
+    """int: number of frames that are assigned at once"""
+    assignment = 'sparse'
+    """str or func: see :attr:`.SimpleWalker.assignment`, the claims of a window form many small
+    connected components, so they are resolved per component by default"""
+
+    def __init__(self, data_wrapper, score_fun, frame_diff, radius, window_size=10,
+                 track_prefix=None):
+        """Initialization of a windowed Walker to calculate tracks.
+
+        Detections of the window are scored as tracks with a single detection, because the tracks
+        they belong to are not known before the window is resolved. With a `window_size` of one
+        the tracks are the same as the tracks of the :class:`.SimpleWalker`.
+
+        Note:
+            Only supports walking on :obj:`.Detection` objects.
+
+        Arguments:
+            data_wrapper (:obj:`.DataWrapper`): a :obj:`.DataWrapper` object to access frame objects
+            score_fun (func): scoring function to calculate the weights between two frame objects
+            frame_diff (int): after n frames a close track if no matching object is found
+            radius (int): radius in image coordinates to restrict neighborhood search
+
+        Keyword Argument:
+            window_size (Optional int): number of frames that are assigned at once
+            track_prefix (Optional str): prefix for :attr:`.Track.id` for unique track ids
+        """
+        assert window_size > 0, "A window has at least one frame."
+        super(WindowedWalker, self).__init__(data_wrapper, score_fun, frame_diff, radius,
+                                             track_prefix=track_prefix)
+        self.window_size = window_size
+
+    def calc_tracks(self, start=None, stop=None, workers=None, use_threads=False, shards=None,
+                    overlap=None, checkpoint=None):
+        self._check_walk_arguments(shards=shards, checkpoint=checkpoint)
+        return super(WindowedWalker, self).calc_tracks(
+            start=start, stop=stop, workers=workers, use_threads=use_threads, overlap=overlap)
+
+    def iter_tracks(self, start=None, stop=None, checkpoint=None):
+        self._check_walk_arguments(checkpoint=checkpoint)
+        return super(WindowedWalker, self).iter_tracks(start=start, stop=stop)
+
+    @staticmethod
+    def _check_walk_arguments(shards=None, checkpoint=None):
+        """Rejects the arguments of :meth:`calc_tracks` that the :class:`WindowedWalker` does not
+        support.
+
+        The windows of the shards would have to be aligned for the stitching and a checkpoint
+        would have to save the open window.
+
+        Keyword Arguments:
+            shards (Optional int): number of time windows per camera
+            checkpoint (Optional str): directory to save checkpoints in
+
+        Raises:
+            NotImplementedError: if `shards` or `checkpoint` is used
+        """
+        if shards is not None and shards > 1:
+            raise NotImplementedError("The WindowedWalker does not support shards, walk the "
+                                      "cameras in parallel with workers instead.")
+        if checkpoint is not None:
+            raise NotImplementedError("The WindowedWalker does not support checkpoints.")
+
+    def _iter_camera(self, cam_id, start, stop):
+        if isinstance(self.data, DataWrapperTracks):
+            raise NotImplementedError("The WindowedWalker is only implemented for detections.")
+
+        tstamps = self.data.get_time_index(cam_id=cam_id)
+        frames = [(time_idx, tstamp) for time_idx, tstamp in enumerate(tstamps)
+                  if (start is None or tstamp >= start) and (stop is None or tstamp < stop)]
+        closed_tracks, waiting = [], []
+        for offset in range(0, len(frames), self.window_size):
+            window = frames[offset:offset + self.window_size]
+            waiting = self._calc_close_tracks(window[0][0], waiting, closed_tracks)
+            for track in closed_tracks:
+                yield track
+            del closed_tracks[:]
+            waiting = self._calc_window(cam_id, window, waiting)
+
+        # close remaining tracks
+        for _, waiting_track in waiting:
+            yield waiting_track
+
+    def _calc_window(self, cam_id, window, waiting):
+        """Assigns the detections of a window to the waiting tracks and to each other.
+
+        Arguments:
+            cam_id (int): the cam to consider
+            window (:obj:`list` of tuple): ``(time_idx, tstamp)`` of the frames in the window
+            waiting (list of :obj:`.Track`): the waiting list with tracks that can be extended in
+                the first frame of the window
+
+        Returns:
+            list of :obj:`.Track`: new waiting list with new or extended tracks
+        """
+        # pylint:disable=too-many-locals
+        frame_objects = [self._get_frame_objects(cam_id, tstamp, waiting) for _, tstamp in window]
+        detections = [detection for objects in frame_objects for detection in objects]
+        for detection in detections:
+            if not isinstance(detection, Detection):
+                raise TypeError("Type {0} not supported.".format(type(detection)))
+        offsets = np.cumsum([0] + [len(objects) for objects in frame_objects])
+        frame_indices = np.repeat(np.arange(len(window)), np.diff(offsets))
+        detection_times = np.array([time_idx for time_idx, _ in window], dtype=int)[frame_indices]
+
+        # predecessors are the waiting tracks in canonical order and the detections of the window
+        entries = [waiting[idx] for idx in self._claims_order(waiting)]
+        paths = [track for _, track in entries] + [None] * len(detections)
+        track_times = np.array([time_idx for time_idx, _ in entries], dtype=int)
+
+        # claims of the waiting tracks frame by frame
+        rows, cols = [np.empty(0, dtype=int)], [np.empty(0, dtype=int)]
+        for frame_idx, (time_idx, tstamp) in enumerate(window):
+            if offsets[frame_idx] == offsets[frame_idx + 1]:
+                continue
+            gaps = time_idx - track_times
+            due = np.flatnonzero((gaps > 0) & (gaps <= self.frame_diff))
+            if len(due) == 0:
+                continue
+            due_paths = [paths[idx] for idx in due]
+            if self.motion_model is None:
+                query_indices, det_indices = self.data.get_neighbors_bulk(
+                    due_paths, cam_id, self.radius, tstamp)
+            else:
+                points, radii = self.motion_model.predict(due_paths, gaps[due], tstamp,
+                                                          self.radius)
+                query_indices, det_indices = self.data.get_neighbors_bulk(
+                    due_paths, cam_id, radii, tstamp, points=points)
+            rows.append(due[query_indices])
+            cols.append(offsets[frame_idx] + np.asarray(det_indices, dtype=int))
+
+        # claims between the detections of the window
+        pairs = self._calc_window_pairs(detections, detection_times)
+        rows.append(len(entries) + pairs[:, 0])
+        cols.append(pairs[:, 1])
+        rows, cols = np.concatenate(rows), np.concatenate(cols)
+        costs = self._calc_window_scores(paths, detections, rows, cols, len(entries))
+        rows, cols = self._resolve_claims_sparse(rows, cols, costs,
+                                                 (len(paths), len(detections)))
+
+        # follow the links in frame order, unassigned detections start new tracks
+        predecessors = np.full(len(detections), -1, dtype=int)
+        predecessors[cols] = rows
+        path_entries = entries + [None] * len(detections)
+        new_entries = []
+        for det_idx, (detection, frame_idx, predecessor) in enumerate(
+                zip(detections, frame_indices.tolist(), predecessors.tolist())):
+            time_idx, tstamp = window[frame_idx]
+            if predecessor < 0:
+                entry = [time_idx, Track(id=self._make_track_id(self.track_id_count),
+                                         ids=[detection.id], timestamps=[detection.timestamp],
+                                         meta={DETKEY: [detection, ]})]
+                self.track_id_count += 1
+                new_entries.append(entry)
+            else:
+                entry = path_entries[predecessor]
+                entry[0] = time_idx
+                entry[1].ids.append(detection.id)
+                entry[1].timestamps.append(tstamp)
+                entry[1].meta[DETKEY].append(detection)
+            path_entries[len(entries) + det_idx] = entry
+        return waiting + new_entries
+
+    def _calc_window_pairs(self, detections, detection_times):
+        """Finds the pairs of detections of a window that are close enough to be linked.
+
+        The frames of the window are stacked and searched with one spatial query. The detections
+        of the window have no motion history, so they are searched within :attr:`radius`.
+
+        Arguments:
+            detections (:obj:`list` of :obj:`.Detection`): the detections of the window in frame
+                order
+            detection_times (:obj:`np.array`): time index of the frame of each detection
+
+        Returns:
+            :obj:`np.array`: ``(predecessor, successor)`` rows with indices in `detections`
+        """
+        if len(detections) < 2 or detection_times[0] == detection_times[-1]:
+            return np.empty((0, 2), dtype=int)
+        points = np.array([(detection.x, detection.y) for detection in detections], dtype=float)
+        pairs = cKDTree(points).query_pairs(self.radius, output_type='ndarray')
+        # the pairs are ordered like the detections and therefore point forward in time
+        pairs = pairs.reshape(-1, 2).astype(int, copy=False)
+        gaps = detection_times[pairs[:, 1]] - detection_times[pairs[:, 0]]
+        return pairs[(gaps > 0) & (gaps <= self.frame_diff)]
+
+    def _calc_window_scores(self, paths, detections, rows, cols, n_tracks):
+        """Scores the claims of a window with one call of the scoring function.
+
+        The detections of the window that claim a successor are scored as tracks with a single
+        detection. Only these tracks are created and stored in `paths`.
+
+        Arguments:
+            paths (list): the waiting tracks followed by a placeholder for each window detection
+            detections (:obj:`list` of :obj:`.Detection`): the detections of the window
+            rows (:obj:`np.array`): indices of the claiming paths
+            cols (:obj:`np.array`): indices of the claimed detections
+            n_tracks (int): number of waiting tracks at the beginning of `paths`
+
+        Returns:
+            :obj:`np.array`: the weight of each claim
+        """
+        if len(rows) == 0:
+            return np.empty(0)
+        for path_idx in np.unique(rows[rows >= n_tracks]).tolist():
+            detection = detections[path_idx - n_tracks]
+            paths[path_idx] = Track(id=None, ids=[detection.id], timestamps=[detection.timestamp],
+                                    meta={DETKEY: [detection, ]})
+        return np.asarray(self.score_fun([paths[idx] for idx in rows],
+                                         [detections[idx] for idx in cols]), dtype=float)
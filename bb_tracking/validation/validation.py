@@ -7,7 +7,7 @@ The scores that are calculated and evaluated are defined in :obj:`.Score` and :o
 import math
 import numpy as np
 import pandas as pd
-from ..data import DataWrapperPandas, DataWrapperTracks, Score, ScoreMetrics
+from ..data import DataWrapperPandas, DataWrapperTracks, Score, ScoreMetrics, TimeIndex
 from ..data.constants import CAMKEY, FPKEY, FRAMEIDXKEY
 from ..tracking.scoring import calc_track_ids, bit_array_to_int_v
 
@@ -23,6 +23,8 @@ class Validator(object):
     """:obj:`list` of timestamps: sorted list with all timestamps in truth"""
     cam_timestamps = None
     """:obj:`dict` of :obj:`list`: sorted lists of timestamps in truth for a cam"""
+    _time_indices = None
+    """:obj:`dict`: ``{cam_id: TimeIndex}`` mapping, ``None`` as key for all timestamps"""
 
     def __init__(self, truth_dw):
         """Initialization of class attributes
@@ -31,9 +33,30 @@ class Validator(object):
             truth_dw (:class:`.DataWrapperTruth`): data wrapper with truth data
         """
         self.truth = truth_dw
-        self.timestamps = truth_dw.get_timestamps()
-        self.cam_timestamps = {cam: truth_dw.get_timestamps(cam_id=cam)
-                               for cam in truth_dw.get_camids()}
+        self._time_indices = {cam: truth_dw.get_time_index(cam_id=cam)
+                              for cam in truth_dw.get_camids()}
+        self._time_indices[None] = truth_dw.get_time_index()
+        self.timestamps = self._time_indices[None].timestamps
+        self.cam_timestamps = {cam: time_index.timestamps
+                               for cam, time_index in self._time_indices.items()
+                               if cam is not None}
+
+    def _get_time_index(self, cam_id=None):
+        """Returns the :obj:`.TimeIndex` for :attr:`timestamps` or :attr:`cam_timestamps`.
+
+        Keyword Arguments:
+            cam_id (Optional int): use the timestamps of this camera
+
+        Returns:
+            :obj:`.TimeIndex`: index to look up the position of timestamps
+        """
+        timestamps = self.cam_timestamps[cam_id] if cam_id is not None else self.timestamps
+        time_index = self._time_indices.get(cam_id)
+        # the timestamps might have been replaced after initialization
+        if time_index is None or time_index.timestamps is not timestamps:
+            time_index = TimeIndex(timestamps)
+            self._time_indices[cam_id] = time_index
+        return time_index
 
     def remove_false_positives(self, tracks):
         """Removes tracks with only false positives.
@@ -101,8 +124,8 @@ class Validator(object):
             if track_detection_ids <= false_positives:
                 track.meta[FPKEY] = True
             if gap is not None and len(track.timestamps) > 1:
-                tidx = [list(self.timestamps).index(tstamp) for tstamp in track.timestamps]
-                track_gap = max(j - i for i, j in zip(tidx, tidx[1:])) - 1
+                tidx = self._get_time_index().get_indices(track.timestamps)
+                track_gap = int(np.max(np.diff(tidx))) - 1
                 assert track_gap <= gap,\
                     "The max gap in track {} is {} > {}.".format(track.id, track_gap, gap)
             if cam_gap:
@@ -199,7 +222,8 @@ class Validator(object):
         assert len(set(track_truth.timestamps)) == len(set(track_truth.ids)), \
             "You might have duplicate timestamps in the truth track."
 
-        timestamps = self.cam_timestamps[cam_id] if cam_id is not None else self.timestamps
+        time_index = self._get_time_index(cam_id=cam_id)
+        timestamps = time_index.timestamps
         timestamps_test = track_test.timestamps
         timestamps_truth = track_truth.timestamps
         assert timestamps_test[0] >= timestamps[0], "Track is out of scope for ground truth data."
@@ -208,10 +232,10 @@ class Validator(object):
         # calculate start and end positions for truth track with gaps
         gap_l_offset = gap + 1 if gap_l else 0
         gap_r_offset = gap + 1 if gap_r else 0
-        truth_track_length = math.fabs(list(timestamps).index(timestamps_truth[-1]) -
-                                       list(timestamps).index(timestamps_truth[0])) + 1
-        start_idx = list(timestamps).index(timestamps_test[0])
-        end_idx = list(timestamps).index(timestamps_test[-1]) + 1
+        truth_track_length = math.fabs(time_index.index(timestamps_truth[-1]) -
+                                       time_index.index(timestamps_truth[0])) + 1
+        start_idx = time_index.index(timestamps_test[0])
+        end_idx = time_index.index(timestamps_test[-1]) + 1
         tstamps = timestamps[
             max(0, start_idx - gap_l_offset):min(len(timestamps), end_idx + gap_r_offset)]
 
@@ -224,8 +248,8 @@ class Validator(object):
             truth_local = truth_local[truth_local.index <= tstamps[-1]]
 
         # reset gap offset
-        start_idx_t = list(timestamps).index(truth_local.index[0])
-        end_idx_t = list(timestamps).index(truth_local.index[-1]) + 1
+        start_idx_t = time_index.index(truth_local.index[0])
+        end_idx_t = time_index.index(truth_local.index[-1]) + 1
         tstamps = timestamps[
             max(0, start_idx - gap_l_offset, min(start_idx, start_idx_t - gap_l_offset)):
             min(len(timestamps), end_idx + gap_r_offset, max(end_idx, end_idx_t + gap_r_offset))]
@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+"""Benchmark of the functions of :mod:`bb_tracking.tracking.assignment` on synthetic claims.
+
+Two kinds of claims are generated:
+
+    * ``dense``: every row claims a random fraction of all columns.
+    * ``band``: every row claims a few columns close to its own index, like waiting tracks that
+      only claim detections in their neighborhood.
+
+For every function the best time of ``--repeat`` runs, the number of assigned claims and the
+gap of the total costs to the exact result are printed. The exact result is computed with
+:func:`resolve_claims_sparse` (and :func:`resolve_claims_dense` if the matrix is small enough).
+:func:`resolve_claims_auction` is run with every bid increment of ``--epsilon``.
+
+Example:
+    $ python benchmarks/bench_assignment.py --kind band --size 5000 --claims 8 --epsilon 1e-3 1
+"""
+from __future__ import division, print_function
+import argparse
+from functools import partial
+from timeit import default_timer
+import numpy as np
+from bb_tracking.tracking.assignment import resolve_claims_auction, resolve_claims_auto, \
+    resolve_claims_dense, resolve_claims_greedy, resolve_claims_sparse
+
+MAX_WEIGHT = 1000.
+"""float: weight that marks non assignable pairs"""
+DENSE_MAX_CELLS = 4000 ** 2
+"""int: maximum number of cells of the cost matrix to run :func:`resolve_claims_dense`"""
+
+
+def make_claims(kind, size, n_claims, random_state):
+    """Generates claims for a square cost matrix.
+
+    Arguments:
+        kind (str): ``'dense'`` or ``'band'``
+        size (int): number of rows and columns
+        n_claims (int): number of claims per row
+        random_state (:obj:`np.random.RandomState`): source of random numbers
+
+    Returns:
+        tuple: ``(rows, cols, costs, shape)``
+    """
+    if kind == 'dense':
+        rows, cols = np.nonzero(random_state.rand(size, size) < n_claims / size)
+    else:
+        rows = np.repeat(np.arange(size), n_claims)
+        cols = np.clip(rows + random_state.randint(-n_claims, n_claims + 1, size=len(rows)),
+                       0, size - 1)
+        pairs = np.unique(rows * size + cols)
+        rows, cols = pairs // size, pairs % size
+    costs = random_state.uniform(-5, 20, size=len(rows))
+    return rows, cols, costs, (size, size)
+
+
+def total_costs(result, rows, cols, costs, shape):
+    """Sums the costs of the assigned claims relative to :data:`MAX_WEIGHT`.
+
+    Like in the cost matrix of the walkers an unassigned row costs :data:`MAX_WEIGHT`, so an
+    assignment with less claims is not cheaper.
+
+    Arguments:
+        result (tuple): ``(rows, cols)`` arrays with the assigned claims
+        rows (:obj:`np.array`): row indices of the claims
+        cols (:obj:`np.array`): column indices of the claims
+        costs (:obj:`np.array`): costs of the claims
+        shape (tuple): shape of the cost matrix
+
+    Returns:
+        float: the sum of ``cost - MAX_WEIGHT`` of the assigned claims
+    """
+    lookup = dict(zip(rows * shape[1] + cols, costs))
+    return sum(lookup[row * shape[1] + col] - MAX_WEIGHT for row, col in zip(*result))
+
+
+def run(kind, size, n_claims, repeat, seed, epsilons):
+    """Runs and prints the benchmark for one kind and size of claims.
+
+    Arguments:
+        kind (str): ``'dense'`` or ``'band'``
+        size (int): number of rows and columns
+        n_claims (int): number of claims per row
+        repeat (int): number of runs per function, the best time is printed
+        seed (int): seed for the claims
+        epsilons (:obj:`list` of float): bid increments for :func:`resolve_claims_auction`
+    """
+    rows, cols, costs, shape = make_claims(kind, size, n_claims, np.random.RandomState(seed))
+    funs = [('sparse', resolve_claims_sparse), ('auto', resolve_claims_auto),
+            ('greedy', resolve_claims_greedy)]
+    funs.extend(('auction {:g}'.format(epsilon), partial(resolve_claims_auction, epsilon=epsilon))
+                for epsilon in epsilons)
+    if shape[0] * shape[1] <= DENSE_MAX_CELLS:
+        funs.insert(0, ('dense', resolve_claims_dense))
+    print("{} {}x{}: {} claims".format(kind, shape[0], shape[1], len(costs)))
+    optimum = None
+    for name, fun in funs:
+        times = []
+        for _ in range(repeat):
+            started = default_timer()
+            result = fun(rows, cols, costs, shape, MAX_WEIGHT)
+            times.append(default_timer() - started)
+        result_costs = total_costs(result, rows, cols, costs, shape)
+        if optimum is None:
+            optimum = result_costs
+        print("    {:<14}{:>10.4f}s {:>8} assigned, cost gap {:.2f}".format(
+            name, min(times), len(result[0]), result_costs - optimum))
+
+
+def main():
+    """Parses the command line arguments and runs the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--kind', choices=('dense', 'band'), default='dense')
+    parser.add_argument('--size', type=int, nargs='+', default=[300, 1000])
+    parser.add_argument('--claims', type=int, default=None,
+                        help="claims per row, defaults to size / 2 (dense) or 8 (band)")
+    parser.add_argument('--epsilon', type=float, nargs='*', default=[1e-3, 1.],
+                        help="bid increments of the auction")
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+    for size in args.size:
+        n_claims = args.claims
+        if n_claims is None:
+            n_claims = size // 2 if args.kind == 'dense' else 8
+        run(args.kind, size, n_claims, args.repeat, args.seed, args.epsilon)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+"""Benchmark of reading a *bb_binary* repository into the binary data wrappers.
+
+A synthetic repository with ``--frames`` frames of ``--detections`` detections per camera is
+written to a temporary directory. The construction of :class:`.DataWrapperBinary` and
+:class:`.DataWrapperColumnar` is timed without and with ``--workers`` processes. The time to
+decode the frames via :func:`.decode_frame` alone is printed as well, the rest of a serial
+construction is spent on building the detections (or columns) from the decoded arrays.
+
+Example:
+    $ python benchmarks/bench_decode.py --frames 500 --detections 300 --workers 4
+"""
+from __future__ import division, print_function
+import argparse
+import shutil
+import tempfile
+from timeit import default_timer
+import numpy as np
+import pandas as pd
+from bb_binary import build_frame_container_from_df, Repository
+from bb_tracking.data import DataWrapperBinary, DataWrapperColumnar
+from bb_tracking.data.datawrapper_binary import decode_frame
+
+
+def make_repository(root_dir, n_frames, n_detections, n_cams, random_state):
+    """Writes a repository with random detections.
+
+    Arguments:
+        root_dir (str): directory of the repository
+        n_frames (int): number of frames per camera
+        n_detections (int): number of detections per frame
+        n_cams (int): number of cameras
+        random_state (:obj:`np.random.RandomState`): source of random numbers
+
+    Returns:
+        :class:`bb_binary.Repository`: the repository
+    """
+    repository = Repository(root_dir)
+    frame_offset = 0
+    for cam_id in range(n_cams):
+        size = n_frames * n_detections
+        rotations = random_state.uniform(-np.pi, np.pi, size=size)
+        detections = pd.DataFrame({
+            'camID': cam_id,
+            'timestamp': np.repeat(1459516622. + np.arange(n_frames) / 3., n_detections),
+            'frameIdx': np.repeat(np.arange(n_frames), n_detections),
+            'xpos': random_state.randint(0, 4000, size=size),
+            'ypos': random_state.randint(0, 3000, size=size),
+            'xRotation': rotations,
+            'yRotation': rotations,
+            'zRotation': rotations,
+            'radius': 0,
+            'localizerSaliency': random_state.rand(size),
+            'decodedId': list(random_state.rand(size, 12)),
+        }, index=frame_offset + np.arange(size))
+        frame_container, frame_offset = build_frame_container_from_df(
+            detections, 'detectionsDP', cam_id, frame_offset=frame_offset)
+        repository.add(frame_container)
+    return repository
+
+
+def timed(fun, *args, **kwargs):
+    """Calls `fun` and returns the elapsed time in seconds."""
+    started = default_timer()
+    fun(*args, **kwargs)
+    return default_timer() - started
+
+
+def main():
+    """Parses the command line arguments and runs the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--frames', type=int, default=500, help="frames per camera")
+    parser.add_argument('--detections', type=int, default=300, help="detections per frame")
+    parser.add_argument('--cams', type=int, default=4)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    root_dir = tempfile.mkdtemp()
+    try:
+        repository = make_repository(root_dir, args.frames, args.detections, args.cams,
+                                     np.random.RandomState(args.seed))
+        print("{} cams x {} frames x {} detections".format(args.cams, args.frames,
+                                                           args.detections))
+        decode = timed(lambda: [decode_frame(frame, {})
+                                for frame, _ in repository.iter_frames()])
+        print("    {:<44}{:>8.2f}s".format("decode_frame", decode))
+        for wrapper in (DataWrapperBinary, DataWrapperColumnar):
+            for workers in (None, args.workers):
+                for int_ids in (False, True):
+                    elapsed = timed(wrapper, repository, workers=workers, int_ids=int_ids)
+                    print("    {:<44}{:>8.2f}s".format("{} workers={} int_ids={}".format(
+                        wrapper.__name__, workers, int_ids), elapsed))
+    finally:
+        shutil.rmtree(root_dir)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+"""Benchmark of the memory of the binary data wrappers for the same *bb_binary* repository.
+
+The synthetic repository of :mod:`bench_decode` with ``--frames`` frames of ``--detections``
+detections per camera is written to a temporary directory. Every construction of
+:class:`.DataWrapperBinary` and :class:`.DataWrapperColumnar` runs in a new process, so the
+measurements do not depend on each other:
+
+    * ``traced`` and ``traced peak``: the memory allocated by Python after and during the
+      construction as reported by :mod:`tracemalloc`.
+    * ``peak rss``: the growth of the maximum resident set size of the process, measured in a
+      separate process without :mod:`tracemalloc`.
+
+Example:
+    $ python benchmarks/bench_memory.py --frames 500 --detections 300 --cams 4
+"""
+from __future__ import division, print_function
+import argparse
+import multiprocessing
+import resource
+import shutil
+import tempfile
+import tracemalloc
+import numpy as np
+from bb_binary import Repository
+from bb_tracking.data import DataWrapperBinary, DataWrapperColumnar
+from bench_decode import make_repository
+
+MB = 1024. ** 2
+"""float: bytes per megabyte"""
+
+
+def measure(task):
+    """Constructs a data wrapper and measures its memory.
+
+    Arguments:
+        task (tuple): ``(wrapper, root_dir, int_ids, traced)`` with the class of the data
+            wrapper, the directory of the repository, `int_ids` for the wrapper and whether to
+            trace the allocations with :mod:`tracemalloc`
+
+    Returns:
+        tuple: ``(current, peak)`` traced bytes or the growth of the maximum resident set size in
+        bytes as ``(None, peak)``
+    """
+    wrapper, root_dir, int_ids, traced = task
+    repository = Repository(root_dir)
+    if traced:
+        tracemalloc.start()
+        data = wrapper(repository, int_ids=int_ids)
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del data
+        return current, peak
+    # ru_maxrss is in kilobytes on Linux
+    started = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    data = wrapper(repository, int_ids=int_ids)
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    del data
+    return None, (peak - started) * 1024.
+
+
+def main():
+    """Parses the command line arguments and runs the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--frames', type=int, default=500, help="frames per camera")
+    parser.add_argument('--detections', type=int, default=300, help="detections per frame")
+    parser.add_argument('--cams', type=int, default=4)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    root_dir = tempfile.mkdtemp()
+    try:
+        make_repository(root_dir, args.frames, args.detections, args.cams,
+                        np.random.RandomState(args.seed))
+        n_detections = args.cams * args.frames * args.detections
+        print("{} cams x {} frames x {} detections".format(args.cams, args.frames,
+                                                           args.detections))
+        print("    {:<40}{:>12}{:>14}{:>12}{:>14}".format(
+            "", "traced", "traced peak", "peak rss", "bytes/det"))
+        pool = multiprocessing.Pool(1, maxtasksperchild=1)
+        try:
+            for wrapper in (DataWrapperBinary, DataWrapperColumnar):
+                for int_ids in (False, True):
+                    current, traced_peak = pool.apply(measure, ((wrapper, root_dir, int_ids,
+                                                                 True), ))
+                    _, rss_peak = pool.apply(measure, ((wrapper, root_dir, int_ids, False), ))
+                    print("    {:<40}{:>10.1f}MB{:>12.1f}MB{:>10.1f}MB{:>14.0f}".format(
+                        "{} int_ids={}".format(wrapper.__name__, int_ids), current / MB,
+                        traced_peak / MB, rss_peak / MB, current / n_detections))
+        finally:
+            pool.close()
+            pool.join()
+    finally:
+        shutil.rmtree(root_dir)
+
+
+if __name__ == '__main__':
+    main()
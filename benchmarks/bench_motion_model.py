@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+"""Benchmark of :class:`bb_tracking.tracking.ConstantVelocityModel` on synthetic moving bees.
+
+Every bee moves with a slowly changing velocity and is detected with a probability of
+``--detected`` in each frame. The id bits of the detections are noisy. The same data is walked
+without motion model (fixed :attr:`.SimpleWalker.radius`) and with a
+:class:`.ConstantVelocityModel` for every ``--gates`` pair of ``base_radius,radius_growth``.
+
+For every run the number of scored pairs, the time of the walk, the number of tracks and the
+fraction of tracks with detections of a single bee are printed.
+
+Example:
+    $ python benchmarks/bench_motion_model.py --bees 600 --frames 150 --gates 30,10 20,10
+"""
+from __future__ import division, print_function
+import argparse
+from timeit import default_timer
+import numpy as np
+import pandas as pd
+from bb_tracking.data import DataWrapperPandas
+from bb_tracking.data.constants import CAMKEY, DETKEY
+from bb_tracking.tracking import ConstantVelocityModel, SimpleWalker
+
+ID_BITS = 12
+"""int: number of id bits of a bee"""
+
+
+def make_detections(n_bees, n_frames, n_cams, detected, random_state,
+                    size=(4000, 3000), max_speed=25.):
+    """Generates detections of bees moving with a slowly changing velocity.
+
+    Arguments:
+        n_bees (int): number of bees per camera
+        n_frames (int): number of frames per camera
+        n_cams (int): number of cameras
+        detected (float): probability that a bee is detected in a frame
+        random_state (:obj:`np.random.RandomState`): source of random numbers
+
+    Keyword Arguments:
+        size (tuple): ``(width, height)`` of the images
+        max_speed (float): maximum speed in pixels per frame
+
+    Returns:
+        tuple: tuple containing:
+            - **detections** (:obj:`pd.DataFrame`): the detections for :class:`.DataWrapperPandas`
+            - **bees** (:obj:`dict`): ``{detection id: bee}`` mapping
+    """
+    columns = {key: [] for key in ('id', 'timestamp', 'camID', 'xpos', 'ypos', 'zrotation',
+                                   'beeID')}
+    bees = {}
+    for cam_id in range(n_cams):
+        bee_ids = random_state.choice(2 ** ID_BITS, size=n_bees, replace=False)
+        bits = (bee_ids[:, np.newaxis] >> np.arange(ID_BITS)) & 1
+        positions = random_state.uniform((0, 0), size, size=(n_bees, 2))
+        velocities = random_state.uniform(-max_speed, max_speed, size=(n_bees, 2)) / np.sqrt(2)
+        for frame in range(n_frames):
+            velocities += random_state.normal(0, 2., size=velocities.shape)
+            speeds = np.maximum(np.linalg.norm(velocities, axis=1) / max_speed, 1.)
+            velocities /= speeds[:, np.newaxis]
+            positions = np.clip(positions + velocities, (0, 0), size)
+            visible = np.nonzero(random_state.rand(n_bees) < detected)[0]
+            noisy_bits = np.clip(0.1 + 0.8 * bits[visible] +
+                                 random_state.normal(0, 0.15, size=(len(visible), ID_BITS)), 0, 1)
+            for bee, bee_bits in zip(visible.tolist(), noisy_bits):
+                bees[len(bees)] = (cam_id, bee)
+                columns['id'].append(len(bees) - 1)
+                columns['timestamp'].append(frame / 3.)
+                columns['camID'].append(cam_id)
+                columns['xpos'].append(positions[bee, 0])
+                columns['ypos'].append(positions[bee, 1])
+                columns['zrotation'].append(np.arctan2(*velocities[bee][::-1]))
+                columns['beeID'].append(list(bee_bits))
+    return pd.DataFrame(columns), bees
+
+
+class CountingScore(object):
+    """Scores pairs by the id bits and the distance and counts the scored pairs."""
+
+    def __init__(self):
+        """Initialization with no scored pairs."""
+        self.pairs = 0
+
+    def __call__(self, tracks, detections):
+        """Scores the last detections of `tracks` with `detections`.
+
+        Arguments:
+            tracks (:obj:`list` of :obj:`.Track`): the waiting tracks
+            detections (:obj:`list` of :obj:`.Detection`): the claimed detections
+
+        Returns:
+            :obj:`np.array`: the manhattan distance of the id bits plus a small distance term
+        """
+        self.pairs += len(tracks)
+        last = [track.meta[DETKEY][-1] for track in tracks]
+        ids1 = np.array([detection.beeId for detection in last])
+        ids2 = np.array([detection.beeId for detection in detections])
+        positions1 = np.array([(detection.x, detection.y) for detection in last])
+        positions2 = np.array([(detection.x, detection.y) for detection in detections])
+        return (np.sum(np.fabs(ids1 - ids2), axis=1) +
+                0.01 * np.linalg.norm(positions1 - positions2, axis=1))
+
+
+def run(data, bees, frame_diff, radius, motion_model):
+    """Walks the data once and prints the results.
+
+    Arguments:
+        data (:obj:`.DataWrapperPandas`): the synthetic detections
+        bees (:obj:`dict`): ``{detection id: bee}`` mapping
+        frame_diff (int): passed to :class:`.SimpleWalker`
+        radius (int): passed to :class:`.SimpleWalker`
+        motion_model (:obj:`.ConstantVelocityModel`): the model or :obj:`None`
+    """
+    score_fun = CountingScore()
+    walker = SimpleWalker(data, score_fun, frame_diff, radius)
+    walker.motion_model = motion_model
+    started = default_timer()
+    tracks = walker.calc_tracks()
+    elapsed = default_timer() - started
+    pure = sum(len(set(bees[detection_id] for detection_id in track.ids)) == 1
+               for track in tracks)
+    name = 'fixed radius' if motion_model is None else 'gate {},{}'.format(
+        motion_model.base_radius, motion_model.radius_growth)
+    print("    {:<14}{:>10} scored pairs {:>8.2f}s {:>7} tracks, {:.1%} pure".format(
+        name, score_fun.pairs, elapsed, len(tracks), pure / max(len(tracks), 1)))
+
+
+def main():
+    """Parses the command line arguments and runs the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--bees', type=int, default=600, help="bees per camera")
+    parser.add_argument('--frames', type=int, default=150, help="frames per camera")
+    parser.add_argument('--cams', type=int, default=2)
+    parser.add_argument('--detected', type=float, default=0.9)
+    parser.add_argument('--frame-diff', type=int, default=3)
+    parser.add_argument('--radius', type=int, default=110)
+    parser.add_argument('--gates', nargs='*', default=['30,10', '20,10'],
+                        help="base_radius,radius_growth of the motion models")
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    detections, bees = make_detections(args.bees, args.frames, args.cams, args.detected,
+                                       np.random.RandomState(args.seed))
+    data = DataWrapperPandas(detections, meta_keys={'camID': CAMKEY})
+    print("{} bees x {} cams x {} frames: {} detections".format(
+        args.bees, args.cams, args.frames, len(detections)))
+    run(data, bees, args.frame_diff, args.radius, None)
+    for gate in args.gates:
+        base_radius, radius_growth = (float(value) for value in gate.split(','))
+        run(data, bees, args.frame_diff, args.radius,
+            ConstantVelocityModel(base_radius, radius_growth))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+"""Benchmark of :class:`bb_tracking.tracking.WindowedWalker` against the frame by frame walk.
+
+The synthetic moving bees of :mod:`bench_motion_model` are walked with the
+:class:`.SimpleWalker` and with a :class:`.WindowedWalker` for every ``--windows`` size. Both
+walk with the ``'sparse'`` assignment. A window scores the claims of its detections across gaps
+of up to ``--frame-diff`` frames, so with ``--frame-diff 1`` both walkers score about the same
+pairs.
+
+For every run the time of the walk, the number of scored pairs, the number of tracks and the
+fraction of tracks with detections of a single bee are printed.
+
+Example:
+    $ python benchmarks/bench_windowed_walker.py --bees 400 --frame-diff 1 3 --windows 1 2 5 10
+"""
+from __future__ import division, print_function
+import argparse
+from timeit import default_timer
+import numpy as np
+from bb_tracking.data import DataWrapperPandas
+from bb_tracking.data.constants import CAMKEY
+from bb_tracking.tracking import SimpleWalker, WindowedWalker
+from bench_motion_model import CountingScore, make_detections
+
+
+def run(name, make_walker, bees, repeat):
+    """Walks the data with new walkers and prints the results of the fastest walk.
+
+    Arguments:
+        name (str): name of the walker in the output
+        make_walker (func): creates a walker with the given scoring function
+        bees (:obj:`dict`): ``{detection id: bee}`` mapping
+        repeat (int): number of walks
+    """
+    best = None
+    for _ in range(repeat):
+        score_fun = CountingScore()
+        walker = make_walker(score_fun)
+        walker.assignment = 'sparse'
+        started = default_timer()
+        tracks = walker.calc_tracks()
+        elapsed = default_timer() - started
+        if best is None or elapsed < best[0]:
+            best = (elapsed, score_fun.pairs, tracks)
+    elapsed, pairs, tracks = best
+    pure = sum(len(set(bees[detection_id] for detection_id in track.ids)) == 1
+               for track in tracks)
+    print("    {:<14}{:>8.2f}s {:>10} scored pairs {:>7} tracks, {:.1%} pure".format(
+        name, elapsed, pairs, len(tracks), pure / max(len(tracks), 1)))
+
+
+def main():
+    """Parses the command line arguments and runs the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--bees', type=int, default=400, help="bees per camera")
+    parser.add_argument('--frames', type=int, default=100, help="frames per camera")
+    parser.add_argument('--cams', type=int, default=1)
+    parser.add_argument('--detected', type=float, default=0.9)
+    parser.add_argument('--frame-diff', type=int, nargs='*', default=[1, 3])
+    parser.add_argument('--radius', type=int, default=110)
+    parser.add_argument('--windows', type=int, nargs='*', default=[1, 2, 5, 10])
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    detections, bees = make_detections(args.bees, args.frames, args.cams, args.detected,
+                                       np.random.RandomState(args.seed))
+    data = DataWrapperPandas(detections, meta_keys={'camID': CAMKEY})
+    print("{} bees x {} cams x {} frames: {} detections".format(
+        args.bees, args.cams, args.frames, len(detections)))
+    for frame_diff in args.frame_diff:
+        print("frame_diff {}".format(frame_diff))
+        run('per frame', lambda score_fun: SimpleWalker(data, score_fun, frame_diff, args.radius),
+            bees, args.repeat)
+        for window_size in args.windows:
+            run('window {}'.format(window_size),
+                lambda score_fun: WindowedWalker(data, score_fun, frame_diff, args.radius,
+                                                 window_size=window_size),
+                bees, args.repeat)
+
+
+if __name__ == '__main__':
+    main()
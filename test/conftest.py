@@ -30,7 +30,8 @@ import pytest
 from bb_binary import build_frame_container, build_frame_container_from_df, Repository,\
     int_id_to_binary, binary_id_to_int, Frame
 from bb_tracking.data import Detection, Track, DataWrapperPandas, DataWrapperTruthPandas, \
-    DataWrapperBinary, DataWrapperTruthBinary, DataWrapperTracks, DataWrapperTruthTracks
+    DataWrapperBinary, DataWrapperTruthBinary, DataWrapperColumnar, DataWrapperTracks, \
+    DataWrapperTruthTracks
 from bb_tracking.data.constants import CAMKEY, DETKEY, TRUTHKEY
 from bb_tracking.tracking import SimpleWalker
 from bb_tracking.validation import Validator
@@ -246,6 +247,15 @@ def data_binary(detections_binary):
     return DataWrapperBinary(detections_binary)
 
 
+@pytest.fixture
+def data_columnar(detections_binary):
+    """Fixture for DataWrapperColumnar with cleaned data.
+
+    The data for this fixture is partly arbitrary so do **not** use it for verifying Algorithms!
+    """
+    return DataWrapperColumnar(detections_binary)
+
+
 @pytest.fixture
 def data_binary_truth(detections_binary, truth_binary):
     """Fixture for DataWrapperTruthBinary with cleaned data.
@@ -294,15 +304,16 @@ def data_tracks_truth(data_binary_truth, tracks_test, id_translator):
     return DataWrapperTruthTracks(tracks, data_binary_truth.cam_timestamps, data=data_binary_truth)
 
 
-@pytest.fixture(params=["pandas", "pandas_truth", "binary", "binary_truth", "tracks", "tracks_nd",
-                        "tracks_truth"])
-def data(request, data_pandas, data_pandas_truth, data_binary, data_binary_truth, data_tracks,
-         data_tracks_no_detections, data_tracks_truth):
+@pytest.fixture(params=["pandas", "pandas_truth", "binary", "binary_truth", "columnar", "tracks",
+                        "tracks_nd", "tracks_truth"])
+def data(request, data_pandas, data_pandas_truth, data_binary, data_binary_truth, data_columnar,
+         data_tracks, data_tracks_no_detections, data_tracks_truth):
     """Fixture to run all implementations of DataWrapper"""
     return {"pandas": data_pandas,
             "pandas_truth": data_pandas_truth,
             "binary": data_binary,
             "binary_truth": data_binary_truth,
+            "columnar": data_columnar,
             "tracks": data_tracks,
             "tracks_nd": data_tracks_no_detections,
             "tracks_truth": data_tracks_truth}[request.param]
@@ -475,6 +486,8 @@ def simple_walker(data_simple_tracking):
         """Function to calculate distance between track and detection."""
         np_track = np.array([(track.meta[DETKEY][-1].x, track.meta[DETKEY][-1].y)
                              for track in tracks])
+        detections_test = [fo.meta[DETKEY][0] if isinstance(fo, Track) else fo
+                           for fo in detections_test]
         np_test = np.array([(detection.x, detection.y) for detection in detections_test])
         return np.linalg.norm(np_track - np_test, axis=1)
     return SimpleWalker(data_simple_tracking, dist_fun, 1, 10)
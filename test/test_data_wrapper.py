@@ -9,9 +9,13 @@ import pandas as pd
 from pandas.util.testing import assert_frame_equal
 import pytest
 from bb_tracking.data import DataWrapper, DataWrapperTruth, DataWrapperPandas, \
-    DataWrapperTruthPandas, DataWrapperBinary, DataWrapperTruthBinary, DataWrapperTracks, \
-    Detection, Track
+    DataWrapperTruthPandas, DataWrapperBinary, DataWrapperTruthBinary, DataWrapperColumnar, \
+    DataWrapperTracks, DataWrapperWindowed, Detection, RopeList, TimeIndex, Track, \
+    detection_id_to_int, detection_id_to_str, pack_detection_id, unpack_detection_id
 from bb_tracking.data.constants import CAMKEY, DETKEY, TRUTHKEY
+from bb_tracking.data.detection_ids import format_detection_id, format_detection_ids, \
+    pack_detection_ids
+from bb_tracking.tracking import SimpleWalker
 from test.conftest import cmp_tracks
 
 
@@ -46,6 +50,9 @@ def test_datawrapper_abstract():
     with pytest.raises(NotImplementedError):
         data.get_neighbors("frame_object", "cam_id")
 
+    with pytest.raises(NotImplementedError):
+        data.get_neighbors_bulk(["frame_object"], "cam_id", "radius", "timestamp")
+
     with pytest.raises(NotImplementedError):
         data.get_timestamps()
 
@@ -114,6 +121,246 @@ def test_init_binary_empty_frames(detections_binary_empty):
     assert str(excinfo.value) == "Repository is empty."
 
 
+def test_init_binary_workers(detections_binary, truth_binary):
+    """Test that decoding in a process pool gives the same detections as decoding serially."""
+    meta_keys = {'xpos': 'x', 'ypos': 'y'}
+    expected = DataWrapperBinary(detections_binary, meta_keys=meta_keys)
+    data = DataWrapperBinary(detections_binary, meta_keys=meta_keys, workers=2)
+    assert data.cam_ids == expected.cam_ids
+    assert data.cam_timestamps == expected.cam_timestamps
+    assert data.detections_dict == expected.detections_dict
+    assert data.frame_detections == expected.frame_detections
+
+    data = DataWrapperColumnar(detections_binary, meta_keys=meta_keys, workers=2)
+    for detection_id, detection in expected.detections_dict.items():
+        assert data.get_detection(detection_id) == detection
+
+    expected = DataWrapperTruthBinary(detections_binary, truth_binary, 1)
+    data = DataWrapperTruthBinary(detections_binary, truth_binary, 1, workers=2)
+    assert data.positives == expected.positives
+    assert data.false_positives == expected.false_positives
+    assert set(data.tracks.keys()) == set(expected.tracks.keys())
+
+
+def test_detection_ids():
+    """Test the conversion between packed integer ids and legacy string ids."""
+    detection_id = pack_detection_id(3, 12, 2)
+    assert unpack_detection_id(detection_id) == (3, 12, 2)
+    assert unpack_detection_id('f3d12c2') == (3, 12, 2)
+    assert detection_id_to_str(detection_id) == 'f3d12c2'
+    assert detection_id_to_int('f3d12c2') == detection_id
+    assert detection_id_to_int(detection_id) == detection_id
+    assert pack_detection_id(3, 12, 2) < pack_detection_id(3, 13, 0) < pack_detection_id(4, 0, 0)
+
+    with pytest.raises(ValueError):
+        pack_detection_id(3, 1 << 16, 2)
+    with pytest.raises(ValueError):
+        unpack_detection_id('3d12c2')
+
+    # all ids of a frame at once, also with frame ids that use all 64 bits
+    for frame_id in (3, (1 << 40) - 1):
+        indices = np.array([0, 12, (1 << 16) - 1])
+        assert pack_detection_ids(frame_id, indices, 2) == \
+            [pack_detection_id(frame_id, idx, 2) for idx in indices]
+        assert format_detection_ids(frame_id, indices, 2) == \
+            [format_detection_id(frame_id, idx, 2) for idx in indices]
+    with pytest.raises(ValueError):
+        pack_detection_ids(3, np.array([12, 1 << 16]), 2)
+
+
+@pytest.mark.parametrize('wrapper', [DataWrapperBinary, DataWrapperColumnar])
+def test_init_int_ids(detections_binary, wrapper):
+    """Test that DataWrappers with integer ids give the same detections with packed ids."""
+    expected = DataWrapperBinary(detections_binary)
+    data = wrapper(detections_binary, int_ids=True)
+    for detection_id, detection in expected.detections_dict.items():
+        int_id = detection_id_to_int(detection_id)
+        assert data.get_detection(int_id) == detection._replace(id=int_id)
+        with pytest.raises(KeyError):
+            data.get_detection(detection_id)
+    for cam_id in expected.cam_ids:
+        for tstamp in expected.get_timestamps(cam_id=cam_id):
+            detections = data.get_frame_objects(cam_id=cam_id, timestamp=tstamp)
+            assert [detection_id_to_str(detection.id) for detection in detections] == \
+                [detection.id for detection in expected.get_frame_objects(cam_id=cam_id,
+                                                                          timestamp=tstamp)]
+
+            # the detections do not find themselves in the bulk neighborhood search
+            query_indices, candidate_indices = data.get_neighbors_bulk(detections, cam_id, 0.5,
+                                                                       tstamp)
+            assert len(query_indices) == len(candidate_indices) == 0
+
+
+@pytest.mark.parametrize('wrapper', [DataWrapperBinary, DataWrapperColumnar])
+def test_init_uint8_ids(detections_binary, wrapper):
+    """Test that DataWrappers with uint8 ids keep the id bits of the decoder."""
+    expected = DataWrapperBinary(detections_binary)
+    data = wrapper(detections_binary, uint8_ids=True)
+    for detection_id, detection in expected.detections_dict.items():
+        uint8_detection = data.get_detection(detection_id)
+        assert uint8_detection.beeId.dtype == np.uint8
+        assert_allclose(uint8_detection.beeId / 255., detection.beeId)
+        assert uint8_detection._replace(beeId=detection.beeId) == detection
+
+
+def test_init_truth_binary_int_ids(detections_binary, truth_binary):
+    """Test that the DataWrapperTruthBinary Class gives the same truth ids with packed ids."""
+    expected = DataWrapperTruthBinary(detections_binary, truth_binary, 1)
+    data = DataWrapperTruthBinary(detections_binary, truth_binary, 1, int_ids=True)
+    assert data.positives == set(detection_id_to_int(d_id) for d_id in expected.positives)
+    assert data.false_positives == set(detection_id_to_int(d_id)
+                                       for d_id in expected.false_positives)
+    for truth_id, track in expected.tracks.items():
+        assert list(data.tracks[truth_id].ids) == [detection_id_to_int(d_id) for d_id in track.ids]
+    for detection_id in expected.detections_dict.keys():
+        assert data.get_truthid(detection_id_to_int(detection_id)) == \
+            expected.get_truthid(detection_id)
+
+
+def test_init_columnar(detections_binary):
+    """Test that the DataWrapperColumnar Class gives the same detections as DataWrapperBinary."""
+    meta_keys = {'xpos': 'x', 'ypos': 'y'}
+    expected = DataWrapperBinary(detections_binary, meta_keys=meta_keys)
+    data = DataWrapperColumnar(detections_binary, meta_keys=meta_keys)
+    assert data.cam_ids == expected.cam_ids
+    assert data.cam_timestamps == expected.cam_timestamps
+    assert data.bee_ids.dtype == np.uint8
+    assert len(data.x) == len(expected.detections_dict)
+    for detection_id, detection in expected.detections_dict.items():
+        assert data.get_detection(detection_id) == detection
+        assert [type(value) for value in data.get_detection(detection_id)] == \
+            [type(value) for value in detection]
+    for cam_id in expected.cam_ids:
+        for tstamp in expected.get_timestamps(cam_id=cam_id):
+            detections = expected.get_frame_objects(cam_id=cam_id, timestamp=tstamp)
+            assert data.get_frame_objects(cam_id=cam_id, timestamp=tstamp) == detections
+            columns = data.get_frame_columns(cam_id, tstamp)
+            assert_allclose(columns.x, [detection.x for detection in detections])
+            assert_allclose(columns.beeId / 255., [detection.beeId for detection in detections])
+
+    with pytest.raises(KeyError):
+        data.get_detection('f1d99c0')
+    with pytest.raises(KeyError):
+        data.get_detection(1)
+
+
+def test_init_columnar_empty_frames(detections_binary_empty):
+    """Test initializing the DataWrapperColumnar Class with (some) Frames without detections."""
+    with pytest.raises(AssertionError) as excinfo:
+        DataWrapperColumnar(detections_binary_empty)
+
+    assert str(excinfo.value) == "Repository is empty."
+
+
+def test_init_columnar_cache(detections_binary, tmpdir):
+    """Test that the DataWrapperColumnar Class memory-maps its cached columns."""
+    meta_keys = {'xpos': 'x', 'ypos': 'y'}
+    cache_dir = str(tmpdir.join('cache'))
+    expected = DataWrapperColumnar(detections_binary, meta_keys=meta_keys, cache_dir=cache_dir)
+    assert not isinstance(expected.x, np.memmap)
+    assert len(tmpdir.join('cache').listdir()) == 1
+
+    data = DataWrapperColumnar(detections_binary, meta_keys=meta_keys, cache_dir=cache_dir)
+    assert isinstance(data.x, np.memmap)
+    assert isinstance(data.meta_columns['x'], np.memmap)
+    assert data.cam_ids == expected.cam_ids
+    assert data.cam_timestamps == expected.cam_timestamps
+    for cam_id in expected.cam_ids:
+        for tstamp in expected.get_timestamps(cam_id=cam_id):
+            detections = expected.get_frame_objects(cam_id=cam_id, timestamp=tstamp)
+            assert data.get_frame_objects(cam_id=cam_id, timestamp=tstamp) == detections
+            for detection in detections:
+                assert data.get_detection(detection.id) == detection
+
+    # different meta keys are cached separately
+    data = DataWrapperColumnar(detections_binary, cache_dir=cache_dir)
+    assert not isinstance(data.x, np.memmap)
+    assert len(tmpdir.join('cache').listdir()) == 2
+
+
+def test_init_windowed(detections_binary):
+    """Test that the DataWrapperWindowed Class only keeps a window of frames."""
+    expected = DataWrapperBinary(detections_binary)
+    data = DataWrapperWindowed(detections_binary, 2)
+    assert data.cam_ids == expected.cam_ids
+    assert data.cam_timestamps == expected.cam_timestamps
+    assert len(data.detections_dict) == 0
+    for _ in range(2):
+        for cam_id in expected.cam_ids:
+            for tstamp in expected.get_timestamps(cam_id=cam_id):
+                assert data.get_frame_objects(cam_id=cam_id, timestamp=tstamp) == \
+                    expected.get_frame_objects(cam_id=cam_id, timestamp=tstamp)
+                assert len(data.cam_windows[cam_id]) <= 2
+                assert data.cam_windows[cam_id][-1] == tstamp
+    assert len(data.frame_detections) <= 2 * len(data.cam_ids)
+
+    # frames before the window are loaded again
+    cam_id = expected.cam_ids[0]
+    tstamp = expected.get_timestamps(cam_id=cam_id)[0]
+    detection = expected.get_frame_objects(cam_id=cam_id, timestamp=tstamp)[0]
+    assert data.get_neighbors(detection, cam_id) == expected.get_neighbors(detection, cam_id)
+    assert data.get_detection(detection.id) == detection
+    assert list(data.cam_windows[cam_id]) == [tstamp]
+
+    # a window of frame_diff + 1 frames is enough for the walker
+    def score_fun(tracks, detections):
+        """Score the distance of the last detection of the tracks."""
+        return np.array([math.hypot(track.meta[DETKEY][-1].x - detection.x,
+                                    track.meta[DETKEY][-1].y - detection.y)
+                         for track, detection in zip(tracks, detections)])
+    expected_tracks = SimpleWalker(expected, score_fun, 1, 10).calc_tracks()
+    tracks = SimpleWalker(DataWrapperWindowed(detections_binary, 2), score_fun, 1,
+                          10).calc_tracks()
+    assert [track.ids for track in tracks] == [track.ids for track in expected_tracks]
+
+    # the frames are read again from the requested frame
+    data = DataWrapperWindowed(detections_binary, 2)
+    iter_frames, requests = data.repository.iter_frames, []
+
+    def record_iter_frames(**kwargs):
+        """Record the arguments of the requests."""
+        requests.append(kwargs)
+        return iter_frames(**kwargs)
+    data.repository.iter_frames = record_iter_frames
+    tstamps = expected.get_timestamps(cam_id=cam_id)
+    for tstamp in tstamps[::-1]:
+        assert data.get_frame_objects(cam_id=cam_id, timestamp=tstamp) == \
+            expected.get_frame_objects(cam_id=cam_id, timestamp=tstamp)
+    assert requests == [dict(cam=cam_id, begin=tstamp) for tstamp in tstamps[::-1]]
+
+    # the window can not be shared by threads or shards, processes have their own copy
+    walker = SimpleWalker(DataWrapperWindowed(detections_binary, 2), score_fun, 1, 10)
+    with pytest.raises(NotImplementedError):
+        walker.calc_tracks(shards=2)
+    with pytest.raises(NotImplementedError):
+        walker.calc_tracks(workers=2, use_threads=True)
+    tracks = walker.calc_tracks(workers=2)
+    assert [track.ids for track in tracks] == [track.ids for track in expected_tracks]
+
+    with pytest.raises(AssertionError):
+        DataWrapperWindowed(detections_binary, 0)
+
+
+@pytest.mark.parametrize("wrapper_class", [DataWrapperBinary, DataWrapperColumnar])
+def test_tree_cache(detections_binary, wrapper_class):
+    """Test that the spatial trees are built on request and kept in a LRU cache."""
+    data = wrapper_class(detections_binary)
+    assert len(data.frame_trees) == 0
+    cam_id = data.cam_ids[0]
+    tstamps = data.get_timestamps(cam_id=cam_id)
+    detection = data.get_frame_objects(cam_id=cam_id, timestamp=tstamps[0])[0]
+    expected = data.get_neighbors(detection, cam_id)
+    assert data.get_neighbors(detection, cam_id) == expected
+    assert data.tree_cache_stats() == dict(hits=1, misses=1, size=1, hit_rate=0.5)
+
+    data.tree_cache_size = 1
+    data.get_neighbors(detection, cam_id, timestamp=tstamps[1])
+    assert list(data.frame_trees.keys()) == [(cam_id, tstamps[1])]
+    assert data.get_neighbors(detection, cam_id) == expected
+    assert list(data.frame_trees.keys()) == [(cam_id, tstamps[0])]
+    assert data.tree_cache_stats()['misses'] == 3
+
+
 def test_init_truth(detections, truth, truth_clean):
     """Test initializing the DataWrapperTruthPandas Class."""
     data = DataWrapperTruthPandas(detections, truth, 1)
@@ -184,6 +431,73 @@ def test_get_timestamps(data, timestamps):
     assert all(pd.to_datetime(timestamps_data) == pd.to_datetime(timestamps_cam2))
 
 
+def test_get_time_index(data, timestamps):
+    """Test the lookup of timestamp indices via :class:`TimeIndex`."""
+    for cam_id in [None, 0, 2]:
+        time_index = data.get_time_index(cam_id=cam_id)
+        assert time_index is data.get_time_index(cam_id=cam_id)
+        timestamps_data = data.get_timestamps(cam_id=cam_id)
+        assert len(time_index) == len(timestamps_data)
+        for idx, tstamp in enumerate(timestamps_data):
+            assert time_index.index(tstamp) == idx
+            assert tstamp in time_index
+        assert np.all(time_index.get_indices(timestamps_data) == np.arange(len(timestamps_data)))
+
+    time_index = data.get_time_index(cam_id=0)
+    timestamps_cam0 = data.get_timestamps(cam_id=0)
+    assert time_index.get_range() == (0, len(timestamps_cam0))
+    assert time_index.get_range(start=timestamps[2], stop=timestamps[4]) == (1, 3)
+    assert time_index.get_range(start=timestamps[1], stop=timestamps[1]) == (1, 1)
+    assert all(pd.to_datetime(time_index.slice(start=timestamps[1])) ==
+               pd.to_datetime(timestamps_cam0[1:]))
+    assert timestamps[1] not in time_index
+    with pytest.raises(ValueError):
+        time_index.index(timestamps[1])
+    with pytest.raises(ValueError):
+        time_index.get_indices([timestamps[0], timestamps[1]])
+
+
+def test_time_index():
+    """Test :class:`TimeIndex` with plain timestamps."""
+    time_index = TimeIndex([1., 2., 4., 8.])
+    assert list(time_index) == [1., 2., 4., 8.]
+    assert time_index[1] == 2.
+    assert time_index.index(4.) == 2
+    assert time_index.index(np.float64(8.)) == 3
+    assert np.all(time_index.get_indices(np.array([8., 1.])) == [3, 0])
+    assert time_index.get_range(1.5, 5.) == (1, 3)
+    assert time_index.get_range(5., 1.5) == (3, 3)
+    assert time_index.slice(stop=4.) == [1., 2.]
+    with pytest.raises(ValueError):
+        time_index.get_indices([9.])
+    with pytest.raises(AssertionError):
+        TimeIndex([1., 1.])
+
+
+def test_rope_list():
+    """Test the concatenation of lists via :class:`RopeList`."""
+    part1, part2 = [1, 2], [3]
+    rope = RopeList([part1, part2])
+    rope.append(4)
+    rope.extend((5, 6))
+    rope.extend([])
+    rope = RopeList([rope, [7]])
+    assert part1 == [1, 2] and part2 == [3]
+    assert len(rope) == 7
+    assert list(rope) == [1, 2, 3, 4, 5, 6, 7]
+    assert rope == [1, 2, 3, 4, 5, 6, 7]
+    assert [1, 2, 3, 4, 5, 6, 7] == rope
+    assert rope != [1, 2, 3]
+    assert rope[0] == 1 and rope[-1] == 7 and rope[3] == 4 and rope[-3] == 5
+    assert rope[1:4] == [2, 3, 4]
+    assert 6 in rope
+    with pytest.raises(IndexError):
+        rope[7]  # pylint:disable=pointless-statement
+    with pytest.raises(IndexError):
+        RopeList()[-1]  # pylint:disable=expression-not-assigned
+    assert RopeList() == []
+
+
 def test_get_camids(data, data_binary, id_translator):
     """Test the extraction of unique camera ids."""
     assert data.get_camids() == set([0, 2])
@@ -419,6 +733,35 @@ def test_get_neighbors_tracks(data, tracks_test):
     assert str(excinfo.value) == "Type {} not supported.".format(type(ids[0]))
 
 
+def test_get_neighbors_bulk(data):
+    """Test that the bulk neighborhood search is consistent with :func:`get_neighbors`."""
+    cam_id = 0
+    timestamps = data.get_timestamps(cam_id=cam_id)
+    if isinstance(data, DataWrapperTracks):
+        get_frame_objects = data.get_frame_objects_starting
+    else:
+        get_frame_objects = data.get_frame_objects
+
+    for tstamp_query in timestamps[:3]:
+        frame_objects = get_frame_objects(cam_id=cam_id, timestamp=tstamp_query)
+        for tstamp in timestamps[:4]:
+            candidates = get_frame_objects(cam_id=cam_id, timestamp=tstamp)
+            for radius in (0.5, 3, 10):
+                query_indices, candidate_indices = data.get_neighbors_bulk(
+                    frame_objects, cam_id, radius, tstamp)
+                assert len(query_indices) == len(candidate_indices)
+                expected = set((idx, neighbor.id) for idx, frame_object in enumerate(frame_objects)
+                               for neighbor in data.get_neighbors(frame_object, cam_id,
+                                                                  radius=radius, timestamp=tstamp))
+                assert expected == set((qidx, candidates[cidx].id) for qidx, cidx
+                                       in zip(query_indices, candidate_indices))
+
+    # no frame objects
+    query_indices, candidate_indices = data.get_neighbors_bulk([], cam_id, 10, timestamps[0])
+    assert len(query_indices) == 0
+    assert len(candidate_indices) == 0
+
+
 def test_get_frame_objects_starting(data_tracks):
     """Test the extraction of tracks starting in a frame."""
     cam_id = 0
@@ -431,6 +774,17 @@ def test_get_frame_objects_starting(data_tracks):
     assert set([4]) == set([track.id for track in tracks])
 
 
+def test_get_timestamps_starting(data_tracks):
+    """Test the extraction of the timestamps with tracks starting in a frame."""
+    for cam_id in data_tracks.get_camids():
+        expected = [timestamp for timestamp in data_tracks.get_timestamps(cam_id=cam_id)
+                    if len(data_tracks.get_frame_objects_starting(cam_id=cam_id,
+                                                                  timestamp=timestamp)) > 0]
+        assert data_tracks.get_timestamps_starting(cam_id) == expected
+    assert data_tracks.timestamps[0] in data_tracks.get_timestamps_starting(0)
+    assert data_tracks.timestamps[1] not in data_tracks.get_timestamps_starting(0)
+
+
 def test_get_all_detection_ids(data_truth, id_translator):
     """Test the extraction of all detection ids."""
     get_ids = id_translator(data_truth)
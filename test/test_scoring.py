@@ -2,6 +2,7 @@
 """Adding tests to scoring functions."""
 # pylint:disable=protected-access,redefined-outer-name,too-many-arguments,too-many-locals
 from __future__ import division, print_function
+from collections import OrderedDict
 from itertools import chain, combinations
 import math
 import random
@@ -15,8 +16,10 @@ from bb_tracking.data.constants import DETKEY
 from bb_tracking.tracking import score_id_sim, score_id_sim_v, \
     score_id_sim_orientation, score_id_sim_orientation_v,\
     score_id_sim_rotating, score_id_sim_rotating_v, score_id_sim_tracks_median_v,\
+    score_id_sim_uint8_v, score_id_sim_orientation_uint8_v, score_id_sim_rotating_uint8_v,\
+    score_id_sim_tracks_median_uint8_v, calc_median_ids, calc_median_ids_uint8,\
     distance_orientations, distance_orientations_v, distance_positions_v,\
-    bit_array_to_int_v
+    bit_array_to_int_v, CascadeScoreFun, learn_cascade_bounds
 # load deprecated scoring functions separately
 from bb_tracking.tracking.scoring import score_ids_best_fit, score_ids_best_fit_rotating, \
     score_ids_and_orientation
@@ -364,6 +367,39 @@ def test_id_sim_tracks_median_v():
     assert list(results) == [0, n_bits / 2, 0]
 
 
+def test_id_sim_uint8_v():
+    """Tests that the uint8 id similarities are the same as the float id similarities."""
+    n_bits, n_detections = 12, 20
+    rng = np.random.RandomState(42)
+    bits = rng.randint(0, 256, size=(2, n_detections, n_bits)).astype(np.uint8)
+    orientations = rng.uniform(-math.pi, math.pi, size=(2, n_detections))
+    detections_uint8 = [[make_detection(det_id=i, orientation=orientations[k, i], beeid=bits[k, i])
+                         for i in range(n_detections)] for k in range(2)]
+    detections_float = [[det._replace(beeId=list(det.beeId / 255.)) for det in dets]
+                        for dets in detections_uint8]
+
+    with pytest.raises(AssertionError):
+        score_id_sim_uint8_v([], detections_uint8[1][:1])
+
+    np.testing.assert_allclose(score_id_sim_uint8_v(*detections_uint8),
+                               score_id_sim_v(*detections_float))
+    np.testing.assert_allclose(score_id_sim_orientation_uint8_v(*detections_uint8),
+                               score_id_sim_orientation_v(*detections_float))
+    np.testing.assert_allclose(score_id_sim_rotating_uint8_v(*detections_uint8),
+                               [score_id_sim_rotating(det1.beeId, det2.beeId)
+                                for det1, det2 in zip(*detections_float)])
+
+    tracks_uint8 = [Track(id=k, ids=list(range(n_detections)), timestamps=[0] * n_detections,
+                          meta={DETKEY: dets}) for k, dets in enumerate(detections_uint8)]
+    tracks_float = [Track(id=k, ids=list(range(n_detections)), timestamps=[0] * n_detections,
+                          meta={DETKEY: dets}) for k, dets in enumerate(detections_float)]
+    np.testing.assert_allclose(calc_median_ids_uint8(tracks_uint8) / 255.,
+                               calc_median_ids(tracks_float))
+    np.testing.assert_allclose(
+        score_id_sim_tracks_median_uint8_v(tracks_uint8[:1], tracks_uint8[1:]),
+        score_id_sim_tracks_median_v(tracks_float[:1], tracks_float[1:]))
+
+
 def test_distance_orientations():
     """Tests the calculation of the distance between two orientations."""
     assert distance_orientations(0, 0) == 0
@@ -451,10 +487,66 @@ def test_bit_array_to_int_v():
     assert len(expected_ids) == len(calculated_ids)
     assert set(expected_ids) == set(calculated_ids)
 
+    # uint8 bits are set from 128 on
+    detections_uint8 = [make_detection(beeid=np.array(det.beeId * 254 + 1, dtype=np.uint8))
+                        for det in detections]
+    assert np.all(bit_array_to_int_v(detections_uint8) == calculated_ids)
+
     with pytest.raises(AssertionError):
         bit_array_to_int_v([make_detection(beeid=[1] * 13)])
 
 
+def test_cascade_score_fun():
+    """Tests the scoring with a cascade of features."""
+    features = OrderedDict()
+    features['distance'] = lambda path, test: distance_positions_v(path, test)
+    features['orientation'] = lambda path, test: distance_orientations_v(path, test)
+    path = [make_detection(xpos=0, orientation=0) for _ in range(4)]
+    test = [make_detection(xpos=1, orientation=0.5), make_detection(xpos=30, orientation=0.5),
+            make_detection(xpos=2, orientation=3), make_detection(xpos=3, orientation=0.1)]
+
+    score_fun = CascadeScoreFun(features, {'distance': (None, 10), 'orientation': (0, 1)},
+                                lambda clf_data: clf_data.sum(axis=1))
+    weights = score_fun(path, test)
+    assert np.allclose(weights, [1.5, score_fun.max_weight, score_fun.max_weight, 3.1])
+    # the second feature is only evaluated for pairs within the distance bounds
+    assert score_fun.evaluated == {'distance': 4, 'orientation': 3}
+
+    # rejected pairs get the max weight
+    score_fun = CascadeScoreFun(features, {'distance': (None, 0.5)}, lambda clf_data: 1 / 0.,
+                                max_weight=np.inf)
+    assert np.all(score_fun(path, test) == np.inf)
+    assert score_fun.evaluated == {'distance': 4, 'orientation': 0}
+
+    # without bounds the weights are calculated for all pairs
+    score_fun = CascadeScoreFun(features, {}, lambda clf_data: clf_data[:, 0])
+    assert np.allclose(score_fun(path, test), [1, 30, 2, 3])
+
+    with pytest.raises(AssertionError):
+        CascadeScoreFun(features, {'unknown': (0, 1)}, lambda clf_data: clf_data[:, 0])
+
+
+def test_learn_cascade_bounds():
+    """Tests learning the bounds of a cascade from learning data."""
+    features = OrderedDict([('first', None), ('second', None)])
+    x_data = np.array([[1, 5], [2, 6], [3, 7], [100, -100]])
+    y_data = np.array([True, True, True, False])
+    assert learn_cascade_bounds(x_data, y_data, features, ['second']) == {'second': (5, 7)}
+    assert learn_cascade_bounds(x_data, y_data, features, ['first', 'second']) == \
+        {'first': (1, 3), 'second': (5, 7)}
+    bounds = learn_cascade_bounds(x_data, y_data, features, ['first'], quantile=0.25)
+    assert np.allclose(bounds['first'], (1.5, 2.5))
+    bounds = learn_cascade_bounds(x_data, y_data, features, ['first', 'second'], margin=0.5)
+    assert np.allclose(bounds['first'], (0, 4)) and np.allclose(bounds['second'], (4, 8))
+    bounds = learn_cascade_bounds(x_data, y_data, features, ['first'], quantile=0.25, margin=1)
+    assert np.allclose(bounds['first'], (0.5, 3.5))
+
+    with pytest.raises(AssertionError):
+        learn_cascade_bounds(x_data, y_data, features, ['first'], quantile=0.5)
+    with pytest.raises(AssertionError):
+        learn_cascade_bounds(x_data, y_data, features, ['first'], margin=-0.1)
+
+
 def make_detection(det_id=0, timestamp=0, xpos=0, ypos=0, orientation=0, beeid=None, meta=None):
     """Helper to generate a Detection with default values."""
     if beeid is None:
@@ -25,7 +25,8 @@ from test.conftest import cmp_tracks, generate_random_walker
 
 @pytest.mark.slow
 @pytest.mark.parametrize("score_fun_type", ["simple", "detection_clf", "other_clf",
-                                            "svm_clf", "bayes_clf", "track_clf", "track_other_clf"])
+                                            "svm_clf", "bayes_clf", "cascade_clf", "track_clf",
+                                            "track_other_clf"])
 def test_calc_tracks(score_fun_type):
     """Test the calculation of tracks for a single set of random detection data."""
     walker, detections = next(generate_random_walker())
@@ -66,6 +67,9 @@ def test_calc_tracks(score_fun_type):
     elif "bayes" in score_fun_type:
         _, _, walker.score_fun = train_bin_clf(bayes, walker.data, features, frame_diff, radius,
                                                verbose=True)
+    elif "cascade" in score_fun_type:
+        _, _, walker.score_fun = train_bin_clf(svm, walker.data, features, frame_diff, radius,
+                                               cascade=['score_distances'], verbose=True)
 
     truth_tracks = detections[1]
     walker.frame_diff = 11
@@ -6,7 +6,7 @@ import numpy as np
 import pandas as pd
 import pytest
 import six
-from bb_tracking.data import Score, ScoreMetrics, Track
+from bb_tracking.data import DataWrapperTruthBinary, Score, ScoreMetrics, Track
 from bb_tracking.data.constants import DETKEY, FPKEY
 from bb_tracking.validation import Validator, validation_score_fun_all, calc_fragments,\
     convert_validated_to_pandas, track_statistics
@@ -509,3 +509,19 @@ def make_score_metric(score_dict):
         if key not in score_dict:
             score_dict[key] = value
     return ScoreMetrics(**score_dict)
+
+
+def test_validate_uint8_ids(detections_binary, truth_binary):
+    """Tests that the validation of tracks with uint8 ids calculates the same ids."""
+    results = []
+    for uint8_ids in (False, True):
+        truth = DataWrapperTruthBinary(detections_binary, truth_binary, 1, uint8_ids=uint8_ids)
+        validator = Validator(truth)
+        tracks = [track for track in truth.get_truth_tracks() if track.id != truth.fp_id]
+        scores = validator.validate(tracks, 0, cam_gap=False)
+        metrics = track_statistics(tracks, scores, validator, 0, cam_gap=False)
+        results.append(({track_id: score.calc_id for track_id, score in scores.items()}, metrics))
+
+    (calc_ids, metrics), (calc_ids_uint8, metrics_uint8) = results
+    assert calc_ids == calc_ids_uint8
+    assert metrics == metrics_uint8
@@ -1,15 +1,27 @@
 # -*- coding: utf-8 -*-
 """Adding tests to walker functions."""
 # pylint:disable=protected-access,redefined-outer-name,too-many-locals
+from collections import OrderedDict
 import copy
+from itertools import combinations
+import json
 import numpy as np
+import pandas as pd
 import pytest
 import six
 from scipy.spatial.distance import euclidean
 from bb_binary import binary_id_to_int
-from bb_tracking.data import DataWrapperTracks, Detection, Track
+from bb_tracking.data import DataWrapperPandas, DataWrapperTracks, Detection, Track
 from bb_tracking.data.constants import CAMKEY, DETKEY
-from bb_tracking.tracking import SimpleWalker
+from bb_tracking.tracking import ConstantVelocityModel, HierarchicalWalker, OnlineWalker, \
+    SimpleWalker, VectorizedWalker, WalkerStats, WindowedWalker
+from bb_tracking.tracking.assignment import resolve_claims_auction, resolve_claims_auto, \
+    resolve_claims_dense, resolve_claims_greedy, resolve_claims_sparse
+from bb_tracking.tracking.online_walker import FrameBuffer
+from bb_tracking.tracking.scoring import score_id_sim_orientation_v
+from bb_tracking.tracking.vectorized_walker import distance_positions_arrays, make_frame_arrays, \
+    score_id_sim_orientation_arrays
+from test.conftest import cmp_tracks
 
 
 def test_init_simple_walker(simple_walker, data_simple_tracking):
@@ -38,6 +50,124 @@ def test_calc_tracks():
     assert True
 
 
+@pytest.mark.parametrize("use_threads", [False, True])
+def test_calc_tracks_workers(simple_walker, use_threads):
+    """Test that walking the cameras in parallel gives the same tracks as walking sequentially."""
+    simple_walker.track_prefix = "test_"
+    expected_tracks = simple_walker.calc_tracks()
+    expected_count = simple_walker.track_id_count
+    assert len(simple_walker.data.get_camids()) > 1
+
+    simple_walker.track_id_count = 0
+    tracks = simple_walker.calc_tracks(workers=2, use_threads=use_threads)
+    assert simple_walker.track_id_count == expected_count
+    assert len(tracks) == len(expected_tracks)
+    for expected_track, track in zip(expected_tracks, tracks):
+        cmp_tracks(expected_track, track)
+
+
+def test_iter_tracks(simple_walker):
+    """Test that the tracks are yielded in the same order as returned by ``calc_tracks``."""
+    expected_tracks = simple_walker.calc_tracks()
+
+    simple_walker.track_id_count = 0
+    iter_tracks = simple_walker.iter_tracks()
+    assert not isinstance(iter_tracks, list)
+    tracks = list(iter_tracks)
+    assert len(tracks) == len(expected_tracks)
+    for expected_track, track in zip(expected_tracks, tracks):
+        cmp_tracks(expected_track, track)
+
+
+@pytest.mark.parametrize("n_yielded", [1, 3, 6])
+def test_resume(simple_walker, tmpdir, n_yielded):
+    """Test that a resumed run gives the same tracks as an uninterrupted run."""
+    expected_tracks = simple_walker.calc_tracks()
+    expected_count = simple_walker.track_id_count
+    checkpoint = str(tmpdir.join('checkpoint'))
+
+    simple_walker.track_id_count = 0
+    simple_walker.checkpoint_interval = 2
+    iter_tracks = simple_walker.iter_tracks(checkpoint=checkpoint)
+    for _ in range(n_yielded):
+        next(iter_tracks)
+    iter_tracks.close()
+
+    walker = SimpleWalker(simple_walker.data, simple_walker.score_fun, simple_walker.frame_diff,
+                          simple_walker.radius)
+    tracks = walker.resume(checkpoint)
+    assert walker.track_id_count == expected_count
+    assert len(tracks) == len(expected_tracks)
+    for expected_track, track in zip(expected_tracks, tracks):
+        cmp_tracks(expected_track, track)
+
+    # resuming a finished run gives the tracks again
+    tracks = walker.resume(checkpoint)
+    assert len(tracks) == len(expected_tracks)
+    for expected_track, track in zip(expected_tracks, tracks):
+        cmp_tracks(expected_track, track)
+
+    with pytest.raises(AssertionError):
+        simple_walker.calc_tracks(checkpoint=checkpoint, shards=2)
+
+
+@pytest.mark.parametrize("shards,workers,use_threads,overlap,frame_diff", [
+    (2, None, True, 1, 1), (3, 2, True, 1, 1), (20, None, True, 1, 1), (3, 2, False, 1, 1),
+    (4, 2, False, None, 1), (3, None, True, 3, 3), (5, 2, False, 4, 3), (20, 2, True, 7, 3)])
+def test_calc_tracks_shards(simple_walker, shards, workers, use_threads, overlap, frame_diff):
+    """Test that walking in stitched time windows gives the same tracks as walking sequentially."""
+    # the cameras are sharded independently
+    assert len(list(simple_walker.data.get_camids())) > 1
+    simple_walker.frame_diff = frame_diff
+    simple_walker.sort_claims = True
+    expected_tracks = simple_walker.calc_tracks()
+    expected_count = simple_walker.track_id_count
+
+    simple_walker.track_id_count = 0
+    tracks = simple_walker.calc_tracks(shards=shards, overlap=overlap, workers=workers,
+                                       use_threads=use_threads)
+    assert simple_walker.track_id_count == expected_count
+    assert len(tracks) == len(expected_tracks)
+    for expected_track, track in zip(expected_tracks, tracks):
+        cmp_tracks(expected_track, track)
+
+    # overlap has to cover frame_diff
+    with pytest.raises(AssertionError):
+        simple_walker.calc_tracks(shards=shards, overlap=frame_diff - 1)
+
+    # with a motion model the walks only synchronize if the predictions are the same: the warm up
+    # track (11,) is predicted at x=10 with the full radius, the track (10, 11) at x=20 with a
+    # gate of 3, so only the warm up would be extended with x=12
+    positions = [(tstamp, 100, 100) for tstamp in range(10)] + [(3, 0, 0), (4, 10, 0), (5, 12, 0)]
+    detections = pd.DataFrame({
+        'id': range(len(positions)), 'timestamp': [pos[0] for pos in positions], 'camID': 0,
+        'xpos': [pos[1] for pos in positions], 'ypos': [pos[2] for pos in positions],
+        'zrotation': 0., 'beeID': [[0.]] * len(positions)})
+    walker = SimpleWalker(DataWrapperPandas(detections, meta_keys={'camID': CAMKEY}),
+                          lambda tracks, detections: [
+                              euclidean((track.meta[DETKEY][-1].x, track.meta[DETKEY][-1].y),
+                                        (detection.x, detection.y))
+                              for track, detection in zip(tracks, detections)], frame_diff, 10)
+    walker.motion_model = ConstantVelocityModel(3)
+    walker.sort_claims = True
+    expected_tracks = walker.calc_tracks()
+    assert (10, 11) in [tuple(track.ids) for track in expected_tracks]
+    assert (12,) in [tuple(track.ids) for track in expected_tracks]
+    walker.track_id_count = 0
+    tracks = walker.calc_tracks(shards=shards, overlap=overlap or frame_diff, workers=workers,
+                                use_threads=use_threads)
+    assert len(tracks) == len(expected_tracks)
+    for expected_track, track in zip(expected_tracks, tracks):
+        cmp_tracks(expected_track, track)
+
+
+def test_calc_tracks_shards_tracks(data_tracks):
+    """Test that sharding is not supported for :class:`DataWrapperTracks`."""
+    walker = SimpleWalker(data_tracks, lambda tracks, tracks_test: [0] * len(tracks), 1, 10)
+    with pytest.raises(NotImplementedError):
+        walker.calc_tracks(shards=2)
+
+
 def test_calc_initialize(simple_walker, frame_objects_data):
     """Test the initialization of the waiting list."""
     frame_objects, time_index, timestamps, _ = frame_objects_data
@@ -217,6 +347,148 @@ def test_resolve_claims(simple_walker):
     assert len(cols) == 4
 
 
+@pytest.mark.parametrize("sparse_min_size", [1, 50, 10000])
+def test_resolve_claims_sparse(sparse_min_size):
+    """Test that resolving claims per component gives an optimal assignment."""
+    max_weight = 1000.
+    random_state = np.random.RandomState(42)
+    for _ in range(50):
+        shape = tuple(random_state.randint(1, 30, size=2))
+        rows, cols = np.nonzero(random_state.rand(*shape) < 0.1)
+        costs = random_state.uniform(-5, 20, size=len(rows))
+        costs[random_state.rand(len(rows)) < 0.1] = max_weight
+        cost_matrix = np.full(shape, max_weight)
+        cost_matrix[rows, cols] = costs
+
+        expected = resolve_claims_dense(rows, cols, costs, shape, max_weight)
+        result = resolve_claims_sparse(rows, cols, costs, shape, max_weight,
+                                       sparse_min_size=sparse_min_size)
+        assert len(np.unique(result[0])) == len(result[0])
+        assert len(np.unique(result[1])) == len(result[1])
+        assert np.all(cost_matrix[result] < max_weight)
+        assert np.isclose(np.sum(cost_matrix[result] - max_weight),
+                          np.sum(cost_matrix[expected] - max_weight))
+
+    # no claims
+    rows, cols = resolve_claims_sparse([], [], [], (5, 4), max_weight)
+    assert len(rows) == 0 and len(cols) == 0
+
+
+@pytest.mark.parametrize("resolve_fun", [resolve_claims_auction, resolve_claims_auto,
+                                         resolve_claims_greedy])
+def test_resolve_claims_backends(resolve_fun):
+    """Test that the other assignment functions give valid and (nearly) optimal assignments."""
+    max_weight = 1000.
+    random_state = np.random.RandomState(42)
+    for _ in range(50):
+        shape = tuple(random_state.randint(1, 30, size=2))
+        rows, cols = np.nonzero(random_state.rand(*shape) < random_state.choice([0.1, 0.5]))
+        costs = random_state.uniform(-5, 20, size=len(rows))
+        costs[random_state.rand(len(rows)) < 0.1] = max_weight
+        cost_matrix = np.full(shape, max_weight)
+        cost_matrix[rows, cols] = costs
+
+        expected = resolve_claims_dense(rows, cols, costs, shape, max_weight)
+        result = resolve_fun(rows, cols, costs, shape, max_weight)
+        assert len(np.unique(result[0])) == len(result[0])
+        assert len(np.unique(result[1])) == len(result[1])
+        assert np.all(cost_matrix[result] < max_weight)
+        expected_costs = np.sum(cost_matrix[expected] - max_weight)
+        result_costs = np.sum(cost_matrix[result] - max_weight)
+        if resolve_fun is resolve_claims_greedy:
+            assert result_costs >= expected_costs - 1e-9
+            # no claim between two unassigned frame objects is left
+            row_free, col_free = np.ones(shape[0], dtype=bool), np.ones(shape[1], dtype=bool)
+            row_free[result[0]], col_free[result[1]] = False, False
+            assert not np.any(row_free[rows] & col_free[cols] & (costs < max_weight))
+        elif resolve_fun is resolve_claims_auction:
+            assert expected_costs - 1e-9 <= result_costs <= expected_costs + min(shape) * 1e-3
+            # a coarse bid increment gives a bigger tolerance
+            result = resolve_fun(rows, cols, costs, shape, max_weight, epsilon=1.)
+            assert np.all(cost_matrix[result] < max_weight)
+            result_costs = np.sum(cost_matrix[result] - max_weight)
+            assert expected_costs - 1e-9 <= result_costs <= expected_costs + min(shape) * 1.
+        else:
+            assert np.isclose(result_costs, expected_costs)
+
+        # no claims
+        rows, cols = resolve_fun([], [], [], shape, max_weight)
+        assert len(rows) == 0 and len(cols) == 0
+
+
+def test_resolve_claims_auto():
+    """Test that the assignment function is selected by the number and density of claims."""
+    max_weight = 1000.
+    rows, cols, costs = np.array([0, 0, 1, 1]), np.array([0, 1, 0, 1]), np.array([1., 10., 0., 2.])
+    # greedy assigns (1, 0) first
+    greedy = resolve_claims_auto(rows, cols, costs, (2, 2), max_weight, dense_min_density=1.1,
+                                 greedy_min_claims=4)
+    assert list(greedy[0]) == [1, 0] and list(greedy[1]) == [0, 1]
+    for kwargs in ({}, {'dense_min_density': 1.1}, {'greedy_min_claims': 5}):
+        result = resolve_claims_auto(rows, cols, costs, (2, 2), max_weight, **kwargs)
+        assert sorted(zip(result[0], result[1])) == [(0, 0), (1, 1)]
+
+
+def test_calc_tracks_default_assignment(simple_walker):
+    """Test that the default assignment resolves the claims like the full cost matrix in the order
+    of the waiting list."""
+    class MatrixWalker(SimpleWalker):
+        """Walker that assigns the detections via :meth:`_resolve_claims`."""
+
+        def _calc_assign(self, cam_id, time_idx, tstamp, tstamps, frame_objects, waiting):
+            if len(frame_objects) == 0:
+                return waiting, set()
+            cost_matrix = self._calc_make_claims(cam_id, time_idx, tstamp, frame_objects,
+                                                 waiting)
+            assigned = set()
+            for waiting_idx, fo_idx in zip(*self._resolve_claims(cost_matrix.copy())):
+                if cost_matrix[waiting_idx, fo_idx] >= self.max_weight:
+                    continue
+                waiting[waiting_idx][0] = time_idx
+                frame_object = frame_objects[fo_idx]
+                assigned.add(frame_object.id)
+                waiting[waiting_idx][1].ids.append(frame_object.id)
+                waiting[waiting_idx][1].timestamps.append(tstamp)
+                waiting[waiting_idx][1].meta[DETKEY].append(frame_object)
+            return waiting, assigned
+
+    assert simple_walker.assignment == 'dense' and not simple_walker.sort_claims
+    tracks = simple_walker.calc_tracks()
+    walker = MatrixWalker(simple_walker.data, simple_walker.score_fun, simple_walker.frame_diff,
+                          simple_walker.radius)
+    expected_tracks = walker.calc_tracks()
+    assert len(tracks) == len(expected_tracks)
+    for expected_track, track in zip(expected_tracks, tracks):
+        cmp_tracks(expected_track, track)
+
+
+@pytest.mark.parametrize("sparse_min_size", [1, 10000])
+def test_calc_tracks_sparse(simple_walker, sparse_min_size):
+    """Test that sparse and dense assignment give the same tracks."""
+    simple_walker.assignment = 'dense'
+    expected_tracks = simple_walker.calc_tracks()
+
+    simple_walker.track_id_count = 0
+    simple_walker.assignment = 'sparse'
+    simple_walker.sparse_min_size = sparse_min_size
+    tracks = simple_walker.calc_tracks()
+    assert len(tracks) == len(expected_tracks)
+    for expected_track, track in zip(expected_tracks, tracks):
+        cmp_tracks(expected_track, track)
+
+    for assignment in ('auto', 'auction', resolve_claims_dense):
+        simple_walker.track_id_count = 0
+        simple_walker.assignment = assignment
+        tracks = simple_walker.calc_tracks()
+        assert len(tracks) == len(expected_tracks)
+        for expected_track, track in zip(expected_tracks, tracks):
+            cmp_tracks(expected_track, track)
+
+    simple_walker.assignment = 'foo'
+    with pytest.raises(AssertionError):
+        simple_walker.calc_tracks()
+
+
 @pytest.mark.parametrize("object_type", ["detections", "tracks"])
 def test_calc_assign(simple_walker, detections_simple_tracking, object_type):
     """Test the assignment of frame objects to tracks."""
@@ -299,3 +571,419 @@ def test_special_datawrappertracks():
         walker = SimpleWalker(dw_tracks, score_fun, i + 1, np.inf)
         result_tracks = walker.calc_tracks()
         assert len(result_tracks) == 4 - i
+
+    # the tracks are merged without changing the fragments
+    result_tracks = sorted(result_tracks, key=lambda track: track.timestamps[0])
+    assert result_tracks[0].ids == ids[0:2] + ids[3:6] + ids[8:10]
+    assert result_tracks[0].meta[DETKEY] == detections[0:2] + detections[3:6] + detections[8:10]
+    for track in result_tracks:
+        assert type(track.ids) is list
+        assert type(track.timestamps) is list
+        assert type(track.meta[DETKEY]) is list
+    assert track1.ids == ids[0:2] and track1.meta[DETKEY] == detections[0:2]
+    assert track2.ids == ids[3:6] and track2.meta[DETKEY] == detections[3:6]
+
+
+@pytest.mark.parametrize("frame_diff", [0, 1, 3, 20])
+def test_iter_camera_tracks(simple_walker, frame_diff):
+    """Test that walking on the frames with track starts is the same as walking on all frames."""
+    tracks = simple_walker.calc_tracks()
+    dw_tracks = DataWrapperTracks(tracks, {cam_id: simple_walker.data.get_timestamps(cam_id=cam_id)
+                                           for cam_id in simple_walker.data.get_camids()})
+
+    def score_fun(tracks1, tracks2):
+        """Score the end of tracks with the start of other tracks."""
+        return simple_walker.score_fun(tracks1, [track.meta[DETKEY][0] for track in tracks2])
+
+    for start, stop in [(None, None), (2, 8)]:
+        walker = SimpleWalker(dw_tracks, score_fun, frame_diff, 20)
+        expected_tracks = []
+        for cam_id in dw_tracks.get_camids():
+            tstamps = dw_tracks.get_time_index(cam_id=cam_id)
+            waiting, closed_tracks = [], []
+            for time_idx in range(*tstamps.get_range(start, stop)):
+                waiting = walker._calc_timestep_tracks(cam_id, time_idx, tstamps[time_idx],
+                                                       tstamps, waiting, closed_tracks)
+            expected_tracks.extend(closed_tracks + [track for _, track in waiting])
+        expected_count = walker.track_id_count
+        expected_assigned = walker.assigned_tracks
+
+        walker.track_id_count = 0
+        walker.assigned_tracks = set()
+        tracks = walker.calc_tracks(start=start, stop=stop)
+        assert walker.track_id_count == expected_count
+        assert walker.assigned_tracks == expected_assigned
+        assert len(tracks) == len(expected_tracks)
+        for expected_track, track in zip(expected_tracks, tracks):
+            assert expected_track.id == track.id
+            assert list(expected_track.ids) == track.ids
+            assert list(expected_track.timestamps) == track.timestamps
+
+
+@pytest.mark.parametrize("array_score", [False, True])
+def test_vectorized_walker(simple_walker, array_score):
+    """Test that the :class:`VectorizedWalker` gives the same tracks as a :class:`SimpleWalker`."""
+    expected_tracks = simple_walker.calc_tracks()
+
+    walker = VectorizedWalker(simple_walker.data, simple_walker.score_fun,
+                              simple_walker.frame_diff, simple_walker.radius,
+                              array_score_fun=distance_positions_arrays if array_score else None)
+    tracks = walker.calc_tracks()
+    assert walker.track_id_count == simple_walker.track_id_count
+    assert len(tracks) == len(expected_tracks)
+    for expected_track, track in zip(expected_tracks, tracks):
+        cmp_tracks(expected_track, track)
+
+    walker.track_id_count = 0
+    tracks = walker.calc_tracks(workers=2, use_threads=True)
+    assert len(tracks) == len(expected_tracks)
+    for expected_track, track in zip(expected_tracks, tracks):
+        cmp_tracks(expected_track, track)
+
+    with pytest.raises(NotImplementedError):
+        walker.calc_tracks(shards=2)
+    with pytest.raises(NotImplementedError):
+        walker.calc_tracks(checkpoint='checkpoint')
+    with pytest.raises(NotImplementedError):
+        walker.iter_tracks(checkpoint='checkpoint')
+
+
+def test_vectorized_walker_columnar(data_columnar, data_binary):
+    """Test that the :class:`VectorizedWalker` takes the arrays from the columns."""
+    expected_walker = VectorizedWalker(data_binary, None, 2, 100,
+                                       array_score_fun=score_id_sim_orientation_arrays)
+    expected_tracks = expected_walker.calc_tracks()
+    walker = VectorizedWalker(data_columnar, None, 2, 100,
+                              array_score_fun=score_id_sim_orientation_arrays)
+    tracks = walker.calc_tracks()
+    assert len(tracks) == len(expected_tracks)
+    for expected_track, track in zip(expected_tracks, tracks):
+        cmp_tracks(expected_track, track)
+
+    cam_id = data_columnar.cam_ids[0]
+    tstamp = data_columnar.get_timestamps(cam_id=cam_id)[0]
+    detections = data_columnar.get_frame_objects(cam_id=cam_id, timestamp=tstamp)
+    expected = make_frame_arrays(detections)
+    arrays = make_frame_arrays(detections, data_columnar.get_frame_columns(cam_id, tstamp))
+    assert list(arrays.ids) == list(expected.ids)
+    for field in ('x', 'y', 'orientation', 'beeId'):
+        assert np.allclose(getattr(arrays, field), getattr(expected, field))
+
+
+def test_constant_velocity_model():
+    """Test the prediction of positions and gates with constant velocity."""
+    def make_track(positions):
+        """Make a track with detections at the given ``(timestamp, x, y)`` positions."""
+        detections = [Detection(id=i, timestamp=tstamp, x=x, y=y, orientation=0, beeId=[0],
+                                meta={}) for i, (tstamp, x, y) in enumerate(positions)]
+        return Track(id=0, ids=[detection.id for detection in detections],
+                     timestamps=[detection.timestamp for detection in detections],
+                     meta={DETKEY: detections})
+
+    model = ConstantVelocityModel(5, radius_growth=2)
+    tracks = [make_track([(0, 0, 0), (1, 2, 1)]),
+              make_track([(0, 0, 0), (2, 4, -2)]),
+              make_track([(3, 7, 7)])]
+    points, radii = model.predict(tracks, np.array([1, 2, 1]), 4, 10)
+    assert np.allclose(points, [[8, 4], [8, -4], [7, 7]])
+    assert np.allclose(radii, [5, 7, 10])
+
+    # gates are limited by the radius of the walker
+    _, radii = model.predict(tracks, np.array([5, 5, 5]), 4, 10)
+    assert np.allclose(radii, [10, 10, 10])
+
+    with pytest.raises(TypeError):
+        model.predict([tracks[0].meta[DETKEY][0]], np.array([1]), 4, 10)
+    with pytest.raises(AssertionError):
+        ConstantVelocityModel(0)
+
+
+@pytest.mark.parametrize("walker_class", [SimpleWalker, VectorizedWalker])
+def test_motion_model(simple_walker, walker_class):
+    """Test that walkers with a motion model search around predicted positions."""
+    expected_tracks = simple_walker.calc_tracks()
+    scored = []
+
+    def score_fun(tracks, detections):
+        """Count the scored pairs."""
+        scored.append(len(tracks))
+        return simple_walker.score_fun(tracks, detections)
+
+    class StationaryModel(object):
+        """Predicts the last position of each track with the radius of the walker."""
+        history = 1
+
+        def predict(self, tracks, gaps, tstamp, radius):
+            points = np.array([(track.meta[DETKEY][-1].x, track.meta[DETKEY][-1].y)
+                               for track in tracks], dtype=float).reshape(-1, 2)
+            return points, np.full(len(tracks), radius, dtype=float)
+
+    # a model that predicts no motion gives the same tracks as the walker without model
+    walker = walker_class(simple_walker.data, score_fun, simple_walker.frame_diff,
+                          simple_walker.radius)
+    walker.motion_model = StationaryModel()
+    tracks = walker.calc_tracks()
+    n_scored = sum(scored)
+    assert len(tracks) == len(expected_tracks)
+    for expected_track, track in zip(expected_tracks, tracks):
+        cmp_tracks(expected_track, track)
+
+    # the walkers use the predicted positions and gates in the same way
+    reference = SimpleWalker(simple_walker.data, simple_walker.score_fun,
+                             simple_walker.frame_diff, simple_walker.radius)
+    reference.motion_model = ConstantVelocityModel(simple_walker.radius)
+    expected_tracks = reference.calc_tracks()
+    walker.track_id_count = 0
+    walker.motion_model = ConstantVelocityModel(simple_walker.radius)
+    tracks = walker.calc_tracks()
+    assert len(tracks) == len(expected_tracks)
+    for expected_track, track in zip(expected_tracks, tracks):
+        cmp_tracks(expected_track, track)
+
+    # smaller gates give less candidates
+    del scored[:]
+    walker.track_id_count = 0
+    walker.motion_model = ConstantVelocityModel(1)
+    walker.calc_tracks()
+    assert sum(scored) < n_scored
+
+
+def test_vectorized_walker_tracks(data_tracks):
+    """Test that the :class:`VectorizedWalker` does not walk on tracks."""
+    walker = VectorizedWalker(data_tracks, None, 1, 10, array_score_fun=distance_positions_arrays)
+    with pytest.raises(NotImplementedError):
+        walker.calc_tracks()
+
+
+def test_score_frame_arrays(simple_walker):
+    """Test that scoring :obj:`FrameArrays` gives the same scores as scoring detections."""
+    cam_id = list(simple_walker.data.get_camids())[0]
+    timestamps = simple_walker.data.get_timestamps(cam_id=cam_id)
+    detections1 = simple_walker.data.get_frame_objects(cam_id=cam_id, timestamp=timestamps[0])
+    detections2 = simple_walker.data.get_frame_objects(cam_id=cam_id, timestamp=timestamps[1])
+    length = min(len(detections1), len(detections2))
+    detections1, detections2 = detections1[:length], detections2[:length]
+    arrays1, arrays2 = make_frame_arrays(detections1), make_frame_arrays(detections2)
+    assert list(arrays1.ids) == [detection.id for detection in detections1]
+
+    tracks = [Track(id=0, ids=[det.id], timestamps=[det.timestamp], meta={DETKEY: [det]})
+              for det in detections1]
+    assert np.allclose(distance_positions_arrays(arrays1, arrays2),
+                       simple_walker.score_fun(tracks, detections2))
+    assert np.allclose(score_id_sim_orientation_arrays(arrays1, arrays2),
+                       score_id_sim_orientation_v(detections1, detections2))
+
+
+def test_online_walker(simple_walker):
+    """Test that pushing frames gives the same tracks as walking through the data."""
+    expected_tracks = simple_walker.calc_tracks()
+    data = simple_walker.data
+
+    callback_tracks = []
+    walker = OnlineWalker(simple_walker.score_fun, simple_walker.frame_diff, simple_walker.radius,
+                          callback=callback_tracks.append)
+    tracks = []
+    for cam_id in data.get_camids():
+        for tstamp in data.get_timestamps(cam_id=cam_id):
+            tracks.extend(walker.push_frame(cam_id, tstamp,
+                                            data.get_frame_objects(cam_id=cam_id,
+                                                                   timestamp=tstamp)))
+            # only the frames that are necessary for the assignment are kept
+            assert len(walker.data.get_timestamps(cam_id=cam_id)) <= walker.frame_diff + 1
+        tracks.extend(walker.flush(cam_id=cam_id))
+    assert walker.flush() == []
+    assert len(tracks) == len(expected_tracks)
+    assert len(callback_tracks) == len(expected_tracks)
+    for expected_track, track, callback_track in zip(expected_tracks, tracks, callback_tracks):
+        cmp_tracks(expected_track, track)
+        assert track is callback_track
+
+    # frames have to be pushed in order
+    cam_id = list(data.get_camids())[0]
+    with pytest.raises(AssertionError):
+        walker.push_frame(cam_id, data.get_timestamps(cam_id=cam_id)[0], [])
+    with pytest.raises(NotImplementedError):
+        walker.calc_tracks()
+
+
+def test_frame_buffer_neighbors():
+    """Test that the :class:`FrameBuffer` only removes the search items from the neighbors."""
+    def make_detection(det_id, timestamp, x):
+        """Make a detection at ``(x, 0)``."""
+        return Detection(id=det_id, timestamp=timestamp, x=x, y=0, orientation=0, beeId=[0],
+                         meta={})
+    frame = [make_detection(i, 1, x) for i, x in enumerate([0, 1, 2, 50])]
+    buffer = FrameBuffer(2)
+    buffer.add_frame(0, 1, frame)
+
+    # queries from the same frame do not find themselves
+    query_indices, candidate_indices = buffer.get_neighbors_bulk(frame, 0, 1.5, 1)
+    assert sorted(zip(query_indices, candidate_indices)) == [(0, 1), (1, 0), (1, 2), (2, 1)]
+    # queries from other frames find detections with the same id
+    other = [make_detection(1, 0, 1), make_detection(3, 1, 50)]
+    query_indices, candidate_indices = buffer.get_neighbors_bulk(other, 0, 0.5, 1)
+    assert list(query_indices) == [0] and list(candidate_indices) == [1]
+    query_indices, _ = buffer.get_neighbors_bulk(frame, 0, 1.5, 2)
+    assert len(query_indices) == 0
+
+
+def test_windowed_walker(simple_walker):
+    """Test that the :class:`WindowedWalker` links detections within a window."""
+    expected_tracks = simple_walker.calc_tracks()
+    data = simple_walker.data
+
+    # a window of a single frame is the same as walking frame by frame
+    walker = WindowedWalker(data, simple_walker.score_fun, simple_walker.frame_diff,
+                            simple_walker.radius, window_size=1)
+    tracks = walker.calc_tracks()
+    assert walker.track_id_count == simple_walker.track_id_count
+    assert len(tracks) == len(expected_tracks)
+    for expected_track, track in zip(expected_tracks, tracks):
+        cmp_tracks(expected_track, track)
+
+    detection_ids = sorted(detection_id for track in expected_tracks for detection_id in track.ids)
+    for window_size in (2, 5, 100):
+        walker = WindowedWalker(data, simple_walker.score_fun, 3, simple_walker.radius,
+                                window_size=window_size)
+        tracks = walker.calc_tracks()
+        # every detection is in exactly one track and the gaps are at most frame_diff frames
+        assert sorted(detection_id for track in tracks for detection_id in track.ids) == \
+            detection_ids
+        for track in tracks:
+            cam_id = track.meta[DETKEY][0].meta[CAMKEY]
+            time_index = data.get_time_index(cam_id=cam_id)
+            time_indices = [time_index.index(tstamp) for tstamp in track.timestamps]
+            assert all(0 < gap <= walker.frame_diff for gap in np.diff(time_indices))
+
+    # the pairs of a window are the detections within the radius at most frame_diff frames apart
+    cam_id = min(data.get_camids())
+    detections, times = [], []
+    for time_idx, tstamp in enumerate(data.get_time_index(cam_id=cam_id)[:5]):
+        frame = data.get_frame_objects(cam_id=cam_id, timestamp=tstamp)
+        detections.extend(frame)
+        times.extend([time_idx] * len(frame))
+    pairs = walker._calc_window_pairs(detections, np.array(times))
+    expected = [(idx1, idx2) for idx1, idx2 in combinations(range(len(detections)), 2)
+                if 0 < times[idx2] - times[idx1] <= walker.frame_diff and
+                euclidean((detections[idx1].x, detections[idx1].y),
+                          (detections[idx2].x, detections[idx2].y)) <= walker.radius]
+    assert len(expected) > 0
+    assert sorted(tuple(pair) for pair in pairs.tolist()) == expected
+
+    # the cameras are walked in parallel, but not in shards or with checkpoints
+    walker.track_id_count = 0
+    parallel_tracks = walker.calc_tracks(workers=2, use_threads=True)
+    assert len(parallel_tracks) == len(tracks)
+    for expected_track, track in zip(tracks, parallel_tracks):
+        cmp_tracks(expected_track, track)
+    with pytest.raises(NotImplementedError):
+        walker.calc_tracks(shards=2)
+    with pytest.raises(NotImplementedError):
+        walker.calc_tracks(checkpoint='checkpoint')
+    with pytest.raises(NotImplementedError):
+        walker.iter_tracks(checkpoint='checkpoint')
+    with pytest.raises(AssertionError):
+        WindowedWalker(data, simple_walker.score_fun, 1, 10, window_size=0)
+
+
+def test_windowed_walker_tracks(data_tracks):
+    """Test that the :class:`WindowedWalker` does not walk on tracks."""
+    walker = WindowedWalker(data_tracks, None, 1, 10)
+    with pytest.raises(NotImplementedError):
+        walker.calc_tracks()
+
+
+@pytest.mark.parametrize("frame_diff", [0, 1, 3])
+def test_hierarchical_walker(simple_walker, frame_diff):
+    """Test that the pipelined walk gives the same tracks as two separate walks."""
+    data = simple_walker.data
+
+    def score_fun(tracks1, tracks2):
+        """Score the end of tracks with the start of other tracks."""
+        return simple_walker.score_fun(tracks1, [track.meta[DETKEY][0] for track in tracks2])
+
+    for start, stop in [(None, None), (2, 8)]:
+        tracklets = SimpleWalker(data, simple_walker.score_fun, simple_walker.frame_diff,
+                                 simple_walker.radius).calc_tracks(start=start, stop=stop)
+        dw_tracks = DataWrapperTracks(tracklets, OrderedDict(
+            (cam_id, data.get_timestamps(cam_id=cam_id)) for cam_id in data.get_camids()),
+                                      data=data)
+        track_walker = SimpleWalker(dw_tracks, score_fun, frame_diff, 20, track_prefix='t')
+        expected_tracks = track_walker.calc_tracks(start=start, stop=stop)
+
+        walker = HierarchicalWalker(data, simple_walker.score_fun, score_fun,
+                                    simple_walker.frame_diff, simple_walker.radius, frame_diff, 20,
+                                    track_prefix='t')
+        tracks = walker.calc_tracks(start=start, stop=stop)
+        assert walker.track_walker.track_id_count == track_walker.track_id_count
+        assert walker.track_walker.assigned_tracks == track_walker.assigned_tracks
+        assert len(tracks) == len(expected_tracks)
+        for expected_track, track in zip(expected_tracks, tracks):
+            cmp_tracks(expected_track, track)
+        # the walked tracklet starts are removed
+        assert walker.buffer.tracks == {} and walker.buffer.frame_trees == {}
+
+    with pytest.raises(NotImplementedError):
+        walker.buffer.get_timestamps_starting(list(data.get_camids())[0])
+
+
+def test_walker_stats(simple_walker):
+    """Test the timers, histograms and counters of a walk."""
+    expected_tracks = simple_walker.calc_tracks()
+    data = simple_walker.data
+    n_frames = sum(len(data.get_timestamps(cam_id=cam_id)) for cam_id in data.get_camids())
+
+    stream = six.StringIO()
+    simple_walker.track_id_count = 0
+    simple_walker.stats = WalkerStats(emit_interval=2, stream=stream)
+    tracks = simple_walker.calc_tracks()
+    assert len(tracks) == len(expected_tracks)
+    for expected_track, track in zip(expected_tracks, tracks):
+        cmp_tracks(expected_track, track)
+
+    stats = simple_walker.stats.as_dict()
+    assert stats['frames'] == n_frames
+    assert stats['counters'] == {'tracks_opened': len(tracks), 'tracks_closed': len(tracks)}
+    assert set(stats['timers'].keys()) == set(['frame_objects', 'neighbors', 'scoring',
+                                               'assignment', 'bookkeeping'])
+    assert sum(stats['histograms']['waiting'].values()) == n_frames
+    assert stats['summaries']['candidates']['max'] > 0
+    assert len(stats['summaries']['cost_matrix']['max']) == 2
+    lines = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert len(lines) == n_frames // 2
+    assert [line['frames'] for line in lines] == list(range(2, n_frames + 1, 2))
+    assert all(line['fps'] > 0 and 'histograms' not in line for line in lines)
+
+    simple_walker.stats.reset()
+    assert simple_walker.stats.as_dict(histograms=False) == dict(
+        frames=0, elapsed=0., fps=0., timers={}, counters={}, summaries={})
+    with pytest.raises(AssertionError):
+        WalkerStats(emit_interval=0)
+
+
+@pytest.mark.parametrize("kwargs", [dict(workers=2, use_threads=True), dict(workers=2),
+                                    dict(shards=3, overlap=1),
+                                    dict(shards=3, overlap=3, workers=2, use_threads=True)])
+def test_walker_stats_isolated(simple_walker, kwargs):
+    """Test that the statistics of isolated walks are merged like a sequential walk."""
+    simple_walker.stats = WalkerStats()
+    simple_walker.calc_tracks()
+    expected = simple_walker.stats.as_dict()
+
+    stream = six.StringIO()
+    simple_walker.track_id_count = 0
+    simple_walker.stats = WalkerStats(emit_interval=1000, stream=stream)
+    simple_walker.calc_tracks(**kwargs)
+    stats = simple_walker.stats.as_dict()
+    assert stats['frames'] == expected['frames']
+    assert stats['counters'] == expected['counters']
+    assert set(stats['timers'].keys()) == set(expected['timers'].keys())
+    if 'shards' in kwargs:
+        # the warm up of the shards is walked twice
+        assert sum(stats['histograms']['waiting'].values()) >= expected['frames']
+    else:
+        assert stats['histograms'] == expected['histograms']
+    assert 0 < stats['elapsed'] and simple_walker.stats.started is not None
+    # the merged statistics are written once after the walk
+    lines = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert [line['frames'] for line in lines] == [expected['frames']]